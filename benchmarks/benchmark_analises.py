@@ -0,0 +1,149 @@
+"""
+Benchmark: funções de análise dos dashboards sobre dados sintéticos de 10 mil a 100 milhões de linhas.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/benchmark_analises.py --linhas 10000 100000 1000000
+    python benchmarks/benchmark_analises.py --comparar
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.append(str(RAIZ))
+from src.analises import (analisar_eficacia_canal_vendas, analisar_impacto_desconto_vendas, analisar_metodo_pagamento,
+                          analisar_vendas_por_categoria, analisar_vendas_por_regiao)
+from src.cubo import construir_cubo
+from src.dados_sinteticos import gerar_vendas
+
+# Funções de análise dos dashboards (ver src/analises.py)
+FUNCOES = {
+    'analisar_vendas_por_regiao': analisar_vendas_por_regiao,
+    'analisar_eficacia_canal_vendas': analisar_eficacia_canal_vendas,
+    'analisar_metodo_pagamento': analisar_metodo_pagamento,
+    'analisar_vendas_por_categoria': analisar_vendas_por_categoria,
+    'analisar_impacto_desconto_vendas': analisar_impacto_desconto_vendas
+}
+
+ARQUIVO_RESULTADOS = RAIZ / 'benchmarks' / 'resultados' / 'benchmark_analises.csv'
+
+
+def versao_codigo():
+    """
+    Commit atual (com '+' quando há alterações não commitadas), usado para comparar execuções.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        alterado = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=RAIZ,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ('+' if alterado else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecido'
+
+
+def medir(funcao, dados, repeticoes, **parametros):
+    """
+    Executa a função e retorna o menor tempo e o pico de memória alocada (tracemalloc).
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(dados, **parametros)
+        tempos.append(time.perf_counter() - inicio)
+        plt.close('all')
+
+    tracemalloc.start()
+    funcao(dados, **parametros)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    plt.close('all')
+    return min(tempos), pico
+
+
+def executar(linhas_lista, semente=42, repeticoes=3, usar_cubo=False):
+    versao = versao_codigo()
+    data_execucao = datetime.now().isoformat(timespec='seconds')
+
+    resultados = []
+    for linhas in linhas_lista:
+        inicio = time.perf_counter()
+        dados = gerar_vendas(linhas, semente)
+        tempo_geracao = time.perf_counter() - inicio
+        cubo = construir_cubo(dados) if usar_cubo else None
+
+        for nome, funcao in FUNCOES.items():
+            parametros = {'cubo': cubo} if usar_cubo and nome != 'analisar_impacto_desconto_vendas' else {}
+            tempo, pico = medir(funcao, dados, repeticoes, **parametros)
+            resultados.append({
+                'Commit': versao,
+                'Data': data_execucao,
+                'Linhas': linhas,
+                'Cubo': usar_cubo,
+                'Função': nome,
+                'Tempo (s)': tempo,
+                'Linhas/s': linhas / tempo if tempo else float('inf'),
+                'Pico de Memória (MB)': pico / 1024 ** 2
+            })
+            print(f"{linhas:>11,} | {nome:<34} | {tempo:8.4f}s | {pico / 1024 ** 2:9.1f} MB")
+        print(f"{linhas:>11,} | geração dos dados: {tempo_geracao:.2f}s")
+        del dados, cubo
+
+    return pd.DataFrame(resultados)
+
+
+def salvar_resultados(resultados, arquivo=ARQUIVO_RESULTADOS):
+    """
+    Acrescenta os resultados ao histórico (um CSV com todas as execuções).
+    """
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+    resultados.to_csv(arquivo, mode='a', header=not os.path.exists(arquivo), index=False)
+
+
+def comparar(arquivo=ARQUIVO_RESULTADOS):
+    """
+    Compara a execução mais recente com a anterior de outro commit (razão de tempo > 1 = regressão).
+    """
+    historico = pd.read_csv(arquivo)
+    execucoes = historico.drop_duplicates('Data')[['Data', 'Commit']].sort_values('Data')
+    if len(execucoes) < 2:
+        return None
+    atual = execucoes.iloc[-1]
+    anteriores = execucoes[execucoes['Commit'] != atual['Commit']]
+    if anteriores.empty:
+        return None
+    anterior = anteriores.iloc[-1]
+
+    chaves = ['Linhas', 'Cubo', 'Função']
+    tabela = historico[historico['Data'] == anterior['Data']].merge(
+        historico[historico['Data'] == atual['Data']], on=chaves, suffixes=(' Anterior', ' Atual'))
+    tabela['Razão de Tempo'] = tabela['Tempo (s) Atual'] / tabela['Tempo (s) Anterior']
+    tabela['Razão de Memória'] = tabela['Pico de Memória (MB) Atual'] / tabela['Pico de Memória (MB) Anterior']
+    return tabela[chaves + ['Commit Anterior', 'Commit Atual', 'Tempo (s) Anterior', 'Tempo (s) Atual',
+                            'Razão de Tempo', 'Razão de Memória']]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--cubo', action='store_true', help='Usa o cubo de agregação nas funções que o aceitam')
+    parser.add_argument('--comparar', action='store_true', help='Apenas compara as duas últimas execuções salvas')
+    argumentos = parser.parse_args()
+
+    if not argumentos.comparar:
+        salvar_resultados(executar(argumentos.linhas, argumentos.semente, argumentos.repeticoes, argumentos.cubo))
+    comparacao = comparar() if os.path.exists(ARQUIVO_RESULTADOS) else None
+    if comparacao is not None:
+        print(comparacao.to_string(index=False))
@@ -0,0 +1,130 @@
+"""
+Benchmark: partida a frio e primeira renderização das páginas dos dashboards.
+
+Compara a aplicação multipágina (streamlit/app.py, um único processo) com os dashboards
+executados como aplicações separadas (um processo cada). Cada cenário roda em um processo novo,
+com o AppTest do Streamlit sobre o dataset dos dashboards, e mede:
+- partida a frio: importação do Streamlit e primeira execução do script;
+- primeira renderização de cada página (na aplicação única, a primeira visita após a partida);
+- RSS máximo do processo (nos dashboards separados, o total é a soma dos processos).
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/benchmark_paginas.py
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+DIRETORIO_STREAMLIT = RAIZ / 'streamlit'
+ARQUIVO_RESULTADOS = RAIZ / 'benchmarks' / 'resultados' / 'benchmark_paginas.csv'
+
+APLICACAO = 'app.py'
+PAGINAS = [
+    'dashboard_vendas_regiao.py',
+    'dashboard_canal_vendas.py',
+    'dashboard_metodo_de_pagamento.py',
+    'dashboard_vendas_categoria.py',
+    'dashboard_impacto_descontos.py',
+    'dashboard_representantes.py'
+]
+TEMPO_LIMITE = 300
+
+sys.path.append(str(RAIZ))
+from src.instrumentacao import rss_maximo_mb
+
+
+def _verificar(app_teste, pagina):
+    erros = [str(e.value) for e in app_teste.exception] + [str(e.value) for e in app_teste.error]
+    if erros:
+        raise RuntimeError(f"A página '{pagina}' terminou com erro: {erros[0]}")
+
+
+def medir_processo(script):
+    """
+    Mede um cenário no processo atual (que deve ser novo): executa o script e, se for a
+    aplicação multipágina, visita cada página uma vez.
+
+    Retorna:
+    - dict: {'Partida a frio (s)', 'Páginas': {página: primeira renderização (s)}, 'RSS (MB)'}.
+    """
+    inicio = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    app_teste = AppTest.from_file(str(DIRETORIO_STREAMLIT / script), default_timeout=TEMPO_LIMITE)
+    inicio_execucao = time.perf_counter()
+    app_teste.run()
+    fim = time.perf_counter()
+    primeira = PAGINAS[0] if script == APLICACAO else script
+    _verificar(app_teste, primeira)
+    paginas = {primeira: fim - inicio_execucao}
+
+    if script == APLICACAO:
+        for pagina in PAGINAS[1:]:
+            inicio_pagina = time.perf_counter()
+            app_teste.switch_page(pagina).run()
+            paginas[pagina] = time.perf_counter() - inicio_pagina
+            _verificar(app_teste, pagina)
+
+    return {'Partida a frio (s)': fim - inicio, 'Páginas': paginas, 'RSS (MB)': rss_maximo_mb()}
+
+
+def _medir_em_subprocesso(script):
+    processo = subprocess.run([sys.executable, __file__, '--processo', script], cwd=RAIZ, capture_output=True,
+                              text=True, encoding='utf-8')
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao medir '{script}':\n{processo.stderr.strip()}")
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def executar():
+    import pandas as pd
+    from benchmark_analises import versao_codigo
+
+    versao = versao_codigo()
+    data_execucao = datetime.now().isoformat(timespec='seconds')
+    cenarios = {'Aplicação única': [APLICACAO], 'Dashboards separados': PAGINAS}
+
+    resultados = []
+    for cenario, scripts in cenarios.items():
+        for script in scripts:
+            medicao = _medir_em_subprocesso(script)
+            for pagina, tempo in medicao['Páginas'].items():
+                resultados.append({
+                    'Commit': versao,
+                    'Data': data_execucao,
+                    'Cenário': cenario,
+                    'Processo': script,
+                    'Página': pagina,
+                    'Primeira Renderização (s)': tempo,
+                    'Partida a Frio (s)': medicao['Partida a frio (s)'],
+                    'RSS (MB)': medicao['RSS (MB)']
+                })
+                print(f"{cenario:<20} | {pagina:<34} | {tempo:7.2f}s")
+
+    resultados = pd.DataFrame(resultados)
+    processos = resultados.drop_duplicates(['Cenário', 'Processo'])
+    resumo = processos.groupby('Cenário', sort=False).agg(
+        Processos=('Processo', 'size'),
+        **{'Partida a Frio (s)': ('Partida a Frio (s)', 'sum'), 'RSS Total (MB)': ('RSS (MB)', 'sum')}
+    )
+    resumo['Renderização das Páginas (s)'] = resultados.groupby('Cenário', sort=False)['Primeira Renderização (s)'].sum()
+    return resultados, resumo
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processo', help=argparse.SUPPRESS)
+    argumentos = parser.parse_args()
+
+    if argumentos.processo:
+        # Execução interna: mede um único cenário neste processo e imprime o resultado em JSON
+        print(json.dumps(medir_processo(argumentos.processo), ensure_ascii=False))
+    else:
+        from benchmark_analises import salvar_resultados
+        resultados, resumo = executar()
+        salvar_resultados(resultados, ARQUIVO_RESULTADOS)
+        print(resumo.to_string())
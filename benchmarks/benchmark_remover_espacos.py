@@ -0,0 +1,83 @@
+"""
+Benchmark: remover_espacos vetorizado x versão original (lambdas por célula).
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/benchmark_remover_espacos.py --linhas 1000000 10000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.limpeza import remover_espacos, remover_espacos_por_celula
+
+
+def gerar_dados_com_espacos(linhas, proporcao_espacos=0.05, semente=42):
+    """
+    Gera colunas de texto e categóricas no domínio do dataset, com parte dos valores cercados por espaços.
+    """
+    rng = np.random.default_rng(semente)
+    dominios = {
+        'Sales_Rep': ['Alice', 'Bob', 'Charlie', 'David', 'Eve'],
+        'Region': ['North', 'South', 'East', 'West'],
+        'Product_Category': ['Electronics', 'Furniture', 'Clothing', 'Food'],
+        'Payment_Method': ['Cash', 'Credit Card', 'Bank Transfer'],
+        'Sales_Channel': ['Online', 'Retail']
+    }
+    dados = {}
+    for coluna, valores in dominios.items():
+        serie = pd.Series(rng.choice(valores, linhas), dtype=object)
+        com_espacos = rng.random(linhas) < proporcao_espacos
+        serie[com_espacos] = ' ' + serie[com_espacos] + ' '
+        dados[coluna] = serie
+    dados['Sales_Amount'] = rng.uniform(100, 10000, linhas).round(2)
+
+    df = pd.DataFrame(dados)
+    # Metade das colunas de texto como categóricas, como após modificar_tipo_colunas
+    for coluna in ['Region', 'Product_Category']:
+        df[coluna] = df[coluna].astype('category')
+    return df
+
+
+def medir(funcao, df):
+    inicio = time.perf_counter()
+    resultado, relatorio = funcao(df.copy())
+    return time.perf_counter() - inicio, resultado, relatorio
+
+
+def executar(linhas_lista):
+    resultados = []
+    for linhas in linhas_lista:
+        df = gerar_dados_com_espacos(linhas)
+        tempo_vetorizado, limpo_vetorizado, relatorio_vetorizado = medir(remover_espacos, df)
+        tempo_original, limpo_original, relatorio_original = medir(remover_espacos_por_celula, df)
+
+        # As categorias podem diferir apenas na ordem; a comparação é feita pelos valores
+        mesmos_valores = all(
+            (limpo_vetorizado[col].astype(object) == limpo_original[col].astype(object)).all()
+            for col in df.columns
+        )
+        colunas_relatorio = ['Espaços Antes', 'Espaços Depois', 'Remoção Bem-Sucedida']
+        mesmo_relatorio = (relatorio_vetorizado[colunas_relatorio].values.tolist()
+                           == relatorio_original[colunas_relatorio].values.tolist())
+
+        resultados.append({
+            'Linhas': linhas,
+            'Original (s)': tempo_original,
+            'Vetorizado (s)': tempo_vetorizado,
+            'Aceleração': tempo_original / tempo_vetorizado,
+            'Mesmo Resultado': mesmos_valores and mesmo_relatorio
+        })
+        print(resultados[-1])
+    return pd.DataFrame(resultados)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    argumentos = parser.parse_args()
+    print(executar(argumentos.linhas).to_string(index=False))
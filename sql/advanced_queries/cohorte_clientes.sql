@@ -1,26 +1,46 @@
 -- Query: Análise de Cohorte de Clientes
-SELECT
-    cohort_month,
-    customer_type,
-    months_since_first_purchase,
-    retention_rate,
-    CLTV
-FROM (
+/* Cliente = Product_ID, como nos demais scripts. Os meses desde a primeira compra usam aritmética
+   inteira (ano * 12 + mês), sem o retorno a zero após 12 meses de EXTRACT(MONTH FROM AGE(...)),
+   e o join é uma igualdade simples, sem ARRAY_AGG/ANY. Equivalente em Python: src/coortes.py */
+WITH first_purchase AS (
+    SELECT
+        Customer_Type,
+        Product_ID,
+        MIN(Sale_Date) AS first_purchase
+    FROM main_table
+    GROUP BY 1,2
+),
+cohort_size AS (
     SELECT
-        TO_CHAR(first_purchase, 'YYYY-MM') AS cohort_month,
         Customer_Type,
-        EXTRACT(MONTH FROM AGE(Sale_Date, first_purchase)) AS months_since_first_purchase,
-        COUNT(DISTINCT m.Product_ID) * 1.0 / COUNT(DISTINCT cohort_users) AS retention_rate,
-        SUM(Sales_Amount) / COUNT(DISTINCT m.Product_ID) AS CLTV
+        TO_CHAR(first_purchase, 'YYYY-MM') AS cohort_month,
+        COUNT(*) AS cohort_users
+    FROM first_purchase
+    GROUP BY 1,2
+),
+activity AS (
+    SELECT
+        TO_CHAR(f.first_purchase, 'YYYY-MM') AS cohort_month,
+        m.Customer_Type,
+        (EXTRACT(YEAR FROM m.Sale_Date) - EXTRACT(YEAR FROM f.first_purchase)) * 12
+            + EXTRACT(MONTH FROM m.Sale_Date) - EXTRACT(MONTH FROM f.first_purchase) AS months_since_first_purchase,
+        COUNT(DISTINCT m.Product_ID) AS active_users,
+        SUM(m.Sales_Amount) AS revenue
     FROM main_table m
-    JOIN (
-        SELECT 
-            Product_ID, 
-            MIN(Sale_Date) AS first_purchase,
-            ARRAY_AGG(DISTINCT Product_ID) AS cohort_users
-        FROM main_table
-        GROUP BY Product_ID
-    ) cohort ON m.Product_ID = ANY(cohort.cohort_users)
+    JOIN first_purchase f ON f.Product_ID = m.Product_ID
+        AND f.Customer_Type = m.Customer_Type
     GROUP BY 1,2,3
-) analysis
-WHERE months_since_first_purchase <= 12;
\ No newline at end of file
+)
+SELECT
+    a.cohort_month,
+    a.Customer_Type,
+    a.months_since_first_purchase,
+    a.active_users * 1.0 / s.cohort_users AS retention_rate,
+    SUM(a.revenue) OVER (
+        PARTITION BY a.cohort_month, a.Customer_Type
+        ORDER BY a.months_since_first_purchase
+    ) / s.cohort_users AS CLTV
+FROM activity a
+JOIN cohort_size s ON s.cohort_month = a.cohort_month
+    AND s.Customer_Type = a.Customer_Type
+WHERE a.months_since_first_purchase <= 12;
\ No newline at end of file
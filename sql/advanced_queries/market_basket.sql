@@ -1,4 +1,29 @@
 -- Query: Associação de Produtos (Market Basket)
+/* Cestas distintas (dia, produto) antes do self-join: o join passa a ter no máximo
+   dias x produtos linhas de cada lado. Para bases grandes ou conjuntos com mais de dois
+   produtos, use src/cesta_compras.py (contagem de pares por produto de matrizes esparsas). */
+WITH baskets AS (
+    SELECT DISTINCT Sale_Date, Product_ID
+    FROM main_table
+),
+item_counts AS (
+    SELECT Product_ID, COUNT(*) AS item_count
+    FROM baskets
+    GROUP BY Product_ID
+),
+totals AS (
+    SELECT COUNT(DISTINCT Sale_Date) AS total_transactions FROM baskets
+),
+pairs AS (
+    SELECT
+        b1.Product_ID AS product1,
+        b2.Product_ID AS product2,
+        COUNT(*) AS support_count
+    FROM baskets b1
+    JOIN baskets b2 ON b1.Sale_Date = b2.Sale_Date
+        AND b1.Product_ID < b2.Product_ID
+    GROUP BY 1,2
+)
 SELECT 
     product_pair,
     support_count,
@@ -6,17 +31,14 @@ SELECT
     lift_ratio
 FROM (
     SELECT
-        p1.Product_Category AS product1,
-        p2.Product_Category AS product2,
-        COUNT(*) AS support_count,
-        COUNT(*) * 1.0 / total_transactions AS support,
-        COUNT(*) * 1.0 / p1_count AS confidence,
-        (COUNT(*) * 1.0 / total_transactions) / 
-            ((p1_count * 1.0 / total_transactions) * (p2_count * 1.0 / total_transactions)) AS lift_ratio
-    FROM main_table p1
-    JOIN main_table p2 ON p1.Sale_Date = p2.Sale_Date 
-        AND p1.Product_ID < p2.Product_ID
-    CROSS JOIN (SELECT COUNT(DISTINCT Sale_Date) AS total_transactions FROM main_table) t
-    GROUP BY 1,2,total_transactions,p1_count,p2_count
+        CAST(p.product1 AS VARCHAR) || ' & ' || CAST(p.product2 AS VARCHAR) AS product_pair,
+        p.support_count,
+        p.support_count * 1.0 / c1.item_count AS confidence,
+        (p.support_count * 1.0 / t.total_transactions) / 
+            ((c1.item_count * 1.0 / t.total_transactions) * (c2.item_count * 1.0 / t.total_transactions)) AS lift_ratio
+    FROM pairs p
+    JOIN item_counts c1 ON c1.Product_ID = p.product1
+    JOIN item_counts c2 ON c2.Product_ID = p.product2
+    CROSS JOIN totals t
 ) combos
 WHERE lift_ratio > 1 AND support_count > 10;
\ No newline at end of file
@@ -4,4 +4,5 @@ CREATE TABLE main_table_partitioned PARTITION BY LIST (Region, Sales_Channel) (
     PARTITION south_retail VALUES (('South', 'Retail')),
     PARTITION others VALUES (DEFAULT)
 );
-/* Motivo: Acelera consultas regionais combinadas com tipo de canal */
\ No newline at end of file
+/* Motivo: Acelera consultas regionais combinadas com tipo de canal */
+/* Em uso: src/desempenho.py grava o armazém de desempenho em partições mes=AAAA-MM/Region=.../Sales_Channel=... */
\ No newline at end of file
@@ -16,4 +16,5 @@ SELECT
     COUNT(DISTINCT CASE WHEN Customer_Type = 'New' THEN Product_ID END)
 FROM main_table
 GROUP BY 1,2;
--- Combina múltiplas métricas em uma única fonte para RH
\ No newline at end of file
+-- Combina múltiplas métricas em uma única fonte para RH
+-- Versão materializada por representante, região, canal e mês, atualizada por partição de mês: src/desempenho.py
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+Módulos compartilhados entre os notebooks e os dashboards Streamlit.
+"""
@@ -0,0 +1,441 @@
+import os
+import threading
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from src.carregamento import carregar_vendas, carregar_vendas_com_info, descrever_carga
+from src.cubo import COLUNA_DIA, MEDIDA_PADRAO, ler_agregado, obter_cubo, versao_dados
+from src.filtros import DIMENSOES_FILTRO, aplicar_filtros, barra_filtros, descrever_filtros, obter_indice
+
+# Dimensões com amostra estratificada (um estrato por valor) para o modo aproximado das análises
+DIMENSOES_AMOSTRA = ['Region', 'Product_Category', 'Sales_Channel', 'Payment_Method']
+
+# Linhas mantidas por estrato. Com 10 mil linhas, a margem de erro de uma média fica em torno de
+# 2 * desvio / 100 (cerca de 1% do valor para vendas com coeficiente de variação de 0,5)
+TAMANHO_ESTRATO = int(os.environ.get('SALES_SAMPLE_SIZE', 10_000))
+
+# Tamanho do dataset a partir do qual os dashboards abrem no modo aproximado
+LIMITE_LINHAS_APROXIMADO = int(os.environ.get('SALES_APPROX_MIN_ROWS', 10_000_000))
+
+NIVEL_CONFIANCA = 0.95
+SEMENTE_AMOSTRA = 42
+
+# Versão do formato persistido; amostras de versões diferentes são recalculadas
+VERSAO_AMOSTRA = 2
+
+_amostras = {}
+_trava = threading.Lock()
+
+
+def _selecionar(linhas, dimensoes, tamanho):
+    # Linhas (ordenadas pela chave) entre as 'tamanho' menores chaves do seu estrato em alguma dimensão
+    selecionadas = np.zeros(len(linhas), dtype=bool)
+    for dimensao in dimensoes:
+        posicao = linhas.groupby(dimensao, observed=True, sort=False).cumcount()
+        selecionadas |= (posicao < tamanho).to_numpy()
+    return selecionadas
+
+
+def _categorias(valores):
+    # Mesma ordem das categorias de src.filtros.IndiceBitmap, para os filtros coincidirem nos dois modos
+    if isinstance(valores.dtype, pd.CategoricalDtype):
+        return list(valores.cat.categories)
+    return list(pd.factorize(valores, sort=True)[1])
+
+
+def construir_amostra(dados, dimensoes=None, tamanho=TAMANHO_ESTRATO, medida=MEDIDA_PADRAO, semente=SEMENTE_AMOSTRA):
+    """
+    Constrói as amostras estratificadas do modo aproximado: para cada dimensão e cada valor
+    (estrato), uma amostra aleatória simples de até 'tamanho' vendas, mais a população exata do estrato.
+
+    Cada linha recebe uma chave aleatória uniforme, e a amostra de um estrato são as 'tamanho'
+    linhas de menor chave (reservatório por prioridade). Assim, duas amostras se mesclam sem
+    reler os dados (mesclar_amostras): as menores chaves da união são uma amostra uniforme da
+    união. As linhas guardam as dimensões de filtro e a data, para aplicar os filtros dos
+    dashboards à amostra (filtrar_amostra), e o domínio dos filtros (categorias e período do
+    dataset completo) é guardado à parte, para desenhá-los sem carregar as vendas (DominioAmostra).
+
+    Parâmetros:
+    - dados (pandas.DataFrame): DataFrame com as vendas.
+    - dimensoes (list, opcional): Dimensões estratificadas. Se None, DIMENSOES_AMOSTRA presentes nos dados.
+    - tamanho (int): Linhas por estrato.
+    - medida (str): Coluna numérica estimada.
+    - semente: Semente das chaves aleatórias.
+
+    Retorna:
+    - dict: {'medida', 'tamanho', 'dimensoes', 'linhas' (vendas vistas), 'populacao'
+      (contagem exata por estrato de cada dimensão), 'categorias' (valores de cada dimensão de filtro),
+      'periodo' (primeira e última data), 'amostra' (DataFrame com as linhas amostradas)}.
+    """
+    if dimensoes is None:
+        dimensoes = [dim for dim in DIMENSOES_AMOSTRA if dim in dados.columns]
+    colunas_invalidas = [col for col in list(dimensoes) + [medida] if col not in dados.columns]
+    if colunas_invalidas:
+        raise ValueError(f"Colunas inválidas: {colunas_invalidas}")
+
+    colunas = list(dict.fromkeys(list(dimensoes) + [col for col in DIMENSOES_FILTRO + [COLUNA_DIA]
+                                                    if col in dados.columns]))
+    rng = np.random.default_rng(semente)
+    chaves = rng.random(len(dados))
+    ordem = np.argsort(chaves, kind='stable')
+
+    linhas = dados[colunas].iloc[ordem].reset_index(drop=True)
+    linhas[medida] = dados[medida].to_numpy(dtype='float64')[ordem]
+    linhas['chave'] = chaves[ordem]
+    amostra = linhas[_selecionar(linhas, dimensoes, tamanho)].reset_index(drop=True)
+    datas = pd.to_datetime(dados[COLUNA_DIA]) if COLUNA_DIA in dados.columns and len(dados) else None
+
+    return {
+        'medida': medida,
+        'tamanho': tamanho,
+        'dimensoes': list(dimensoes),
+        'linhas': len(dados),
+        'populacao': {dim: dados[dim].value_counts(sort=False).astype('int64') for dim in dimensoes},
+        'categorias': {dim: _categorias(dados[dim]) for dim in DIMENSOES_FILTRO if dim in dados.columns},
+        'periodo': (None, None) if datas is None else (datas.min(), datas.max()),
+        'amostra': amostra
+    }
+
+
+def mesclar_amostras(amostra, amostra_delta):
+    """
+    Incorpora a amostra de um novo lote de vendas (delta-merge), sem reler os dados: as populações
+    são somadas e, em cada estrato, ficam as linhas de menor chave das duas amostras.
+
+    As chaves do lote devem ser independentes das já usadas (ver atualizar_amostra).
+    """
+    if amostra['dimensoes'] != amostra_delta['dimensoes'] or amostra['medida'] != amostra_delta['medida']:
+        raise ValueError("As amostras possuem dimensões ou medidas diferentes e não podem ser mescladas.")
+
+    combinada = pd.concat([amostra['amostra'], amostra_delta['amostra']], ignore_index=True)
+    # Une as categorias dos dois lotes antes de reagrupar
+    for coluna in amostra['amostra'].columns:
+        if isinstance(amostra['amostra'][coluna].dtype, pd.CategoricalDtype) \
+                or isinstance(amostra_delta['amostra'][coluna].dtype, pd.CategoricalDtype):
+            combinada[coluna] = combinada[coluna].astype('category')
+    combinada = combinada.sort_values('chave', kind='stable').reset_index(drop=True)
+    tamanho = amostra['tamanho']
+    datas = [data for data in amostra['periodo'] + amostra_delta['periodo'] if data is not None]
+
+    return {
+        'medida': amostra['medida'],
+        'tamanho': tamanho,
+        'dimensoes': list(amostra['dimensoes']),
+        'linhas': amostra['linhas'] + amostra_delta['linhas'],
+        'populacao': {
+            dim: amostra['populacao'][dim].add(amostra_delta['populacao'][dim], fill_value=0).astype('int64')
+            for dim in amostra['dimensoes']
+        },
+        'categorias': {
+            dim: sorted(set(amostra['categorias'].get(dim, [])) | set(amostra_delta['categorias'].get(dim, [])), key=str)
+            for dim in dict.fromkeys(list(amostra['categorias']) + list(amostra_delta['categorias']))
+        },
+        'periodo': (min(datas), max(datas)) if datas else (None, None),
+        'amostra': combinada[_selecionar(combinada, amostra['dimensoes'], tamanho)].reset_index(drop=True)
+    }
+
+
+def atualizar_amostra(amostra, lote):
+    """
+    Amostra do lote (com chaves independentes das anteriores) mesclada à amostra existente.
+    """
+    delta = construir_amostra(lote, amostra['dimensoes'], amostra['tamanho'], amostra['medida'],
+                              semente=[SEMENTE_AMOSTRA, amostra['linhas']])
+    return mesclar_amostras(amostra, delta)
+
+
+def filtrar_amostra(amostra, filtros):
+    """
+    Associa à amostra os filtros dos dashboards (chave de src.filtros.normalizar_filtros).
+
+    As linhas não são descartadas: a estimativa sobre um subconjunto usa a fração da amostra de cada
+    estrato que atende aos filtros (estimação por domínio). Retorna None se a amostra não tiver uma
+    das colunas filtradas (as análises usam então as linhas filtradas, como com o cubo).
+    """
+    if amostra is None:
+        return None
+    inicio, fim, dimensoes = filtros
+    colunas = amostra['amostra'].columns
+    if ((inicio is not None or fim is not None) and COLUNA_DIA not in colunas) \
+            or any(dimensao not in colunas for dimensao, _ in dimensoes):
+        return None
+    return {**amostra, 'filtros': filtros}
+
+
+class DominioAmostra:
+    """
+    Domínio dos filtros guardado com a amostra (categorias e período do dataset completo), com a
+    interface de src.filtros.IndiceBitmap usada por barra_filtros e normalizar_filtros: no modo
+    aproximado, os filtros são desenhados sem carregar as vendas nem construir o índice.
+    """
+
+    def __init__(self, amostra):
+        self.linhas = amostra['linhas']
+        self.categorias = amostra['categorias']
+        self._periodo = amostra['periodo']
+
+    def intervalo_datas(self):
+        """
+        Primeira e última data do dataset.
+        """
+        return self._periodo
+
+
+def _mascara_filtros(amostra):
+    linhas = amostra['amostra']
+    mascara = np.ones(len(linhas), dtype=bool)
+    inicio, fim, dimensoes = amostra.get('filtros') or (None, None, ())
+    if inicio is not None or fim is not None:
+        dias = pd.to_datetime(linhas[COLUNA_DIA]).dt.normalize()
+        if inicio is not None:
+            mascara &= (dias >= inicio).to_numpy()
+        if fim is not None:
+            mascara &= (dias <= fim).to_numpy()
+    for dimensao, valores in dimensoes:
+        mascara &= linhas[dimensao].isin(valores).to_numpy()
+    return mascara
+
+
+def estimar_grupos(amostra, dimensao, estatisticas=('sum', 'mean', 'count'), nivel_confianca=NIVEL_CONFIANCA):
+    """
+    Estima soma, média e contagem da medida por valor da dimensão, com margens de erro.
+
+    Em cada estrato h, com população N (exata) e amostra de n linhas, das quais as que atendem aos
+    filtros têm indicador c = 1 e valor z = medida * c:
+    - soma: N * média(z), com variância N² * (1 - n/N) * var(z) / n;
+    - contagem: N * média(c), exata sem filtros;
+    - média: soma(z) / soma(c) (estimador de razão), com variância (1 - n/N) * var(z - média * c) / (n * média(c)²).
+    Estratos com n = N estão inteiros na amostra e têm margem zero.
+
+    Parâmetros:
+    - amostra (dict): Resultado de construir_amostra (opcionalmente com filtrar_amostra).
+    - dimensao (str): Dimensão do agrupamento (uma de amostra['dimensoes']).
+    - estatisticas (list): Estatísticas desejadas entre 'sum', 'mean' e 'count'.
+    - nivel_confianca (float): Nível dos intervalos de confiança (aproximação normal).
+
+    Retorna:
+    - pandas.DataFrame: Mesmo formato de src.cubo.agrupar_vendas, com a margem de erro de cada
+      estatística em '<estatistica>_erro' (intervalo = valor ± margem) e as linhas amostradas em 'amostra'.
+    """
+    if dimensao not in amostra['dimensoes']:
+        raise ValueError(f"Dimensão sem amostra: '{dimensao}'")
+    estatisticas_invalidas = [est for est in estatisticas if est not in ('sum', 'mean', 'count')]
+    if estatisticas_invalidas:
+        raise ValueError(f"Estatística não suportada pela amostra: '{estatisticas_invalidas[0]}'")
+
+    linhas = amostra['amostra']
+    posicao = linhas.groupby(dimensao, observed=True, sort=False).cumcount().to_numpy()
+    no_estrato = posicao < amostra['tamanho']
+    c = _mascara_filtros(amostra)[no_estrato].astype('float64')
+    y = linhas[amostra['medida']].to_numpy(dtype='float64')[no_estrato]
+    base = pd.DataFrame({'estrato': linhas[dimensao][no_estrato].to_numpy(), 'z': y * c, 'c': c})
+
+    grupos = base.groupby('estrato', observed=True, sort=True)
+    n = grupos['c'].size().astype('float64')
+    soma_z, soma_c = grupos['z'].sum(), grupos['c'].sum()
+    media = soma_z / soma_c
+    base['d'] = base['z'] - base['estrato'].map(media).astype('float64') * base['c']
+    variancia_z, variancia_c = grupos['z'].var(), grupos['c'].var()
+    variancia_d = base.groupby('estrato', observed=True, sort=True)['d'].var()
+
+    populacao = amostra['populacao'][dimensao].reindex(n.index).astype('float64')
+    # Correção para população finita: zero quando o estrato inteiro está na amostra
+    fator = (1 - n / populacao).clip(lower=0)
+    quantil = NormalDist().inv_cdf(0.5 + nivel_confianca / 2)
+    media_c = soma_c / n
+    erros = {
+        'sum': quantil * populacao * np.sqrt(fator * variancia_z.fillna(0) / n),
+        'count': quantil * populacao * np.sqrt(fator * variancia_c.fillna(0) / n),
+        'mean': quantil * np.sqrt(fator * variancia_d.fillna(0) / n) / media_c
+    }
+    valores = {
+        'sum': populacao * soma_z / n,
+        'count': (populacao * media_c).round().astype('int64'),
+        'mean': media
+    }
+
+    # Apenas os valores com alguma venda amostrada dentro dos filtros
+    presentes = soma_c > 0
+    resultado = pd.DataFrame(index=n.index[presentes.to_numpy()])
+    for estatistica in estatisticas:
+        resultado[estatistica] = valores[estatistica][presentes]
+    for estatistica in estatisticas:
+        resultado[f'{estatistica}_erro'] = erros[estatistica][presentes].to_numpy()
+    resultado['amostra'] = soma_c[presentes].astype('int64')
+    resultado.index.name = dimensao
+    return resultado.reset_index()
+
+
+def estimar_linhas(amostra):
+    """
+    Número estimado de vendas que atendem aos filtros da amostra (exato sem filtros).
+    """
+    inicio, fim, dimensoes = amostra.get('filtros') or (None, None, ())
+    if inicio is None and fim is None and not dimensoes:
+        return amostra['linhas']
+    contagens = estimar_grupos(amostra, amostra['dimensoes'][0], ('count',))
+    return int(contagens['count'].sum())
+
+
+def descrever_amostra(amostra, nivel_confianca=NIVEL_CONFIANCA):
+    """
+    Aviso de valores aproximados (para st.info).
+    """
+    return (f"Valores aproximados: estimados a partir de uma amostra estratificada de {len(amostra['amostra']):,} "
+            f"de {amostra['linhas']:,} vendas (até {amostra['tamanho']:,} por valor de cada dimensão), com intervalos "
+            f"de {nivel_confianca:.0%} de confiança. Desative \"Valores aproximados\" na barra lateral para o cálculo exato.")
+
+
+def barra_aproximacao(linhas_total):
+    """
+    Desenha na barra lateral a opção de valores aproximados. Ligada por padrão a partir de
+    LIMITE_LINHAS_APROXIMADO vendas.
+    """
+    import streamlit as st
+
+    return st.sidebar.toggle(
+        "Valores aproximados", value=linhas_total >= LIMITE_LINHAS_APROXIMADO,
+        help="Estima somas e médias a partir de uma amostra estratificada, com intervalos de confiança, "
+             "em vez de percorrer todas as vendas.")
+
+
+def carregar_pagina(caminho_dados):
+    """
+    Vendas de uma página de relatório, com a opção de valores aproximados e os filtros da barra lateral.
+
+    No modo aproximado, os filtros usam o domínio guardado com a amostra e as vendas não são
+    carregadas (dados e cubo são None); caso contrário, as vendas e o cubo são filtrados pelo
+    índice de bitmaps. Os resumos da carga, da amostra e dos filtros são escritos na página.
+
+    Parâmetros:
+    - caminho_dados (str): Dataset processado (ver src.carregamento.caminho_preferencial).
+
+    Retorna:
+    - tuple: (dados, cubo, amostra, filtros, linhas, linhas_total); amostra é None no modo exato.
+      Levanta ValueError se nenhuma venda corresponder aos filtros.
+    """
+    import streamlit as st
+
+    amostra = obter_amostra(caminho_dados)
+    if barra_aproximacao(amostra['linhas']):
+        filtros = barra_filtros(DominioAmostra(amostra))
+        amostra = filtrar_amostra(amostra, filtros)
+        dados = cubo = None
+        linhas, linhas_total = estimar_linhas(amostra), amostra['linhas']
+        st.info(descrever_amostra(amostra))
+    else:
+        amostra = None
+        dados, info_carga = carregar_vendas_com_info(caminho_dados)
+        cubo = obter_cubo(caminho_dados)
+        st.caption(descrever_carga(info_carga))
+
+        # Filtros da barra lateral, resolvidos pelo índice de bitmaps
+        indice = obter_indice(caminho_dados)
+        filtros = barra_filtros(indice)
+        dados, cubo = aplicar_filtros(dados, cubo, indice, filtros)
+        linhas, linhas_total = len(dados), indice.linhas
+    st.caption(descrever_filtros(filtros, linhas, linhas_total))
+    if not linhas:
+        raise ValueError("Nenhuma venda corresponde aos filtros selecionados.")
+    return dados, cubo, amostra, filtros, linhas, linhas_total
+
+
+def caminho_amostra_padrao(caminho_dados):
+    """
+    Caminho padrão da amostra persistida, ao lado do dataset processado.
+    """
+    return os.path.splitext(caminho_dados.rstrip('/\\'))[0] + '_amostra.pkl'
+
+
+def salvar_amostra(amostra, caminho_dados, caminho_amostra=None):
+    """
+    Persiste a amostra associada à versão atual do dataset.
+    """
+    if caminho_amostra is None:
+        caminho_amostra = caminho_amostra_padrao(caminho_dados)
+    # 'versao' segue a convenção dos demais agregados (versão do dataset), usada pela carga incremental
+    pd.to_pickle({'versao': versao_dados(caminho_dados), 'formato': VERSAO_AMOSTRA, 'amostra': amostra},
+                 caminho_amostra)
+    versao = (VERSAO_AMOSTRA, versao_dados(caminho_dados))
+    with _trava:
+        _amostras[caminho_amostra] = {'versao': versao, 'amostra': amostra}
+
+
+def obter_amostra(caminho_dados, caminho_amostra=None):
+    """
+    Retorna a amostra do dataset, reaproveitando a amostra em memória ou a persistida em disco
+    enquanto o dataset não for alterado.
+
+    Parâmetros:
+    - caminho_dados (str): Caminho do CSV ou do diretório colunar processado.
+    - caminho_amostra (str, opcional): Arquivo persistido. Se None, usa caminho_amostra_padrao.
+
+    Retorna:
+    - dict: Amostra (ver construir_amostra).
+    """
+    if caminho_amostra is None:
+        caminho_amostra = caminho_amostra_padrao(caminho_dados)
+    versao = (VERSAO_AMOSTRA, versao_dados(caminho_dados))
+
+    with _trava:
+        em_memoria = _amostras.get(caminho_amostra)
+        if em_memoria is not None and em_memoria['versao'] == versao:
+            return em_memoria['amostra']
+
+    persistido = ler_agregado(caminho_amostra)
+    if persistido is not None and (persistido.get('formato'), persistido.get('versao')) == versao:
+        amostra = persistido['amostra']
+        with _trava:
+            _amostras[caminho_amostra] = {'versao': versao, 'amostra': amostra}
+        return amostra
+
+    amostra = construir_amostra(carregar_vendas(caminho_dados))
+    salvar_amostra(amostra, caminho_dados, caminho_amostra)
+    return amostra
+
+
+def validar_amostra(dados, amostra, dimensoes=None):
+    """
+    Compara as estimativas da amostra com o agrupamento exato dos dados.
+
+    Retorna:
+    - pandas.DataFrame: Por dimensão, o maior erro relativo da soma e da média e a fração dos
+      valores exatos dentro dos intervalos de confiança.
+    """
+    if dimensoes is None:
+        dimensoes = amostra['dimensoes']
+
+    relatorio = []
+    for dimensao in dimensoes:
+        exato = dados.groupby(dimensao, observed=True)[amostra['medida']].agg(['sum', 'mean']).astype('float64')
+        estimado = estimar_grupos(amostra, dimensao, ('sum', 'mean')).set_index(dimensao)
+        estimado.index = estimado.index.astype(exato.index.dtype)
+        estimado = estimado.reindex(exato.index)
+        linha = {'Dimensão': dimensao, 'Grupos': len(exato)}
+        for estatistica, rotulo in (('sum', 'Soma'), ('mean', 'Média')):
+            diferenca = (estimado[estatistica] - exato[estatistica]).abs()
+            linha[f'Erro Relativo Máximo ({rotulo})'] = float((diferenca / exato[estatistica].abs()).max())
+            linha[f'Cobertura do IC ({rotulo})'] = float((diferenca <= estimado[f'{estatistica}_erro'] + 1e-9).mean())
+        relatorio.append(linha)
+
+    return pd.DataFrame(relatorio)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Constrói a amostra do modo aproximado e compara as estimativas com os valores exatos.")
+    parser.add_argument('caminho', help='CSV ou diretório colunar processado (ex.: data/processed/sales_data_atualizado.csv)')
+    argumentos = parser.parse_args()
+
+    vendas = carregar_vendas(argumentos.caminho)
+    inicio = time.perf_counter()
+    amostra_vendas = construir_amostra(vendas)
+    salvar_amostra(amostra_vendas, argumentos.caminho)
+    print(f"Amostra: {len(amostra_vendas['amostra']):,} de {amostra_vendas['linhas']:,} vendas "
+          f"em {time.perf_counter() - inicio:.2f} s ({caminho_amostra_padrao(argumentos.caminho)})")
+    with pd.option_context('display.float_format', '{:,.4f}'.format, 'display.width', 160):
+        print(validar_amostra(vendas, amostra_vendas).to_string(index=False))
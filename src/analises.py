@@ -0,0 +1,383 @@
+from src.amostragem import NIVEL_CONFIANCA
+from src.cubo import agrupar_vendas
+from src.graficos import construindo_figuras
+from src.instrumentacao import instrumentar
+from src.nivel_detalhe import LIMITE_PONTOS, amostra_estratificada, correlacao_pearson, grade_densidade, histograma
+
+# Funções de análise dos dashboards (streamlit/), sem dependência do Streamlit: podem ser
+# importadas por notebooks, benchmarks e pelo relatório em lote. As bibliotecas de gráficos
+# são importadas dentro de cada função, para que apenas as páginas que as usam paguem a carga.
+
+# Colunas das margens de erro no modo aproximado (parâmetro 'amostra', ver src.amostragem)
+MARGENS = {'sum_erro': 'Margem_Total', 'mean_erro': 'Margem_Media', 'count_erro': 'Margem_Quantidade'}
+
+
+def _titulo(titulo, aproximado):
+    return f"{titulo} — estimativa (IC {NIVEL_CONFIANCA:.0%})" if aproximado else titulo
+
+
+def _colunas(dados, amostra):
+    # No modo aproximado os dashboards passam só a amostra (dados=None), sem carregar as vendas
+    return amostra['amostra'].columns if dados is None else dados.columns
+
+
+def _margem(linha):
+    # Margem de erro do total no texto das observações (vazia nos valores exatos)
+    return f" (± R$ {linha['Margem_Total']:.2f})" if 'Margem_Total' in linha.index else ''
+
+
+def estatisticas_vendas(dados, coluna, coluna_vendas='Sales_Amount', estatisticas=('sum', 'mean', 'count'),
+                        nome_contagem='Quantidade_Vendas', cubo=None, amostra=None, ordenar=False):
+    """
+    Total, média e contagem de vendas por valor de 'coluna', com os nomes usados nas análises
+    (Total_Vendas, Media_Vendas e nome_contagem; no modo aproximado, também as margens de MARGENS).
+
+    Cálculo compartilhado pelos dashboards e pelo relatório em lote (src/relatorio.py).
+
+    Parâmetros:
+    - dados (pandas.DataFrame): DataFrame com as vendas (pode ser None quando a amostra responde).
+    - coluna (str): Dimensão do agrupamento.
+    - coluna_vendas (str): Coluna de vendas agregada.
+    - estatisticas (tuple): Estatísticas de agrupar_vendas.
+    - nome_contagem (str): Nome da coluna de contagem.
+    - cubo, amostra: Repassados a agrupar_vendas.
+    - ordenar (bool): Se True, ordena pelo total decrescente.
+
+    Retorna:
+    - pandas.DataFrame: Uma linha por valor de 'coluna', com índice reiniciado.
+    """
+    tabela = agrupar_vendas(dados, coluna, coluna_vendas, estatisticas, cubo=cubo, amostra=amostra)
+    tabela = tabela.rename(columns={'sum': 'Total_Vendas', 'mean': 'Media_Vendas', 'count': nome_contagem, **MARGENS})
+    if ordenar:
+        tabela = tabela.sort_values(by='Total_Vendas', ascending=False).reset_index(drop=True)
+    return tabela
+
+
+@instrumentar('analise')
+def analisar_vendas_por_regiao(dados, coluna_regiao='Region', coluna_vendas='Sales_Amount', cubo=None, amostra=None):
+    """
+    Função original mantida com integridade
+    """
+    import matplotlib.pyplot as plt
+
+    if coluna_regiao not in _colunas(dados, amostra) or coluna_vendas not in _colunas(dados, amostra):
+        raise ValueError(f"Colunas '{coluna_regiao}' ou '{coluna_vendas}' não encontradas")
+    
+    vendas_por_regiao = estatisticas_vendas(dados, coluna_regiao, coluna_vendas, ['sum', 'mean'], cubo=cubo,
+                                            amostra=amostra)
+    aproximado = 'Margem_Total' in vendas_por_regiao.columns
+    
+    regiao_maior = vendas_por_regiao.loc[vendas_por_regiao['Total_Vendas'].idxmax()]
+    regiao_menor = vendas_por_regiao.loc[vendas_por_regiao['Total_Vendas'].idxmin()]
+    
+    # Apenas métodos da figura e dos eixos: plt.xticks/grid/tight_layout agiriam sobre a figura
+    # corrente global do pyplot, compartilhada entre as threads do servidor
+    with construindo_figuras():
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.bar(vendas_por_regiao[coluna_regiao], vendas_por_regiao['Total_Vendas'], 
+               color='#2ecc71', edgecolor='#27ae60', linewidth=0.7,
+               yerr=vendas_por_regiao['Margem_Total'] if aproximado else None, capsize=6)
+        ax.set_title(_titulo('Distribuição de Vendas por Região', aproximado), fontsize=18, pad=20)
+        ax.set_xlabel('', fontsize=12)
+        ax.set_ylabel('Valor Total (R$)', fontsize=12, labelpad=15)
+        ax.set_xticks(range(len(vendas_por_regiao)), vendas_por_regiao[coluna_regiao].astype(str),
+                      rotation=45, ha='right')
+        ax.grid(axis='y', linestyle=':', alpha=0.7)
+        fig.tight_layout()
+    
+    insights = {
+        "Resumo": "Análise comparativa do desempenho comercial por região geográfica",
+        "Aproximado": aproximado,
+        "Topo": {
+            "Região": regiao_maior[coluna_regiao],
+            "Total": regiao_maior['Total_Vendas'],
+            "Média": regiao_maior['Media_Vendas']
+        },
+        "Base": {
+            "Região": regiao_menor[coluna_regiao],
+            "Total": regiao_menor['Total_Vendas'],
+            "Média": regiao_menor['Media_Vendas']
+        },
+        "Detalhes": vendas_por_regiao.to_dict(orient='records')
+    }
+    
+    return fig, insights
+
+
+@instrumentar('analise')
+def analisar_eficacia_canal_vendas(dados, coluna_canal='Sales_Channel', coluna_vendas='Sales_Amount', cubo=None,
+                                   amostra=None):
+    import plotly.express as px
+
+    if coluna_canal not in _colunas(dados, amostra) or coluna_vendas not in _colunas(dados, amostra):
+        raise ValueError(f"As colunas '{coluna_canal}' e/ou '{coluna_vendas}' não estão presentes no DataFrame.")
+    
+    # Agrupamento por canal de vendas e cálculo de estatísticas
+    vendas_por_canal = estatisticas_vendas(dados, coluna_canal, coluna_vendas, cubo=cubo, amostra=amostra)
+    aproximado = 'Margem_Total' in vendas_por_canal.columns
+    
+    # Identificar o canal com maior e menor volume de vendas
+    canal_maior_venda = vendas_por_canal.iloc[vendas_por_canal['Total_Vendas'].idxmax()]
+    canal_menor_venda = vendas_por_canal.iloc[vendas_por_canal['Total_Vendas'].idxmin()]
+    
+    # Gráfico de barras horizontal interativo
+    with construindo_figuras():
+        bar_chart = px.bar(
+            vendas_por_canal, x='Total_Vendas', y=coluna_canal,
+            title=_titulo("Total de Vendas por Canal de Vendas", aproximado),
+            text='Total_Vendas', orientation='h', color=coluna_canal,
+            error_x='Margem_Total' if aproximado else None,
+            color_discrete_sequence=px.colors.sequential.Blues  # Paleta em tons de azul
+        )
+        bar_chart.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+        bar_chart.update_layout(xaxis_title="Total de Vendas (R$)", yaxis_title="Canal de Vendas")
+    
+    # Construção de insights
+    insights = {
+        "Resumo": "A análise compara o desempenho de diferentes canais de vendas, identificando oportunidades estratégicas.",
+        "Aproximado": aproximado,
+        "Observações": [
+            f"O canal com maior volume de vendas foi '{canal_maior_venda[coluna_canal]}', totalizando R$ {canal_maior_venda['Total_Vendas']:.2f}{_margem(canal_maior_venda)}.",
+            f"O canal com menor volume de vendas foi '{canal_menor_venda[coluna_canal]}', com R$ {canal_menor_venda['Total_Vendas']:.2f}{_margem(canal_menor_venda)}."
+        ],
+        "Recomendações": [
+            "Expanda os esforços no canal mais eficaz para maximizar os lucros.",
+            "Implemente iniciativas para melhorar o desempenho do canal menos eficaz.",
+            "Monitore regularmente o desempenho dos canais para otimizar estratégias ao longo do tempo."
+        ]
+    }
+    
+    return bar_chart, insights
+
+
+@instrumentar('analise')
+def analisar_metodo_pagamento(dados, coluna_pagamento='Payment_Method', coluna_vendas='Sales_Amount', cubo=None,
+                              amostra=None):
+    import plotly.express as px
+
+    if coluna_pagamento not in _colunas(dados, amostra) or coluna_vendas not in _colunas(dados, amostra):
+        raise ValueError(f"As colunas '{coluna_pagamento}' e/ou '{coluna_vendas}' não estão presentes no DataFrame.")
+    
+    # Agrupamento por método de pagamento e cálculo de estatísticas
+    vendas_por_pagamento = estatisticas_vendas(dados, coluna_pagamento, coluna_vendas,
+                                               nome_contagem='Quantidade_Transacoes', cubo=cubo, amostra=amostra,
+                                               ordenar=True)
+    aproximado = 'Margem_Total' in vendas_por_pagamento.columns
+    
+    # Identificar o método com maior e menor volume de vendas
+    metodo_maior_venda = vendas_por_pagamento.iloc[0]
+    metodo_menor_venda = vendas_por_pagamento.iloc[-1]
+    
+    # Gráfico de pizza interativo
+    with construindo_figuras():
+        pie_chart = px.pie(
+            vendas_por_pagamento, values='Total_Vendas', names=coluna_pagamento,
+            title=_titulo('Distribuição dos Métodos de Pagamento por Total de Vendas', aproximado),
+            color_discrete_sequence=px.colors.qualitative.Plotly  # Correção para uma paleta válida
+        )
+    
+        # Gráfico de barras interativo
+        bar_chart = px.bar(
+            vendas_por_pagamento, x=coluna_pagamento, y='Total_Vendas', 
+            title=_titulo('Total de Vendas por Método de Pagamento', aproximado),
+            text='Total_Vendas', color=coluna_pagamento,
+            error_y='Margem_Total' if aproximado else None,
+            color_discrete_sequence=px.colors.sequential.Viridis
+        )
+        bar_chart.update_traces(texttemplate='%{text:.2s}', textposition='outside')
+        bar_chart.update_layout(xaxis_title="Método de Pagamento", yaxis_title="Total de Vendas (R$)")
+    
+    # Construção de insights
+    insights = {
+        "Resumo": "A análise dos métodos de pagamento revela padrões importantes para estratégias de vendas.",
+        "Aproximado": aproximado,
+        "Observações": [
+            f"O método de pagamento com maior volume de vendas foi '{metodo_maior_venda[coluna_pagamento]}', representando R$ {metodo_maior_venda['Total_Vendas']:.2f}{_margem(metodo_maior_venda)}.",
+            f"O método de pagamento com menor volume de vendas foi '{metodo_menor_venda[coluna_pagamento]}', com R$ {metodo_menor_venda['Total_Vendas']:.2f}{_margem(metodo_menor_venda)}."
+        ],
+        "Recomendações": [
+            "Incentive o método mais popular para maximizar vendas.",
+            "Desenvolva campanhas que promovam os métodos menos utilizados.",
+            "Monitore continuamente os métodos de pagamento para ajustar estratégias conforme necessário."
+        ]
+    }
+    
+    return pie_chart, bar_chart, insights
+
+
+@instrumentar('analise')
+def analisar_vendas_por_categoria(dados, coluna_categoria='Product_Category', coluna_vendas='Sales_Amount', cubo=None,
+                                  amostra=None):
+    import plotly.express as px
+
+    if coluna_categoria not in _colunas(dados, amostra) or coluna_vendas not in _colunas(dados, amostra):
+        raise ValueError(f"As colunas '{coluna_categoria}' e/ou '{coluna_vendas}' não estão presentes no DataFrame.")
+    
+    # Agrupamento por categoria e cálculo de estatísticas
+    vendas_por_categoria = estatisticas_vendas(dados, coluna_categoria, coluna_vendas, cubo=cubo, amostra=amostra,
+                                               ordenar=True)
+    aproximado = 'Margem_Total' in vendas_por_categoria.columns
+    
+    # Identificar a categoria com maior e menor volume de vendas
+    categoria_maior_venda = vendas_por_categoria.iloc[0]
+    categoria_menor_venda = vendas_por_categoria.iloc[-1]
+    
+    # Gráfico de barras horizontal interativo
+    with construindo_figuras():
+        bar_chart = px.bar(
+            vendas_por_categoria, y=coluna_categoria, x='Total_Vendas', 
+            title=_titulo('Total de Vendas por Categoria de Produto', aproximado),
+            text='Total_Vendas', orientation='h', color=coluna_categoria,
+            error_x='Margem_Total' if aproximado else None,
+            color_discrete_sequence=px.colors.sequential.Greys  # Paleta em preto e branco
+        )
+        bar_chart.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+        bar_chart.update_layout(xaxis_title="Total de Vendas (R$)", yaxis_title="Categoria de Produto")
+    
+    # Construção de insights
+    insights = {
+        "Resumo": "A análise evidencia quais categorias de produtos apresentam o maior e o menor desempenho em vendas.",
+        "Aproximado": aproximado,
+        "Observações": [
+            f"A categoria com maior volume de vendas foi '{categoria_maior_venda[coluna_categoria]}', totalizando R$ {categoria_maior_venda['Total_Vendas']:.2f}{_margem(categoria_maior_venda)}.",
+            f"A categoria com menor volume de vendas foi '{categoria_menor_venda[coluna_categoria]}', com R$ {categoria_menor_venda['Total_Vendas']:.2f}{_margem(categoria_menor_venda)}."
+        ],
+        "Recomendações": [
+            "Invista em campanhas publicitárias para a categoria com maior potencial de vendas.",
+            "Implemente promoções estratégicas para melhorar o desempenho da categoria menos vendida.",
+            "Realize análises contínuas para acompanhar o desempenho das categorias e ajustar as ações conforme necessário."
+        ]
+    }
+    
+    return bar_chart, insights
+
+
+@instrumentar('analise')
+def analisar_impacto_desconto_vendas(dados, coluna_desconto='Discount', coluna_quantidade='Quantity_Sold',
+                                     modo_detalhe='automatico', limite_pontos=LIMITE_PONTOS):
+    """
+    Analisa o impacto dos descontos na quantidade vendida.
+
+    Acima de limite_pontos linhas, os gráficos recebem dados agregados no servidor (modo 'automatico'
+    ou 'densidade': grade de contagens; 'amostra': amostra estratificada por desconto), mantendo o
+    volume enviado ao navegador limitado. 'completo' envia todas as linhas. A correlação é sempre
+    calculada sobre os dados completos.
+    """
+    import plotly.express as px
+
+    if coluna_desconto not in dados.columns or coluna_quantidade not in dados.columns:
+        raise ValueError(f"As colunas '{coluna_desconto}' e/ou '{coluna_quantidade}' não estão presentes no DataFrame.")
+    if modo_detalhe not in ('automatico', 'densidade', 'amostra', 'completo'):
+        raise ValueError(f"Modo de detalhe inválido: '{modo_detalhe}'.")
+    
+    correlacao, p_valor = correlacao_pearson(dados[coluna_desconto], dados[coluna_quantidade])
+    
+    titulo_dispersao = "Relação entre Descontos Aplicados e Quantidade Vendida"
+    rotulos = {coluna_desconto: "Desconto", coluna_quantidade: "Quantidade Vendida"}
+    if modo_detalhe == 'automatico':
+        modo_detalhe = 'completo' if len(dados) <= limite_pontos else 'densidade'
+    
+    # Gráfico de dispersão interativo
+    if modo_detalhe == 'densidade':
+        grade = grade_densidade(dados[coluna_desconto], dados[coluna_quantidade])
+        grade = grade.rename(columns={'x': coluna_desconto, 'y': coluna_quantidade, 'contagem': 'Vendas'})
+        with construindo_figuras():
+            scatter_plot = px.scatter(
+                grade, x=coluna_desconto, y=coluna_quantidade, size='Vendas', color='Vendas',
+                title=f"{titulo_dispersao} (densidade de {len(dados):,} vendas)",
+                labels=rotulos,
+                color_continuous_scale='Blues'
+            )
+    else:
+        pontos = amostra_estratificada(dados, coluna_desconto, limite_pontos) if modo_detalhe == 'amostra' else dados
+        sufixo = f" (amostra estratificada de {len(pontos):,} vendas)" if len(pontos) < len(dados) else ""
+        with construindo_figuras():
+            scatter_plot = px.scatter(
+                pontos, x=coluna_desconto, y=coluna_quantidade,
+                title=titulo_dispersao + sufixo,
+                labels=rotulos,
+                opacity=0.7,
+                color_discrete_sequence=['#3498db']
+            )
+    
+    # Gráfico de distribuição interativo (contagens calculadas no servidor)
+    contagens = histograma(dados[coluna_desconto], bins=20)
+    with construindo_figuras():
+        hist_plot = px.bar(
+            contagens, x='centro', y='contagem', title="Distribuição dos Descontos",
+            labels={'centro': "Desconto", 'contagem': "count"},
+            opacity=0.7,
+            color_discrete_sequence=['#2ecc71']
+        )
+        hist_plot.update_traces(width=float((contagens['fim'] - contagens['inicio']).iloc[0]) if len(contagens) else None)
+        hist_plot.update_layout(bargap=0.2)
+    
+    insights = {
+        "Resumo": "A análise revela padrões claros sobre o impacto dos descontos aplicados na quantidade de itens vendidos.",
+        "Observações": [
+            "A relação entre descontos e quantidade vendida foi fraca ou inexistente neste caso específico.",
+            "Os descontos podem não ser o principal fator que impulsiona as vendas, indicando a necessidade de avaliar outros aspectos."
+        ],
+        "Recomendações": [
+            "Explore estratégias alternativas, como melhorar a comunicação sobre o valor dos produtos.",
+            "Reforce as campanhas de marketing para destacar benefícios além do preço reduzido."
+        ]
+    }
+    
+    return scatter_plot, hist_plot, insights
+
+
+@instrumentar('analise')
+def analisar_desempenho_mensal(desempenho):
+    """
+    Analisa o desempenho mensal dos representantes a partir do armazém materializado
+    (src/desempenho.py), sem ler as vendas linha a linha.
+
+    Parâmetros:
+    - desempenho (dict): Agregados de src.desempenho.obter_desempenho (já restritos às partições filtradas).
+
+    Retorna:
+    - tuple: (gráfico mensal, mapa região x representante, tabela por representante e região, insights).
+    """
+    import plotly.express as px
+
+    from src.desempenho import tabela_desempenho
+
+    mensal = tabela_desempenho(desempenho, ['month', 'Sales_Rep'])
+    if mensal.empty:
+        raise ValueError("Nenhuma venda corresponde aos filtros selecionados.")
+    por_regiao = tabela_desempenho(desempenho, ['Sales_Rep', 'Region'])
+    por_representante = tabela_desempenho(desempenho, ['Sales_Rep']).sort_values('total_sales', ascending=False)
+    aproximado = desempenho['distintos'] == 'hll'
+
+    with construindo_figuras():
+        line_chart = px.line(
+            mensal, x='month', y='total_sales', color='Sales_Rep', markers=True,
+            title="Total de Vendas Mensal por Representante",
+            labels={'month': "Mês", 'total_sales': "Total de Vendas (R$)", 'Sales_Rep': "Representante"}
+        )
+        heatmap = px.imshow(
+            por_regiao.pivot(index='Region', columns='Sales_Rep', values='total_sales').fillna(0),
+            text_auto='.3s', aspect='auto', color_continuous_scale='Blues',
+            title="Total de Vendas por Região e Representante",
+            labels={'x': "Representante", 'y': "Região", 'color': "Total (R$)"}
+        )
+
+    melhor = por_representante.iloc[0]
+    pior = por_representante.iloc[-1]
+    melhor_mes = mensal.loc[mensal['total_sales'].idxmax()]
+    insights = {
+        "Resumo": "Desempenho mensal dos representantes por região e canal, servido pelo armazém materializado.",
+        "Observações": [
+            f"O representante com maior volume foi '{melhor['Sales_Rep']}', totalizando R$ {melhor['total_sales']:,.2f} "
+            f"em {melhor['sales_count']:,} vendas.",
+            f"O representante com menor volume foi '{pior['Sales_Rep']}', totalizando R$ {pior['total_sales']:,.2f}.",
+            f"O melhor mês individual foi {melhor_mes['month']}, de '{melhor_mes['Sales_Rep']}', "
+            f"com R$ {melhor_mes['total_sales']:,.2f}."
+        ],
+        "Clientes Novos": ("Contagem distinta estimada por HyperLogLog." if aproximado
+                           else "Contagem distinta exata."),
+        "Ranking": por_representante.to_dict(orient='records')
+    }
+
+    return line_chart, heatmap, por_regiao, insights
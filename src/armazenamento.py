@@ -0,0 +1,149 @@
+import os
+import uuid
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+except ImportError:  # pyarrow é opcional; apenas o formato colunar depende dele
+    pa = None
+
+# Nome da coluna de partição (ano-mês da venda)
+COLUNA_PARTICAO = 'mes'
+
+FORMATOS = {'parquet': 'parquet', 'arrow': 'ipc'}
+
+
+def _verificar_pyarrow():
+    if pa is None:
+        raise ImportError("O formato colunar requer o pacote 'pyarrow' (pip install pyarrow).")
+
+
+def _particionamento():
+    return ds.partitioning(pa.schema([(COLUNA_PARTICAO, pa.string())]), flavor='hive')
+
+
+def mes_da_data(datas):
+    """
+    Converte uma série de datas para o rótulo de partição 'AAAA-MM'.
+    """
+    return pd.to_datetime(datas).dt.strftime('%Y-%m')
+
+
+def salvar_colunar(df, diretorio_saida, coluna_data='Sale_Date', formato='parquet', anexar=False):
+    """
+    Salva o DataFrame em formato colunar (Parquet ou Arrow IPC), particionado por mês da venda.
+
+    Cada mês é gravado em um subdiretório 'mes=AAAA-MM'. Partições já existentes
+    para os meses presentes em df são substituídas; as demais são preservadas.
+    Com anexar=True, os arquivos são adicionados às partições existentes sem substituí-las.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame a ser salvo.
+    - diretorio_saida (str): Diretório raiz do dataset colunar.
+    - coluna_data (str): Coluna de datas usada para o particionamento.
+    - formato (str): 'parquet' ou 'arrow'.
+    - anexar (bool): Se True, adiciona novos arquivos às partições em vez de substituí-las.
+
+    Retorna:
+    - list: Meses (partições) gravados.
+    """
+    _verificar_pyarrow()
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: '{formato}'. Use um de {list(FORMATOS)}.")
+    if coluna_data not in df.columns:
+        raise ValueError(f"A coluna '{coluna_data}' não está presente no DataFrame.")
+
+    dados = df.copy()
+    dados[COLUNA_PARTICAO] = mes_da_data(dados[coluna_data])
+    tabela = pa.Table.from_pandas(dados, preserve_index=False)
+
+    ds.write_dataset(
+        tabela, diretorio_saida,
+        format=FORMATOS[formato],
+        partitioning=_particionamento(),
+        basename_template=(f'parte-{uuid.uuid4().hex}-{{i}}.' if anexar else 'parte-{i}.') + formato,
+        existing_data_behavior='overwrite_or_ignore' if anexar else 'delete_matching'
+    )
+
+    return sorted(dados[COLUNA_PARTICAO].unique())
+
+
+def _abrir_dataset(diretorio, formato):
+    # use_mmap faz a leitura mapear os arquivos em memória em vez de copiá-los
+    sistema = fs.LocalFileSystem(use_mmap=True)
+    return ds.dataset(diretorio, format=FORMATOS[formato], partitioning=_particionamento(), filesystem=sistema)
+
+
+def detectar_formato(diretorio):
+    """
+    Identifica o formato de um dataset colunar pela extensão dos arquivos.
+    """
+    for _, _, arquivos in os.walk(diretorio):
+        for arquivo in arquivos:
+            extensao = arquivo.rsplit('.', 1)[-1]
+            if extensao in FORMATOS:
+                return extensao
+    raise FileNotFoundError(f"Nenhum arquivo Parquet/Arrow encontrado em '{diretorio}'.")
+
+
+def listar_meses(diretorio):
+    """
+    Lista as partições (meses) disponíveis no dataset colunar.
+    """
+    prefixo = COLUNA_PARTICAO + '='
+    return sorted(nome[len(prefixo):] for nome in os.listdir(diretorio) if nome.startswith(prefixo))
+
+
+def ler_colunar(diretorio, colunas=None, data_inicio=None, data_fim=None, meses=None, coluna_data='Sale_Date'):
+    """
+    Lê o dataset colunar carregando apenas as colunas e os meses solicitados.
+
+    As partições fora do intervalo não são abertas e os arquivos são mapeados em memória.
+
+    Parâmetros:
+    - diretorio (str): Diretório raiz do dataset colunar.
+    - colunas (list, opcional): Colunas a serem lidas. Se None, lê todas.
+    - data_inicio (str ou datetime, opcional): Data inicial (inclusiva).
+    - data_fim (str ou datetime, opcional): Data final (inclusiva).
+    - meses (list, opcional): Lista de meses 'AAAA-MM' a serem lidos.
+    - coluna_data (str): Coluna de datas usada no filtro por intervalo.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com as colunas e linhas selecionadas.
+    """
+    _verificar_pyarrow()
+    if not os.path.isdir(diretorio):
+        raise FileNotFoundError(f"Diretório '{diretorio}' não encontrado.")
+
+    dataset = _abrir_dataset(diretorio, detectar_formato(diretorio))
+    disponiveis = [nome for nome in dataset.schema.names if nome != COLUNA_PARTICAO]
+    if colunas is not None:
+        colunas_invalidas = [col for col in colunas if col not in disponiveis]
+        if colunas_invalidas:
+            raise ValueError(f"Colunas inválidas: {colunas_invalidas}")
+    else:
+        colunas = disponiveis
+
+    # Filtro sobre a partição (poda de meses) e, quando houver intervalo, sobre as linhas
+    filtro = None
+    campo_mes = ds.field(COLUNA_PARTICAO)
+    if meses is not None:
+        filtro = campo_mes.isin(list(meses))
+    if data_inicio is not None:
+        inicio = pd.Timestamp(data_inicio)
+        filtro = _combinar(filtro, campo_mes >= inicio.strftime('%Y-%m'))
+        filtro = filtro & (ds.field(coluna_data) >= pa.scalar(inicio.to_pydatetime(), pa.timestamp('us')))
+    if data_fim is not None:
+        fim = pd.Timestamp(data_fim)
+        filtro = _combinar(filtro, campo_mes <= fim.strftime('%Y-%m'))
+        filtro = filtro & (ds.field(coluna_data) <= pa.scalar(fim.to_pydatetime(), pa.timestamp('us')))
+
+    tabela = dataset.to_table(columns=list(colunas), filter=filtro)
+    return tabela.to_pandas()
+
+
+def _combinar(filtro, condicao):
+    return condicao if filtro is None else filtro & condicao
@@ -0,0 +1,260 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.instrumentacao import instrumentar
+from src.tipos import COLUNAS_VIRTUAIS, adicionar_colunas_virtuais, otimizar_tipos
+
+# Tipos explícitos das colunas do dataset processado.
+# Sales_Amount permanece em float64 porque é a medida somada em todas as análises
+# e o float32 perderia centavos nos totais.
+TIPOS_COLUNAS = {
+    'Product_ID': 'int32',
+    'Sales_Rep': 'category',
+    'Region': 'category',
+    'Sales_Amount': 'float64',
+    'Quantity_Sold': 'int16',
+    'Product_Category': 'category',
+    'Unit_Cost': 'float32',
+    'Unit_Price': 'float32',
+    'Customer_Type': 'category',
+    'Discount': 'float32',
+    'Payment_Method': 'category',
+    'Sales_Channel': 'category',
+    'Region_and_Sales_Rep': 'category'
+}
+
+COLUNAS_DATA = ['Sale_Date']
+
+# Limite de memória do cache (em bytes), configurável por variável de ambiente
+LIMITE_MEMORIA_CACHE = int(os.environ.get('SALES_CACHE_MAX_BYTES', 1024 ** 3))
+
+_cache = OrderedDict()
+_trava = threading.Lock()
+
+
+def chave_arquivo(caminho_arquivo):
+    """
+    Gera a chave de versão de um arquivo a partir do caminho, data de modificação e tamanho.
+
+    Parâmetros:
+    - caminho_arquivo (str): Caminho do arquivo.
+
+    Retorna:
+    - tuple: (caminho absoluto, mtime em nanossegundos, tamanho em bytes).
+    """
+    estado = os.stat(caminho_arquivo)
+    if not os.path.isdir(caminho_arquivo):
+        return (os.path.abspath(caminho_arquivo), estado.st_mtime_ns, estado.st_size)
+
+    # Dataset colunar: a versão considera todos os arquivos das partições
+    mtime, tamanho = estado.st_mtime_ns, 0
+    for raiz, _, arquivos in os.walk(caminho_arquivo):
+        for arquivo in arquivos:
+            estado_arquivo = os.stat(os.path.join(raiz, arquivo))
+            mtime = max(mtime, estado_arquivo.st_mtime_ns)
+            tamanho += estado_arquivo.st_size
+    return (os.path.abspath(caminho_arquivo), mtime, tamanho)
+
+
+def ler_csv_tipado(caminho_arquivo, colunas=None):
+    """
+    Lê o CSV processado aplicando os tipos definidos em TIPOS_COLUNAS.
+
+    Parâmetros:
+    - caminho_arquivo (str): Caminho do arquivo CSV.
+    - colunas (list, opcional): Colunas a serem lidas. Se None, lê todas.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com os tipos aplicados.
+    """
+    cabecalho = pd.read_csv(caminho_arquivo, nrows=0).columns
+    if colunas is not None:
+        colunas_invalidas = [col for col in colunas if col not in cabecalho]
+        if colunas_invalidas:
+            raise ValueError(f"Colunas inválidas: {colunas_invalidas}")
+        cabecalho = [col for col in cabecalho if col in colunas]
+
+    tipos = {col: tipo for col, tipo in TIPOS_COLUNAS.items() if col in cabecalho}
+    datas = [col for col in COLUNAS_DATA if col in cabecalho]
+
+    return pd.read_csv(caminho_arquivo, usecols=list(cabecalho), dtype=tipos, parse_dates=datas)
+
+
+@instrumentar('carga')
+def ler_dados_tipados(caminho, colunas=None):
+    """
+    Lê o dataset processado a partir do CSV ou do diretório colunar (Parquet/Arrow).
+
+    Parâmetros:
+    - caminho (str): Caminho do arquivo CSV ou do diretório colunar.
+    - colunas (list, opcional): Colunas a serem lidas. Se None, lê todas.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com os tipos aplicados e compactado (ver compactar_dados).
+    """
+    if not os.path.isdir(caminho):
+        dados = ler_csv_tipado(caminho, colunas)
+    else:
+        from src.armazenamento import ler_colunar
+
+        dados = ler_colunar(caminho, colunas)
+        tipos = {col: tipo for col, tipo in TIPOS_COLUNAS.items() if col in dados.columns}
+        dados = dados.astype(tipos)
+    return compactar_dados(dados, colunas)
+
+
+def compactar_dados(dados, colunas=None):
+    """
+    Reduz a memória do DataFrame carregado com src.tipos.otimizar_tipos: inteiros no menor tipo que
+    cobre o domínio e colunas virtuais (ex.: Region_and_Sales_Rep) fora da memória. As colunas
+    virtuais pedidas explicitamente em colunas são recriadas a partir dos códigos das colunas de origem.
+
+    Parâmetros:
+    - dados (pandas.DataFrame): DataFrame lido com TIPOS_COLUNAS.
+    - colunas (list, opcional): Colunas pedidas na carga. Se None, todas.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame compactado.
+    """
+    ordem = list(dados.columns)
+    dados, _ = otimizar_tipos(dados)
+    if colunas is not None:
+        dados = adicionar_colunas_virtuais(dados, [col for col in colunas if col in COLUNAS_VIRTUAIS])
+    return dados[[col for col in ordem if col in dados.columns]]
+
+
+def caminho_preferencial(caminho_csv, sufixo_colunar='_parquet'):
+    """
+    Retorna o diretório colunar gerado ao lado do CSV, quando existir e o pyarrow estiver disponível.
+    Caso contrário, retorna o próprio CSV.
+
+    Parâmetros:
+    - caminho_csv (str): Caminho do arquivo CSV processado.
+    - sufixo_colunar (str): Sufixo do diretório colunar (ex.: 'sales_data_atualizado_parquet').
+
+    Retorna:
+    - str: Caminho a ser carregado.
+    """
+    from src.armazenamento import pa
+
+    diretorio = os.path.splitext(caminho_csv)[0] + sufixo_colunar
+    if pa is not None and os.path.isdir(diretorio):
+        return diretorio
+    return caminho_csv
+
+
+def memoria_dataframe(df):
+    """
+    Calcula a memória residente de um DataFrame em bytes (incluindo strings e categorias).
+    """
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _liberar_memoria(limite):
+    # Remove as entradas menos usadas recentemente até respeitar o limite
+    total = sum(entrada['memoria_bytes'] for entrada in _cache.values())
+    while len(_cache) > 1 and total > limite:
+        _, removida = _cache.popitem(last=False)
+        total -= removida['memoria_bytes']
+
+
+def carregar_vendas(caminho_arquivo, colunas=None):
+    """
+    Carrega o dataset processado usando um cache compartilhado pelo processo.
+
+    O arquivo só é lido novamente quando sua data de modificação ou tamanho mudam.
+    O DataFrame retornado é compartilhado entre as chamadas e não deve ser modificado;
+    use .copy() antes de alterar colunas.
+
+    Parâmetros:
+    - caminho_arquivo (str): Caminho do arquivo CSV ou do diretório colunar processado.
+    - colunas (list, opcional): Colunas a serem carregadas. Se None, carrega todas.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com os dados tipados.
+    """
+    return carregar_vendas_com_info(caminho_arquivo, colunas)[0]
+
+
+def carregar_vendas_com_info(caminho_arquivo, colunas=None):
+    """
+    Igual a carregar_vendas, mas também retorna as informações da carga.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com os dados tipados.
+    - dict: Tempo de carga (s), memória residente (bytes) e se veio do cache.
+    """
+    versao = chave_arquivo(caminho_arquivo)
+    chave = (versao, tuple(colunas) if colunas is not None else None)
+
+    with _trava:
+        entrada = _cache.get(chave)
+        if entrada is not None:
+            _cache.move_to_end(chave)
+            return entrada['dados'], _informacoes(entrada, do_cache=True)
+
+    inicio = time.perf_counter()
+    dados = ler_dados_tipados(caminho_arquivo, colunas)
+    entrada = {
+        'dados': dados,
+        'tempo_carga': time.perf_counter() - inicio,
+        'memoria_bytes': memoria_dataframe(dados),
+        'linhas': len(dados)
+    }
+
+    with _trava:
+        # Descarta versões antigas do mesmo arquivo
+        for chave_antiga in [c for c in _cache if c[0][0] == versao[0] and c[0] != versao]:
+            del _cache[chave_antiga]
+        _cache[chave] = entrada
+        _liberar_memoria(LIMITE_MEMORIA_CACHE)
+
+    return dados, _informacoes(entrada, do_cache=False)
+
+
+def _informacoes(entrada, do_cache):
+    return {
+        'Tempo de Carga (s)': entrada['tempo_carga'],
+        'Memória (MB)': entrada['memoria_bytes'] / 1024 ** 2,
+        'Linhas': entrada['linhas'],
+        'Do Cache': do_cache
+    }
+
+
+def descrever_carga(info):
+    """
+    Monta um texto curto com o tempo de carga e a memória ocupada, para exibição nos relatórios.
+    """
+    origem = 'cache' if info['Do Cache'] else 'arquivo'
+    return (f"{info['Linhas']:,} linhas carregadas do {origem} em {info['Tempo de Carga (s)']:.2f} s "
+            f"· {info['Memória (MB)']:.1f} MB em memória")
+
+
+def estatisticas_cache():
+    """
+    Retorna um resumo das entradas mantidas no cache.
+
+    Retorna:
+    - pandas.DataFrame: Uma linha por entrada com arquivo, linhas, memória e tempo de carga.
+    """
+    with _trava:
+        linhas = [{
+            'Arquivo': chave[0][0],
+            'Colunas': 'todas' if chave[1] is None else ', '.join(chave[1]),
+            'Linhas': entrada['linhas'],
+            'Memória (MB)': entrada['memoria_bytes'] / 1024 ** 2,
+            'Tempo de Carga (s)': entrada['tempo_carga']
+        } for chave, entrada in _cache.items()]
+    return pd.DataFrame(linhas)
+
+
+def limpar_cache():
+    """
+    Esvazia o cache de dados.
+    """
+    with _trava:
+        _cache.clear()
@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+COLUNAS_CESTA = ['product_pair', 'support_count', 'confidence', 'lift_ratio']
+
+# Equivalente ao filtro support_count > 10 de sql/advanced_queries/market_basket.sql
+SUPORTE_MINIMO = 11
+
+
+def matriz_transacoes(dados, coluna_transacao='Sale_Date', coluna_item='Product_ID', tamanho_bloco=1_000_000):
+    """
+    Monta a matriz esparsa binária transação x item (1 = o item aparece na transação).
+
+    Os pares (transação, item) são deduplicados bloco a bloco e a matriz é montada uma única vez
+    a partir deles, de modo que a memória fica limitada aos pares distintos, e não ao número de
+    linhas dos dados.
+
+    Parâmetros:
+    - dados (pandas.DataFrame): DataFrame com as vendas.
+    - coluna_transacao (str ou list): Coluna(s) que identificam a transação (cesta).
+      O padrão, Sale_Date, segue market_basket.sql: uma cesta por dia.
+    - coluna_item (str): Coluna com o item.
+    - tamanho_bloco (int): Linhas processadas por bloco.
+
+    Retorna:
+    - tuple: (scipy.sparse.csr_matrix int32 de 0/1, numpy.ndarray com os rótulos dos itens).
+    """
+    colunas_transacao = [coluna_transacao] if isinstance(coluna_transacao, str) else list(coluna_transacao)
+    colunas_invalidas = [col for col in colunas_transacao + [coluna_item] if col not in dados.columns]
+    if colunas_invalidas:
+        raise ValueError(f"Colunas inválidas: {colunas_invalidas}")
+
+    # Pares (transação, item) distintos de cada bloco; linhas com transação ou item nulo ficam de fora
+    colunas = colunas_transacao + [coluna_item]
+    pares = pd.concat(
+        [dados.iloc[inicio:inicio + tamanho_bloco][colunas].dropna().drop_duplicates()
+         for inicio in range(0, len(dados), tamanho_bloco)] or [dados[colunas].iloc[:0]],
+        ignore_index=True).drop_duplicates()
+
+    # Códigos atribuídos apenas aos pares distintos, e a matriz montada uma única vez
+    if len(colunas_transacao) == 1:
+        transacoes, _ = pd.factorize(pares[colunas_transacao[0]])
+    else:
+        transacoes = pares.groupby(colunas_transacao, observed=True, sort=False).ngroup().to_numpy()
+    itens, rotulos = pd.factorize(pares[coluna_item], sort=True)
+    formato = (int(transacoes.max()) + 1 if len(transacoes) else 0, len(rotulos))
+    matriz = sparse.coo_matrix((np.ones(len(pares), dtype=np.int32), (transacoes, itens)), shape=formato).tocsr()
+    return matriz, np.asarray(rotulos)
+
+
+def contar_pares(matriz, tamanho_bloco=1_000_000):
+    """
+    Conta, para cada par de itens, as transações em que ambos aparecem (produto esparso XᵀX).
+
+    Retorna:
+    - scipy.sparse.csr_matrix: Matriz item x item; a diagonal contém o suporte de cada item.
+    """
+    contagens = sparse.csr_matrix((matriz.shape[1], matriz.shape[1]), dtype=np.int64)
+    for inicio in range(0, matriz.shape[0], tamanho_bloco):
+        bloco = matriz[inicio:inicio + tamanho_bloco].astype(np.int64)
+        contagens = contagens + (bloco.T @ bloco).tocsr()
+    return contagens
+
+
+def _rotulo_conjunto(rotulos):
+    return ' & '.join(str(rotulo) for rotulo in rotulos)
+
+
+def analisar_cesta(dados, coluna_transacao='Sale_Date', coluna_item='Product_ID', suporte_minimo=SUPORTE_MINIMO,
+                   lift_minimo=1.0, tamanho_maximo=2, tamanho_bloco=1_000_000):
+    """
+    Regras de associação entre itens (market basket), no formato de sql/advanced_queries/market_basket.sql.
+
+    Para pares (tamanho_maximo=2), as contagens vêm do produto esparso XᵀX. Para conjuntos maiores,
+    usa a mineração por crescimento de padrões (itemsets_frequentes). Em ambos os casos, a regra de um
+    conjunto ordenado (a1, ..., ak) é {a1, ..., ak-1} -> ak, como p1 -> p2 no SQL:
+    confidence = suporte(conjunto) / suporte(a1..ak-1) e lift_ratio = confidence / (suporte(ak) / transações).
+
+    Parâmetros:
+    - dados (pandas.DataFrame): DataFrame com as vendas.
+    - coluna_transacao (str ou list): Coluna(s) que identificam a transação.
+    - coluna_item (str): Coluna com o item.
+    - suporte_minimo (int): Número mínimo de transações com o conjunto (o SQL usa support_count > 10).
+    - lift_minimo (float): Mantém apenas as regras com lift_ratio acima deste valor.
+    - tamanho_maximo (int): Tamanho máximo dos conjuntos de itens (2 = pares).
+    - tamanho_bloco (int): Linhas (ou transações) processadas por bloco.
+
+    Retorna:
+    - pandas.DataFrame: Colunas product_pair, support_count, confidence e lift_ratio,
+      ordenadas por lift_ratio decrescente.
+    """
+    if tamanho_maximo < 2:
+        raise ValueError("tamanho_maximo deve ser pelo menos 2.")
+
+    matriz, rotulos = matriz_transacoes(dados, coluna_transacao, coluna_item, tamanho_bloco)
+    total_transacoes = matriz.shape[0]
+    if tamanho_maximo > 2:
+        conjuntos = itemsets_frequentes(matriz, rotulos, suporte_minimo, tamanho_maximo)
+        regras = regras_associacao(conjuntos, total_transacoes)
+        regras = regras[regras['lift_ratio'] > lift_minimo]
+        return regras[COLUNAS_CESTA].sort_values('lift_ratio', ascending=False, ignore_index=True)
+
+    # Itens abaixo do suporte mínimo não formam pares frequentes: saem antes do produto
+    suporte_itens = matriz.getnnz(axis=0)
+    frequentes = np.flatnonzero(suporte_itens >= suporte_minimo)
+    contagens = sparse.triu(contar_pares(matriz[:, frequentes], tamanho_bloco), k=1).tocoo()
+
+    selecionados = contagens.data >= suporte_minimo
+    linha, coluna, suporte = contagens.row[selecionados], contagens.col[selecionados], contagens.data[selecionados]
+    suporte_1 = suporte_itens[frequentes][linha]
+    suporte_2 = suporte_itens[frequentes][coluna]
+    confianca = suporte / suporte_1
+    lift = confianca / (suporte_2 / total_transacoes)
+
+    resultado = pd.DataFrame({
+        'product_pair': [_rotulo_conjunto(par) for par in zip(rotulos[frequentes][linha], rotulos[frequentes][coluna])],
+        'support_count': suporte.astype('int64'),
+        'confidence': confianca,
+        'lift_ratio': lift
+    })
+    resultado = resultado[resultado['lift_ratio'] > lift_minimo]
+    return resultado.sort_values('lift_ratio', ascending=False, ignore_index=True)
+
+
+def _crescer(matriz, linhas, prefixo, primeira_coluna, suporte_minimo, tamanho_maximo, saida):
+    # Base projetada (condicional) do prefixo: apenas as transações que o contêm
+    projetada = matriz[linhas].tocsc()
+    suportes = np.diff(projetada.indptr)
+    for coluna in np.flatnonzero(suportes[primeira_coluna:] >= suporte_minimo) + primeira_coluna:
+        conjunto = prefixo + (int(coluna),)
+        saida.append((conjunto, int(suportes[coluna])))
+        if len(conjunto) < tamanho_maximo:
+            linhas_com_item = linhas[projetada.indices[projetada.indptr[coluna]:projetada.indptr[coluna + 1]]]
+            _crescer(matriz, np.sort(linhas_com_item), conjunto, coluna + 1, suporte_minimo, tamanho_maximo, saida)
+
+
+def itemsets_frequentes(matriz, rotulos, suporte_minimo=SUPORTE_MINIMO, tamanho_maximo=3):
+    """
+    Conjuntos de itens frequentes por crescimento de padrões (no estilo do FP-growth).
+
+    Cada prefixo frequente é estendido apenas dentro da sua base projetada (as transações que o
+    contêm), e o suporte de todas as extensões é obtido de uma vez pela contagem das colunas
+    da submatriz esparsa, sem gerar candidatos nem percorrer os dados a cada nível.
+
+    Parâmetros:
+    - matriz (scipy.sparse matrix): Matriz binária transação x item (ver matriz_transacoes).
+    - rotulos (array-like): Rótulo de cada coluna da matriz.
+    - suporte_minimo (int): Número mínimo de transações com o conjunto.
+    - tamanho_maximo (int): Tamanho máximo dos conjuntos.
+
+    Retorna:
+    - pandas.DataFrame: Colunas 'itens' (tupla de rótulos, na ordem das colunas), 'tamanho',
+      'support_count' e 'support'.
+    """
+    matriz = sparse.csr_matrix(matriz)
+    rotulos = np.asarray(rotulos)
+    saida = []
+    _crescer(matriz, np.arange(matriz.shape[0]), (), 0, suporte_minimo, tamanho_maximo, saida)
+
+    total_transacoes = matriz.shape[0]
+    return pd.DataFrame({
+        'itens': [tuple(rotulos[list(conjunto)].tolist()) for conjunto, _ in saida],
+        'tamanho': [len(conjunto) for conjunto, _ in saida],
+        'support_count': np.array([suporte for _, suporte in saida], dtype='int64'),
+        'support': np.array([suporte / total_transacoes for _, suporte in saida], dtype='float64')
+    }, columns=['itens', 'tamanho', 'support_count', 'support'])
+
+
+def regras_associacao(conjuntos, total_transacoes):
+    """
+    Regras {a1, ..., ak-1} -> ak a partir dos conjuntos frequentes (ver itemsets_frequentes).
+
+    Todos os subconjuntos de um conjunto frequente também são frequentes, então o suporte do
+    antecedente e do consequente está sempre disponível na própria tabela.
+
+    Retorna:
+    - pandas.DataFrame: Colunas product_pair, antecedente, consequente, support_count, confidence e lift_ratio.
+    """
+    suportes = dict(zip(conjuntos['itens'], conjuntos['support_count']))
+    regras = []
+    for itens, suporte in suportes.items():
+        if len(itens) < 2:
+            continue
+        antecedente, consequente = itens[:-1], itens[-1]
+        confianca = suporte / suportes[antecedente]
+        regras.append({
+            'product_pair': _rotulo_conjunto(itens),
+            'antecedente': antecedente,
+            'consequente': consequente,
+            'support_count': suporte,
+            'confidence': confianca,
+            'lift_ratio': confianca / (suportes[(consequente,)] / total_transacoes)
+        })
+    return pd.DataFrame(regras, columns=['product_pair', 'antecedente', 'consequente', 'support_count',
+                                         'confidence', 'lift_ratio'])
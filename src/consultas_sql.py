@@ -0,0 +1,649 @@
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.carregamento import carregar_vendas
+from src.cubo import versao_dados
+
+try:
+    import duckdb
+except ImportError:  # duckdb é opcional; sem ele, o motor usa o sqlite3 da biblioteca padrão
+    duckdb = None
+
+DIRETORIO_SQL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sql')
+
+TABELA_PRINCIPAL = 'main_table'
+
+# Índices criados no SQLite (o DuckDB usa zonemaps por bloco e dispensa índices para estas consultas)
+INDICES_SQLITE = {
+    'idx_main_sale_date': ['Sale_Date'],
+    'idx_main_region': ['Region'],
+    'idx_main_category': ['Product_Category'],
+    'idx_main_payment': ['Payment_Method'],
+    'idx_main_sales_rep': ['Sales_Rep'],
+    'idx_main_product': ['Product_ID'],
+    'idx_main_region_channel': ['Region', 'Sales_Channel']
+}
+
+# Campos de EXTRACT(... FROM data) traduzidos para o strftime do SQLite
+CAMPOS_DATA = {'YEAR': '%Y', 'MONTH': '%m', 'DAY': '%d'}
+
+# Palavras que podem seguir 'FROM main_table' sem ser um alias da tabela
+PALAVRAS_APOS_TABELA = ('WHERE', 'GROUP', 'ORDER', 'HAVING', 'LIMIT', 'WINDOW', 'UNION', 'JOIN', 'LEFT', 'RIGHT',
+                        'INNER', 'FULL', 'CROSS', 'ON', 'USING')
+
+_motores = {}
+_trava = threading.Lock()
+
+
+def dividir_comandos(sql):
+    """
+    Divide um script em comandos, separando por ';' fora de strings e comentários.
+
+    Retorna:
+    - list: Comandos sem os comentários e sem o ';' final (comandos vazios são descartados).
+    """
+    comandos, atual = [], []
+    i, tamanho = 0, len(sql)
+    while i < tamanho:
+        caractere = sql[i]
+        if caractere == "'":
+            fim = i + 1
+            while fim < tamanho:
+                if sql[fim] == "'" and sql[fim + 1:fim + 2] == "'":
+                    fim += 2
+                    continue
+                if sql[fim] == "'":
+                    break
+                fim += 1
+            atual.append(sql[i:fim + 1])
+            i = fim + 1
+        elif sql.startswith('--', i):
+            fim = sql.find('\n', i)
+            i = tamanho if fim == -1 else fim
+        elif sql.startswith('/*', i):
+            fim = sql.find('*/', i + 2)
+            i = tamanho if fim == -1 else fim + 2
+            atual.append(' ')
+        elif caractere == ';':
+            comandos.append(''.join(atual))
+            atual = []
+            i += 1
+        else:
+            atual.append(caractere)
+            i += 1
+    comandos.append(''.join(atual))
+    return [comando.strip() for comando in comandos if comando.strip()]
+
+
+def _substituir_filtro(correspondencia):
+    funcao, argumento, condicao = correspondencia.group(1), correspondencia.group(2).strip(), correspondencia.group(3)
+    distinto = ''
+    if argumento.upper().startswith('DISTINCT '):
+        distinto, argumento = 'DISTINCT ', argumento[9:].strip()
+    valor = '1' if argumento == '*' else argumento
+    return f'{funcao}({distinto}CASE WHEN {condicao} THEN {valor} END)'
+
+
+def _formato_strftime(formato):
+    # Subconjunto dos padrões do TO_CHAR usados nos scripts
+    for padrao, equivalente in (('YYYY', '%Y'), ('MM', '%m'), ('DD', '%d'), ('HH24', '%H'), ('MI', '%M'), ('SS', '%S')):
+        formato = formato.replace(padrao, equivalente)
+    return formato
+
+
+def traduzir_sql(sql, dialeto):
+    """
+    Traduz as construções exclusivas do PostgreSQL usadas nos scripts de sql/ para o dialeto do motor.
+
+    Construções traduzidas: TO_CHAR(data, 'YYYY-MM'), EXTRACT(MONTH FROM AGE(a, b)), EXTRACT(YEAR FROM data),
+    AGG(...) FILTER (WHERE ...), ARRAY_AGG(DISTINCT ...), x = ANY(lista), x::TIPO e CREATE INDEX ... USING BRIN.
+
+    Parâmetros:
+    - sql (str): Comando no dialeto do PostgreSQL (sem ';').
+    - dialeto (str): 'duckdb' ou 'sqlite'.
+
+    Retorna:
+    - str: Comando traduzido.
+    """
+    if dialeto not in ('duckdb', 'sqlite'):
+        raise ValueError(f"Dialeto inválido: '{dialeto}'. Use 'duckdb' ou 'sqlite'.")
+
+    def to_char(correspondencia):
+        expressao, formato = correspondencia.group(1), _formato_strftime(correspondencia.group(2))
+        if dialeto == 'duckdb':
+            return f"strftime({expressao}, '{formato}')"
+        return f"strftime('{formato}', {expressao})"
+
+    sql = re.sub(r"TO_CHAR\(\s*([^,()]+?)\s*,\s*'([^']*)'\s*\)", to_char, sql, flags=re.IGNORECASE)
+    sql = re.sub(r'(\w+)\(([^()]*)\)\s*FILTER\s*\(\s*WHERE\s+([^()]*?)\s*\)', _substituir_filtro, sql,
+                 flags=re.IGNORECASE)
+    sql = re.sub(r'\s+USING\s+BRIN\s*\(', ' (', sql, flags=re.IGNORECASE)
+
+    if dialeto == 'duckdb':
+        # NUMERIC sem precisão é exato no PostgreSQL, mas DECIMAL(18,3) no DuckDB
+        sql = re.sub(r'\bNUMERIC\b(?!\s*\()', 'DOUBLE', sql, flags=re.IGNORECASE)
+        return re.sub(r'([\w.]+)\s*=\s*ANY\(\s*([\w.]+)\s*\)', r'list_contains(\2, \1)', sql, flags=re.IGNORECASE)
+
+    # Meses completos entre as datas (componente de meses do intervalo, como no AGE do PostgreSQL)
+    sql = re.sub(
+        r'EXTRACT\(\s*MONTH\s+FROM\s+AGE\(\s*([^,()]+?)\s*,\s*([^,()]+?)\s*\)\s*\)',
+        lambda c: (f"(((CAST(strftime('%Y', {c.group(1)}) AS INTEGER) * 12 + CAST(strftime('%m', {c.group(1)}) AS INTEGER))"
+                   f" - (CAST(strftime('%Y', {c.group(2)}) AS INTEGER) * 12 + CAST(strftime('%m', {c.group(2)}) AS INTEGER))"
+                   f" - (CAST(strftime('%d', {c.group(1)}) AS INTEGER) < CAST(strftime('%d', {c.group(2)}) AS INTEGER))) % 12)"),
+        sql, flags=re.IGNORECASE)
+    sql = re.sub(r'EXTRACT\(\s*(YEAR|MONTH|DAY)\s+FROM\s+([^()]+?)\s*\)',
+                 lambda c: f"CAST(strftime('{CAMPOS_DATA[c.group(1).upper()]}', {c.group(2)}) AS INTEGER)",
+                 sql, flags=re.IGNORECASE)
+    sql = re.sub(r'ARRAY_AGG\(\s*DISTINCT\s+', 'json_group_array(DISTINCT ', sql, flags=re.IGNORECASE)
+    sql = re.sub(r'([\w.]+)\s*=\s*ANY\(\s*([\w.]+)\s*\)', r'\1 IN (SELECT value FROM json_each(\2))', sql,
+                 flags=re.IGNORECASE)
+    # ::INT arredonda no PostgreSQL (metade para longe do zero, como o ROUND do SQLite); o CAST trunca
+    sql = re.sub(r'([\w.]+)::(\w+)', lambda c: (f"CAST(ROUND({c.group(1)}) AS INTEGER)" if c.group(2).upper() == 'INT'
+                                                  else f"CAST({c.group(1)} AS {c.group(2)})"), sql)
+    return sql
+
+
+def _literal(valor):
+    if isinstance(valor, (bool, np.bool_)) or not isinstance(valor, (int, float, np.number)):
+        return "'" + str(valor).replace("'", "''") + "'"
+    return repr(valor.item() if isinstance(valor, np.generic) else valor)
+
+
+def clausula_filtros(filtros, coluna_data='Sale_Date'):
+    """
+    Traduz os filtros da barra lateral (chave de src.filtros.normalizar_filtros) em uma cláusula
+    WHERE sobre main_table, válida no DuckDB e no SQLite.
+
+    Parâmetros:
+    - filtros (tuple): (data_inicio, data_fim, ((dimensão, valores), ...)); data_fim é inclusiva.
+    - coluna_data (str): Coluna de datas filtrada pelo período.
+
+    Retorna:
+    - str: 'WHERE ...', ou '' quando os filtros não restringem nada.
+    """
+    inicio, fim, dimensoes = filtros
+    colunas_invalidas = [coluna for coluna in [coluna_data] + [dim for dim, _ in dimensoes] if not re.fullmatch(r'\w+', coluna)]
+    if colunas_invalidas:
+        raise ValueError(f"Colunas inválidas: {colunas_invalidas}")
+
+    # Datas como 'AAAA-MM-DD': comparáveis com TIMESTAMP no DuckDB e com o texto ISO do SQLite
+    condicoes = []
+    if inicio is not None:
+        condicoes.append(f"{coluna_data} >= '{pd.Timestamp(inicio):%Y-%m-%d}'")
+    if fim is not None:
+        condicoes.append(f"{coluna_data} < '{pd.Timestamp(fim).normalize() + pd.Timedelta(days=1):%Y-%m-%d}'")
+    for dimensao, valores in dimensoes:
+        condicoes.append(f"{dimensao} IN ({', '.join(_literal(valor) for valor in valores)})" if valores else '1 = 0')
+    return f"WHERE {' AND '.join(condicoes)}" if condicoes else ''
+
+
+def restringir_tabela(comando, clausula):
+    """
+    Substitui as leituras de main_table (FROM/JOIN, com ou sem alias) por uma subconsulta com a
+    cláusula WHERE, de modo que um script de sql/ rode sobre as vendas filtradas sem alterações.
+    """
+    if not clausula:
+        return comando
+    palavras = '|'.join(PALAVRAS_APOS_TABELA)
+
+    def subconsulta(correspondencia):
+        alias = correspondencia.group(2) or TABELA_PRINCIPAL
+        return f'{correspondencia.group(1)} (SELECT * FROM {TABELA_PRINCIPAL} {clausula}) AS {alias}'
+
+    return re.sub(rf'\b(FROM|JOIN)\s+{TABELA_PRINCIPAL}\b(?:\s+(?:AS\s+)?(?!(?:{palavras})\b)(\w+))?', subconsulta,
+                  comando, flags=re.IGNORECASE)
+
+
+class _Correlacao:
+    # Agregado CORR (Pearson) registrado no SQLite, que não o possui nativamente
+    def __init__(self):
+        self.n = self.soma_x = self.soma_y = self.soma_xx = self.soma_yy = self.soma_xy = 0.0
+
+    def step(self, x, y):
+        if x is None or y is None:
+            return
+        self.n += 1
+        self.soma_x += x
+        self.soma_y += y
+        self.soma_xx += x * x
+        self.soma_yy += y * y
+        self.soma_xy += x * y
+
+    def finalize(self):
+        if self.n < 2:
+            return None
+        cov = self.soma_xy - self.soma_x * self.soma_y / self.n
+        var_x = self.soma_xx - self.soma_x ** 2 / self.n
+        var_y = self.soma_yy - self.soma_y ** 2 / self.n
+        if var_x <= 0 or var_y <= 0:
+            return None
+        return cov / math.sqrt(var_x * var_y)
+
+
+def _nome_criado(comando):
+    correspondencia = re.match(r'CREATE\s+(?:OR\s+REPLACE\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)', comando,
+                               flags=re.IGNORECASE)
+    return correspondencia.group(1) if correspondencia else None
+
+
+def _resumo(comando):
+    return ' '.join(comando.split())[:80]
+
+
+class MotorSQL:
+    """
+    Motor SQL embarcado (DuckDB, ou SQLite indexado como alternativa) com o dataset carregado em main_table.
+
+    Permite executar os scripts de sql/ sem um servidor PostgreSQL e registra o tempo de cada consulta.
+    """
+
+    def __init__(self, dados, motor=None):
+        """
+        Parâmetros:
+        - dados (pandas.DataFrame): Vendas carregadas (ver src.carregamento.carregar_vendas).
+        - motor (str, opcional): 'duckdb' ou 'sqlite'. Se None, usa o DuckDB quando instalado.
+        """
+        if motor is None:
+            motor = 'duckdb' if duckdb is not None else 'sqlite'
+        if motor == 'duckdb' and duckdb is None:
+            raise ImportError("O motor 'duckdb' requer o pacote 'duckdb' (pip install duckdb).")
+        if motor not in ('duckdb', 'sqlite'):
+            raise ValueError(f"Motor inválido: '{motor}'. Use 'duckdb' ou 'sqlite'.")
+
+        self.motor = motor
+        self.historico = []
+        self._trava = threading.Lock()
+
+        inicio = time.perf_counter()
+        if motor == 'duckdb':
+            self._conexao = duckdb.connect()
+            self._conexao.register('_vendas', dados)
+            self._conexao.execute(f'CREATE TABLE {TABELA_PRINCIPAL} AS SELECT * FROM _vendas')
+            self._conexao.unregister('_vendas')
+        else:
+            self._conexao = sqlite3.connect(':memory:', check_same_thread=False)
+            self._conexao.create_aggregate('CORR', 2, _Correlacao)
+            tabela = dados.copy()
+            for coluna in tabela.columns:
+                if isinstance(tabela[coluna].dtype, pd.CategoricalDtype):
+                    tabela[coluna] = tabela[coluna].astype(str)
+                elif pd.api.types.is_datetime64_any_dtype(tabela[coluna]):
+                    # Datas como texto ISO: comparáveis e compatíveis com strftime do SQLite
+                    tabela[coluna] = tabela[coluna].dt.strftime('%Y-%m-%d')
+            tabela.to_sql(TABELA_PRINCIPAL, self._conexao, index=False, chunksize=100_000)
+            for nome, colunas in INDICES_SQLITE.items():
+                colunas_presentes = [coluna for coluna in colunas if coluna in tabela.columns]
+                if len(colunas_presentes) == len(colunas):
+                    self._conexao.execute(f'CREATE INDEX {nome} ON {TABELA_PRINCIPAL} ({", ".join(colunas)})')
+            self._conexao.execute('ANALYZE')
+        self.tempo_carga = time.perf_counter() - inicio
+        self.linhas = len(dados)
+
+    def consultar(self, sql, nome=None):
+        """
+        Executa um comando (já traduzido ou no dialeto do PostgreSQL) e mede o tempo.
+
+        Parâmetros:
+        - sql (str): Comando SQL.
+        - nome (str, opcional): Identificação da consulta no histórico de tempos.
+
+        Retorna:
+        - pandas.DataFrame ou None: Resultado do comando (None para comandos sem resultado).
+        """
+        comando = traduzir_sql(sql, self.motor)
+        inicio = time.perf_counter()
+        with self._trava:
+            if self.motor == 'duckdb':
+                relacao = self._conexao.execute(comando)
+                resultado = relacao.df() if relacao.description else None
+            else:
+                cursor = self._conexao.execute(comando)
+                resultado = None
+                if cursor.description:
+                    resultado = pd.DataFrame(cursor.fetchall(), columns=[coluna[0] for coluna in cursor.description])
+                self._conexao.commit()
+        tempo = time.perf_counter() - inicio
+        self.historico.append({
+            'Consulta': nome or _resumo(sql),
+            'Motor': self.motor,
+            'Tempo (s)': tempo,
+            'Linhas': 0 if resultado is None else len(resultado)
+        })
+        return resultado
+
+    def executar_script(self, caminho_script, filtros=None):
+        """
+        Executa todos os comandos de um script de sql/, um a um.
+
+        Tabelas criadas pelo script são recriadas a cada execução, e o conteúdo delas é
+        retornado como resultado do CREATE. Comandos sem equivalente no motor (particionamento
+        declarativo, índices parciais no DuckDB) são ignorados com uma observação, e erros de
+        um comando não interrompem os seguintes.
+
+        Parâmetros:
+        - caminho_script (str): Caminho do .sql (absoluto ou relativo a sql/).
+        - filtros (tuple, opcional): Chave de src.filtros.normalizar_filtros; as leituras de
+          main_table passam a considerar apenas as vendas filtradas (ver clausula_filtros).
+
+        Retorna:
+        - list: Um dict por comando com 'Comando', 'Resultado', 'Tempo (s)' e 'Observação'.
+        """
+        if not os.path.exists(caminho_script):
+            caminho_script = os.path.join(DIRETORIO_SQL, caminho_script)
+        with open(caminho_script, encoding='utf-8') as arquivo:
+            comandos = dividir_comandos(arquivo.read())
+        nome_script = os.path.splitext(os.path.basename(caminho_script))[0]
+        clausula = clausula_filtros(filtros) if filtros is not None else ''
+
+        execucoes = []
+        for comando in comandos:
+            execucao = {'Comando': _resumo(comando), 'Resultado': None, 'Tempo (s)': 0.0, 'Observação': ''}
+            execucoes.append(execucao)
+
+            if re.search(r'\bPARTITION\s+BY\s+LIST\b', comando, flags=re.IGNORECASE):
+                execucao['Observação'] = ('Particionamento declarativo não suportado pelo motor embarcado; '
+                                          'as partições por mês ficam no dataset colunar (src.armazenamento).')
+                continue
+            indice_parcial = re.match(r'CREATE\s+INDEX\b.*\bWHERE\b', comando, flags=re.IGNORECASE | re.DOTALL)
+            if indice_parcial and self.motor == 'duckdb':
+                execucao['Observação'] = ('O DuckDB não cria índices parciais; filtros por faixa usam '
+                                          'as estatísticas mín./máx. de cada bloco (zonemaps).')
+                continue
+
+            comando = restringir_tabela(comando, clausula)
+            tabela_criada = _nome_criado(comando)
+            inicio = time.perf_counter()
+            try:
+                if tabela_criada:
+                    self.consultar(f'DROP TABLE IF EXISTS {tabela_criada}', nome=f'{nome_script}: drop')
+                if re.match(r'CREATE\s+INDEX\s+(\w+)', comando, flags=re.IGNORECASE):
+                    nome_indice = re.match(r'CREATE\s+INDEX\s+(\w+)', comando, flags=re.IGNORECASE).group(1)
+                    self.consultar(f'DROP INDEX IF EXISTS {nome_indice}', nome=f'{nome_script}: drop')
+                resultado = self.consultar(comando, nome=nome_script)
+                if re.match(r'(CREATE|DROP)\b', comando, flags=re.IGNORECASE):
+                    resultado = None
+                if tabela_criada and re.search(r'\bAS\s+SELECT\b', ' '.join(comando.split()), flags=re.IGNORECASE):
+                    resultado = self.consultar(f'SELECT * FROM {tabela_criada}', nome=f'{nome_script}: {tabela_criada}')
+                elif re.match(r'INSERT\s+INTO\s+(\w+)', comando, flags=re.IGNORECASE):
+                    tabela = re.match(r'INSERT\s+INTO\s+(\w+)', comando, flags=re.IGNORECASE).group(1)
+                    resultado = self.consultar(f'SELECT * FROM {tabela}', nome=f'{nome_script}: {tabela}')
+                execucao['Resultado'] = resultado
+            except Exception as erro:  # erros do motor (duckdb.Error, sqlite3.Error) variam por biblioteca
+                execucao['Observação'] = f'Erro: {erro}'
+            execucao['Tempo (s)'] = time.perf_counter() - inicio
+        return execucoes
+
+    def consultar_script(self, caminho_script, filtros=None):
+        """
+        Executa um script (opcionalmente sobre as vendas filtradas, ver executar_script) e retorna
+        o resultado do último comando que produziu uma tabela.
+
+        Retorna:
+        - tuple: (pandas.DataFrame, tempo total em segundos).
+        """
+        execucoes = self.executar_script(caminho_script, filtros)
+        erros = [execucao['Observação'] for execucao in execucoes if execucao['Observação'].startswith('Erro')]
+        resultados = [execucao['Resultado'] for execucao in execucoes if execucao['Resultado'] is not None]
+        if not resultados:
+            raise RuntimeError(f"O script '{caminho_script}' não produziu resultados. {' '.join(erros)}".strip())
+        return resultados[-1], sum(execucao['Tempo (s)'] for execucao in execucoes)
+
+    def estatisticas(self):
+        """
+        Retorna o histórico de tempos das consultas executadas.
+
+        Retorna:
+        - pandas.DataFrame: Uma linha por consulta, com motor, tempo e número de linhas do resultado.
+        """
+        return pd.DataFrame(self.historico, columns=['Consulta', 'Motor', 'Tempo (s)', 'Linhas'])
+
+    def fechar(self):
+        self._conexao.close()
+
+
+def obter_motor(caminho_dados, motor=None):
+    """
+    Retorna o motor SQL do dataset, um por processo, reaproveitado enquanto o dataset não for
+    alterado (as páginas consultam com filtros, ver MotorSQL.consultar_script).
+
+    Parâmetros:
+    - caminho_dados (str): Caminho do CSV ou do diretório colunar processado.
+    - motor (str, opcional): 'duckdb' ou 'sqlite'. Se None, usa o DuckDB quando instalado.
+
+    Retorna:
+    - MotorSQL: Motor com main_table carregada.
+    """
+    chave = (os.path.abspath(caminho_dados), motor)
+    versao = versao_dados(caminho_dados)
+    with _trava:
+        em_memoria = _motores.get(chave)
+        if em_memoria is not None and em_memoria['versao'] == versao:
+            return em_memoria['motor']
+
+    motor_sql = MotorSQL(carregar_vendas(caminho_dados), motor)
+    with _trava:
+        _motores[chave] = {'versao': versao, 'motor': motor_sql}
+    return motor_sql
+
+
+def _esperado_regiao_categoria(dados):
+    total = dados.groupby(['Region', 'Product_Category'], observed=True)['Sales_Amount'].sum().rename('total_sales').reset_index()
+    total['rank'] = total.groupby('Region', observed=True)['total_sales'].rank(method='min', ascending=False)
+    return total
+
+
+def _esperado_metodos_pagamento(dados):
+    grupos = dados.assign(com_desconto=dados['Discount'] > 0).groupby('Payment_Method', observed=True)
+    return pd.DataFrame({
+        'avg_transaction': grupos['Sales_Amount'].mean(),
+        'processing_cost_estimate': grupos['Sales_Amount'].sum() * 0.02,
+        'discounted_transactions': grupos['com_desconto'].sum()
+    }).reset_index()
+
+
+def _esperado_impacto_descontos(dados):
+    # Discount::INT arredonda a metade para longe do zero (np.rint arredondaria para o par)
+    desconto = dados['Discount'].to_numpy(dtype='float64')
+    base = pd.DataFrame({
+        'discount_bucket': (np.sign(desconto) * np.floor(np.abs(desconto) + 0.5)).astype('int64'),
+        'Discount': dados['Discount'].astype('float64'),
+        'Quantity_Sold': dados['Quantity_Sold'].astype('float64'),
+        'Sales_Amount': dados['Sales_Amount']
+    })
+    grupos = base.groupby('discount_bucket')
+    return pd.DataFrame({
+        'avg_quantity': grupos['Quantity_Sold'].mean(),
+        'quantity_corr': grupos.apply(lambda g: g['Discount'].corr(g['Quantity_Sold'])),
+        'avg_revenue_per_unit': grupos['Sales_Amount'].sum() / grupos['Quantity_Sold'].sum()
+    }).reset_index()
+
+
+def _dados_descontos(dados, escala=20):
+    # Descontos entre 0 e 0.3 caem todos no bucket 0 de Discount::INT, e a comparação teria um só
+    # grupo. Na escala 0 a 6 há sete buckets, cada um com vários descontos (correlação definida).
+    if dados.empty or 'Discount' not in dados.columns:
+        return dados
+    return dados.assign(Discount=dados['Discount'] * escala)
+
+
+def _esperado_historico_vendas(dados):
+    base = dados.assign(margem=dados['Unit_Price'].astype('float64') - dados['Unit_Cost'].astype('float64'))
+    return base.groupby(['Sale_Date', 'Product_Category', 'Region'], observed=True).agg(
+        total_sales=('Sales_Amount', 'sum'),
+        avg_margin=('margem', 'mean'),
+        unique_products=('Product_ID', 'nunique')
+    ).reset_index()
+
+
+def _esperado_performance_repres(dados):
+    from src.desempenho import construir_desempenho, tabela_desempenho
+
+    # Armazém por (mês, região, canal, representante) reagregado ao grão de sales_rep_performance
+    tabela = tabela_desempenho(construir_desempenho(dados), ['Sales_Rep', 'month'])
+    return tabela.rename(columns={'Sales_Rep': 'rep_name'})[['rep_name', 'month', 'total_sales', 'avg_discount',
+                                                             'new_clients']]
+
+
+def _dados_cesta(dados, dias=120, semente=42):
+    # Nos dados sintéticos quase todo produto é vendido todo dia: os pares têm lift ~1 e nenhum
+    # passa do filtro de market_basket.sql. Cestas esparsas (poucos produtos por dia) com pares e
+    # um trio frequentes plantados fazem a comparação ter grupos; as demais colunas vêm dos dados.
+    if dados.empty or 'Product_ID' not in dados.columns or 'Sale_Date' not in dados.columns:
+        return dados
+    rng = np.random.default_rng(semente)
+    produtos = np.sort(dados['Product_ID'].dropna().unique())
+    frequentes = [(produtos[:2], 0.6), (produtos[2:4], 0.4), (produtos[4:7], 0.3)]
+    datas, itens = [], []
+    for dia in pd.date_range(pd.Timestamp(dados['Sale_Date'].min()).normalize(), periods=dias, freq='D'):
+        cesta = set(rng.choice(produtos, size=min(4, len(produtos)), replace=False).tolist())
+        for conjunto, probabilidade in frequentes:
+            if rng.random() < probabilidade:
+                cesta.update(conjunto.tolist())
+        datas += [dia] * len(cesta)
+        itens += sorted(cesta)
+
+    cestas = dados.iloc[rng.integers(0, len(dados), size=len(itens))].reset_index(drop=True)
+    cestas['Sale_Date'] = pd.Series(datas).astype(dados['Sale_Date'].dtype)
+    cestas['Product_ID'] = pd.Series(itens).astype(dados['Product_ID'].dtype)
+    return cestas
+
+
+def _esperado_market_basket(dados):
+    from src.cesta_compras import analisar_cesta
+
+    return analisar_cesta(dados)
+
+
+def _esperado_coortes(dados):
+    from src.coortes import construir_coortes, tabela_coortes
+
+    return tabela_coortes(construir_coortes(dados), meses_maximos=12)
+
+
+def _esperado_tendencia(dados):
+    from src.tendencias import MonitorTendencias
+
+    return MonitorTendencias('Region').processar(dados)
+
+
+# Script -> (implementação em pandas, colunas-chave, colunas comparadas)
+VALIDACOES = {
+    'simple_queries/regiao_categoria.sql': (
+        _esperado_regiao_categoria, ['Region', 'Product_Category'], ['total_sales', 'rank']),
+    'simple_queries/metodos_pagamento.sql': (
+        _esperado_metodos_pagamento, ['Payment_Method'],
+        ['avg_transaction', 'processing_cost_estimate', 'discounted_transactions']),
+    'simple_queries/impacto_descontos.sql': (
+        _esperado_impacto_descontos, ['discount_bucket'], ['avg_quantity', 'quantity_corr', 'avg_revenue_per_unit']),
+    'table_creation_scripts/historico_vendas.sql': (
+        _esperado_historico_vendas, ['Sale_Date', 'Product_Category', 'Region'],
+        ['total_sales', 'avg_margin', 'unique_products']),
+    'table_creation_scripts/performance_repres.sql': (
+        _esperado_performance_repres, ['rep_name', 'month'], ['total_sales', 'avg_discount', 'new_clients']),
+    'advanced_queries/tendencia_janela_movel.sql': (
+        _esperado_tendencia, ['Sale_Date', 'Region'], ['daily_sales', 'weekly_avg']),
+    'advanced_queries/market_basket.sql': (
+        _esperado_market_basket, ['product_pair'], ['support_count', 'confidence', 'lift_ratio']),
+    'advanced_queries/cohorte_clientes.sql': (
+        _esperado_coortes, ['cohort_month', 'Customer_Type', 'months_since_first_purchase'],
+        ['retention_rate', 'cltv'])
+}
+
+
+# Script -> dados derivados usados no lugar das vendas (em um motor próprio, do mesmo tipo)
+DADOS_VALIDACAO = {
+    'simple_queries/impacto_descontos.sql': _dados_descontos,
+    'advanced_queries/market_basket.sql': _dados_cesta
+}
+
+
+def _normalizar_chaves(tabela, chaves):
+    tabela = tabela.copy()
+    tabela.columns = [coluna if coluna in chaves else coluna.lower() for coluna in tabela.columns]
+    for chave in chaves:
+        if 'date' in chave.lower():
+            tabela[chave] = pd.to_datetime(tabela[chave]).dt.strftime('%Y-%m-%d')
+        else:
+            tabela[chave] = tabela[chave].astype(str)
+    return tabela
+
+
+def validar_consultas(motor_sql, dados, tolerancia=1e-6):
+    """
+    Verificação de regressão: compara o resultado dos scripts de sql/ no motor embarcado
+    com as implementações equivalentes em pandas.
+
+    Parâmetros:
+    - motor_sql (MotorSQL): Motor com os mesmos dados carregados.
+    - dados (pandas.DataFrame): Vendas usadas no motor.
+    - tolerancia (float): Maior diferença relativa aceita nas colunas numéricas.
+
+    Scripts em DADOS_VALIDACAO rodam sobre dados derivados (ex.: descontos em escala maior para
+    impacto_descontos.sql, cestas esparsas para market_basket.sql), em um motor próprio. Um script sem nenhum grupo comparado não confere.
+
+    Retorna:
+    - pandas.DataFrame: Uma linha por script, com o número de grupos, a maior diferença
+      relativa, o tempo da consulta e se o resultado confere.
+    """
+    relatorio = []
+    for script, (esperado_pandas, chaves, colunas) in VALIDACOES.items():
+        linha = {'Script': script, 'Motor': motor_sql.motor, 'Grupos': 0, 'Maior Diferença': float('nan'),
+                 'Tempo (s)': float('nan'), 'Confere': False, 'Observação': ''}
+        relatorio.append(linha)
+        dados_script, motor_script = dados, motor_sql
+        if script in DADOS_VALIDACAO:
+            dados_script = DADOS_VALIDACAO[script](dados)
+            motor_script = MotorSQL(dados_script, motor_sql.motor)
+        try:
+            obtido, linha['Tempo (s)'] = motor_script.consultar_script(script)
+        except RuntimeError as erro:
+            linha['Observação'] = str(erro)
+            continue
+        finally:
+            if motor_script is not motor_sql:
+                motor_script.fechar()
+
+        obtido = _normalizar_chaves(obtido, chaves)
+        esperado = _normalizar_chaves(esperado_pandas(dados_script), chaves)
+        comparacao = esperado.merge(obtido, on=chaves, how='outer', suffixes=('_pandas', '_sql'), indicator=True)
+        faltantes = int((comparacao['_merge'] != 'both').sum())
+        diferencas = []
+        for coluna in colunas:
+            a = comparacao[f'{coluna}_pandas'].astype('float64').to_numpy()
+            b = comparacao[f'{coluna}_sql'].astype('float64').to_numpy()
+            ambos_nulos = np.isnan(a) & np.isnan(b)
+            diferenca = np.abs(a - b) / np.maximum(np.abs(a), 1.0)
+            diferencas.append(np.nanmax(np.where(ambos_nulos, 0.0, np.where(np.isnan(diferenca), np.inf, diferenca)))
+                              if len(diferenca) else 0.0)
+
+        linha['Grupos'] = len(comparacao)
+        linha['Maior Diferença'] = float(max(diferencas)) if diferencas else 0.0
+        linha['Confere'] = len(comparacao) > 0 and faltantes == 0 and linha['Maior Diferença'] <= tolerancia
+        if faltantes:
+            linha['Observação'] = f'{faltantes} grupos presentes em apenas um dos resultados'
+        elif not len(comparacao):
+            linha['Observação'] = 'Nenhum grupo comparado'
+        elif motor_script is not motor_sql:
+            linha['Observação'] = f'{len(dados_script):,} vendas derivadas (DADOS_VALIDACAO)'
+    return pd.DataFrame(relatorio)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Executa os scripts de sql/ no motor embarcado e valida contra o pandas.')
+    parser.add_argument('caminho_dados', help='CSV ou diretório colunar processado')
+    parser.add_argument('--motor', choices=['duckdb', 'sqlite'], default=None)
+    argumentos = parser.parse_args()
+
+    vendas = carregar_vendas(argumentos.caminho_dados)
+    motor_vendas = MotorSQL(vendas, argumentos.motor)
+    print(f"Motor: {motor_vendas.motor} | carga de {motor_vendas.linhas:,} linhas em {motor_vendas.tempo_carga:.2f}s")
+    print(validar_consultas(motor_vendas, vendas).to_string(index=False))
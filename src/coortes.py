@@ -0,0 +1,218 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.carregamento import carregar_vendas
+from src.cubo import ler_agregado, versao_dados
+
+
+def mes_inteiro(datas):
+    """
+    Converte datas em meses inteiros (meses desde 1970-01), para que a distância entre dois
+    meses seja uma subtração, sem o retorno a zero após 12 meses de EXTRACT(MONTH FROM AGE(...)).
+    """
+    return np.asarray(pd.to_datetime(datas).to_numpy(), dtype='datetime64[M]').astype('int32')
+
+
+def rotulo_mes(meses):
+    """
+    Converte meses inteiros (ver mes_inteiro) no rótulo 'AAAA-MM'.
+    """
+    return np.datetime_as_string(np.asarray(meses, dtype='int64').astype('datetime64[M]'), unit='M')
+
+
+def _celulas(atividade, primeiros, segmento, meses=None):
+    # Células (coorte x meses desde a primeira compra); com 'meses', apenas os meses-calendário informados
+    if meses is not None:
+        atividade = atividade[atividade['mes'].isin(meses)]
+    chaves = list(primeiros.index.names)
+    coorte = primeiros.reindex(pd.MultiIndex.from_frame(atividade[chaves]) if len(chaves) > 1
+                               else pd.Index(atividade[chaves[0]])).to_numpy()
+    base = pd.DataFrame({
+        'coorte': coorte.astype('int32'),
+        'deslocamento': (atividade['mes'].to_numpy() - coorte).astype('int32'),
+        'receita': atividade['receita'].to_numpy()
+    })
+    if segmento:
+        base.insert(0, segmento, atividade[segmento].to_numpy())
+    # Cada linha da atividade é um par (entidade, mês) distinto: a contagem é o número de entidades ativas
+    return base.groupby(([segmento] if segmento else []) + ['coorte', 'deslocamento'], observed=True, sort=True).agg(
+        ativos=('receita', 'size'),
+        receita=('receita', 'sum')
+    ).reset_index()
+
+
+def construir_coortes(dados, coluna_entidade='Product_ID', coluna_data='Sale_Date', coluna_valor='Sales_Amount',
+                      coluna_segmento='Customer_Type'):
+    """
+    Calcula a matriz de coortes (mês da primeira compra x meses desde a primeira compra)
+    (equivalente vetorizado de sql/advanced_queries/cohorte_clientes.sql).
+
+    A atividade é reduzida a pares distintos (entidade, mês) com a receita do mês, e o mês da
+    primeira compra sai de um único groupby sobre ela. Esses agregados permitem incorporar
+    meses novos sem reprocessar as vendas (ver mesclar_coortes).
+
+    Parâmetros:
+    - dados (pandas.DataFrame): DataFrame com as vendas.
+    - coluna_entidade (str): Coluna que identifica o cliente acompanhado na coorte.
+      O dataset não tem identificador de cliente; o padrão, Product_ID, segue o SQL.
+    - coluna_data (str): Coluna com a data da venda.
+    - coluna_valor (str): Coluna somada na receita (base do CLTV).
+    - coluna_segmento (str, opcional): Coluna que separa coortes independentes (o SQL usa Customer_Type).
+      Se None, todas as vendas formam uma única população.
+
+    Retorna:
+    - dict: {'atividade', 'primeiros', 'celulas', 'colunas'} (ver tabela_coortes).
+    """
+    colunas_necessarias = [coluna_entidade, coluna_data, coluna_valor] + ([coluna_segmento] if coluna_segmento else [])
+    colunas_invalidas = [col for col in colunas_necessarias if col not in dados.columns]
+    if colunas_invalidas:
+        raise ValueError(f"Colunas inválidas: {colunas_invalidas}")
+
+    chaves = ([coluna_segmento] if coluna_segmento else []) + [coluna_entidade]
+    base = dados[chaves].copy()
+    for coluna in chaves:
+        if isinstance(base[coluna].dtype, pd.CategoricalDtype):
+            # Texto simples: lotes futuros podem trazer categorias diferentes
+            base[coluna] = base[coluna].astype(str)
+    base['mes'] = mes_inteiro(dados[coluna_data])
+    base['receita'] = dados[coluna_valor].astype('float64').to_numpy()
+    atividade = base.groupby(chaves + ['mes'], sort=True)['receita'].sum().reset_index()
+
+    primeiros = atividade.groupby(chaves, sort=True)['mes'].min()
+    return {
+        'atividade': atividade,
+        'primeiros': primeiros,
+        'celulas': _celulas(atividade, primeiros, coluna_segmento),
+        'colunas': {'entidade': coluna_entidade, 'data': coluna_data, 'valor': coluna_valor, 'segmento': coluna_segmento}
+    }
+
+
+def mesclar_coortes(coortes, coortes_delta):
+    """
+    Incorpora as coortes de um novo lote (delta-merge) às existentes.
+
+    Apenas as células dos meses-calendário presentes no lote são recalculadas. Se o lote
+    antecipar a primeira compra de uma entidade já conhecida (dados atrasados), todas as
+    células são recalculadas a partir da atividade acumulada.
+    """
+    if coortes['colunas'] != coortes_delta['colunas']:
+        raise ValueError("As coortes foram construídas com colunas diferentes e não podem ser mescladas.")
+    segmento = coortes['colunas']['segmento']
+    chaves = list(coortes['primeiros'].index.names)
+
+    atividade = pd.concat([coortes['atividade'], coortes_delta['atividade']], ignore_index=True)
+    atividade = atividade.groupby(chaves + ['mes'], sort=True)['receita'].sum().reset_index()
+    primeiros = pd.concat([coortes['primeiros'], coortes_delta['primeiros']])
+    primeiros = primeiros.groupby(level=chaves, sort=True).min()
+
+    anteriores = coortes['primeiros'].reindex(primeiros.index)
+    antecipados = (primeiros < anteriores).any()
+    if antecipados:
+        celulas = _celulas(atividade, primeiros, segmento)
+    else:
+        meses_lote = np.unique(coortes_delta['atividade']['mes'].to_numpy())
+        celulas = coortes['celulas']
+        preservadas = celulas[~(celulas['coorte'] + celulas['deslocamento']).isin(meses_lote)]
+        celulas = pd.concat([preservadas, _celulas(atividade, primeiros, segmento, meses_lote)], ignore_index=True)
+        celulas = celulas.sort_values(([segmento] if segmento else []) + ['coorte', 'deslocamento'], ignore_index=True)
+
+    return {'atividade': atividade, 'primeiros': primeiros, 'celulas': celulas, 'colunas': dict(coortes['colunas'])}
+
+
+def tabela_coortes(coortes, meses_maximos=None):
+    """
+    Monta a tabela de retenção e CLTV no formato de cohorte_clientes.sql.
+
+    - retention_rate: entidades ativas no mês / tamanho da coorte (entidades ativas no mês 0).
+    - CLTV: receita acumulada da coorte até o mês / tamanho da coorte.
+
+    Parâmetros:
+    - coortes (dict): Resultado de construir_coortes ou mesclar_coortes.
+    - meses_maximos (int, opcional): Mantém apenas os meses desde a primeira compra até este valor.
+
+    Retorna:
+    - pandas.DataFrame: Colunas cohort_month, [segmento], months_since_first_purchase, retention_rate,
+      CLTV, cohort_users, active_users e revenue.
+    """
+    segmento = coortes['colunas']['segmento']
+    grupo = ([segmento] if segmento else []) + ['coorte']
+    celulas = coortes['celulas'].sort_values(grupo + ['deslocamento'], ignore_index=True)
+
+    # Toda entidade está ativa no mês da primeira compra: o mês 0 dá o tamanho da coorte
+    tamanhos = celulas[celulas['deslocamento'] == 0].set_index(grupo)['ativos']
+    chave = pd.MultiIndex.from_frame(celulas[grupo]) if len(grupo) > 1 else pd.Index(celulas['coorte'])
+    tamanho = pd.Series(tamanhos.reindex(chave).to_numpy(), index=celulas.index)
+    receita_acumulada = celulas.groupby(grupo, observed=True, sort=False)['receita'].cumsum()
+
+    tabela = pd.DataFrame({'cohort_month': rotulo_mes(celulas['coorte'])})
+    if segmento:
+        tabela[segmento] = celulas[segmento].to_numpy()
+    tabela['months_since_first_purchase'] = celulas['deslocamento'].to_numpy()
+    tabela['retention_rate'] = (celulas['ativos'] / tamanho).to_numpy()
+    tabela['CLTV'] = (receita_acumulada / tamanho).to_numpy()
+    tabela['cohort_users'] = tamanho.astype('int64').to_numpy()
+    tabela['active_users'] = celulas['ativos'].astype('int64').to_numpy()
+    tabela['revenue'] = celulas['receita'].to_numpy()
+    if meses_maximos is not None:
+        tabela = tabela[tabela['months_since_first_purchase'] <= meses_maximos].reset_index(drop=True)
+    return tabela
+
+
+def matriz_coortes(coortes, metrica='retention_rate', meses_maximos=None):
+    """
+    Pivota a tabela de coortes: uma linha por coorte (e segmento) e uma coluna por mês desde a primeira compra.
+
+    Parâmetros:
+    - coortes (dict): Resultado de construir_coortes ou mesclar_coortes.
+    - metrica (str): Coluna de tabela_coortes exibida nas células (ex.: 'retention_rate', 'CLTV').
+    - meses_maximos (int, opcional): Último mês desde a primeira compra exibido.
+
+    Retorna:
+    - pandas.DataFrame: Matriz coorte x meses (NaN onde a coorte ainda não chegou ao mês).
+    """
+    tabela = tabela_coortes(coortes, meses_maximos)
+    if metrica not in tabela.columns:
+        raise ValueError(f"Métrica inválida: '{metrica}'.")
+    segmento = coortes['colunas']['segmento']
+    linhas = ([segmento] if segmento else []) + ['cohort_month']
+    return tabela.pivot_table(index=linhas, columns='months_since_first_purchase', values=metrica, aggfunc='sum')
+
+
+def caminho_coortes_padrao(caminho_dados):
+    """
+    Caminho padrão das coortes persistidas, ao lado do dataset processado.
+    """
+    return os.path.splitext(caminho_dados.rstrip('/\\'))[0] + '_coortes.pkl'
+
+
+def salvar_coortes(coortes, caminho_dados, caminho_coortes=None):
+    """
+    Persiste as coortes associadas à versão atual do dataset.
+    """
+    if caminho_coortes is None:
+        caminho_coortes = caminho_coortes_padrao(caminho_dados)
+    pd.to_pickle({'versao': versao_dados(caminho_dados), 'coortes': coortes}, caminho_coortes)
+
+
+def obter_coortes(caminho_dados, caminho_coortes=None):
+    """
+    Retorna as coortes do dataset, recalculando-as apenas se o dataset mudou.
+
+    Parâmetros:
+    - caminho_dados (str): Caminho do CSV ou do diretório colunar processado.
+    - caminho_coortes (str, opcional): Arquivo persistido. Se None, usa caminho_coortes_padrao.
+
+    Retorna:
+    - dict: Coortes (ver construir_coortes).
+    """
+    if caminho_coortes is None:
+        caminho_coortes = caminho_coortes_padrao(caminho_dados)
+    persistido = ler_agregado(caminho_coortes)
+    if persistido is not None and persistido.get('versao') == versao_dados(caminho_dados):
+        return persistido['coortes']
+
+    coortes = construir_coortes(carregar_vendas(caminho_dados))
+    salvar_coortes(coortes, caminho_dados, caminho_coortes)
+    return coortes
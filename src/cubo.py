@@ -0,0 +1,296 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.carregamento import carregar_vendas, chave_arquivo
+from src.tipos import COLUNAS_VIRTUAIS, adicionar_colunas_virtuais
+
+# Dimensões do cubo (todas as colunas usadas nos agrupamentos das análises)
+DIMENSOES = [
+    'Region', 'Product_Category', 'Sales_Channel', 'Payment_Method',
+    'Customer_Type', 'Sales_Rep', 'Region_and_Sales_Rep'
+]
+
+COLUNA_DIA = 'Sale_Date'
+MEDIDA_PADRAO = 'Sales_Amount'
+
+# Versão do formato persistido; cubos de versões diferentes são recalculados
+VERSAO_CUBO = 1
+
+# Diferença relativa máxima aceita entre cubo e groupby direto. O cubo soma por
+# (dimensões, dia) e depois agrega os parciais, então a ordem de soma em ponto
+# flutuante difere da do groupby e a igualdade bit a bit não é garantida em geral.
+TOLERANCIA_CUBO = 1e-9
+
+_cubos = {}
+_trava = threading.Lock()
+
+
+def construir_cubo(dados, dimensoes=None, medida=MEDIDA_PADRAO, coluna_data=COLUNA_DIA):
+    """
+    Constrói o cubo de agregação (soma, contagem e soma dos quadrados) em uma única passada.
+
+    Equivalente em Python da tabela daily_sales_summary (sql/table_creation_scripts/historico_vendas.sql),
+    porém com todas as dimensões das análises e granularidade diária.
+
+    Parâmetros:
+    - dados (pandas.DataFrame): DataFrame com as vendas.
+    - dimensoes (list, opcional): Dimensões do cubo. Se None, usa DIMENSOES presentes nos dados.
+    - medida (str): Coluna numérica agregada.
+    - coluna_data (str): Coluna de datas usada na dimensão diária.
+
+    Retorna:
+    - pandas.DataFrame: Uma linha por combinação observada de dimensões e dia, com as
+      colunas 'soma', 'contagem' e 'soma_quadrados'.
+    """
+    # Colunas virtuais (ex.: Region_and_Sales_Rep) são derivadas das colunas de origem
+    dados = adicionar_colunas_virtuais(dados, [dim for dim in (DIMENSOES if dimensoes is None else dimensoes)
+                                               if dim in COLUNAS_VIRTUAIS])
+    if dimensoes is None:
+        dimensoes = [dim for dim in DIMENSOES if dim in dados.columns]
+    colunas_necessarias = list(dimensoes) + [medida, coluna_data]
+    colunas_invalidas = [col for col in colunas_necessarias if col not in dados.columns]
+    if colunas_invalidas:
+        raise ValueError(f"Colunas inválidas: {colunas_invalidas}")
+
+    valores = dados[medida].astype('float64')
+    base = dados[list(dimensoes)].copy()
+    base[coluna_data] = pd.to_datetime(dados[coluna_data]).dt.normalize()
+    base['valor'] = valores
+    base['valor_quadrado'] = valores * valores
+
+    cubo = base.groupby(list(dimensoes) + [coluna_data], observed=True, sort=True).agg(
+        soma=('valor', 'sum'),
+        contagem=('valor', 'count'),
+        soma_quadrados=('valor_quadrado', 'sum')
+    ).reset_index()
+    cubo.attrs['medida'] = medida
+    return cubo
+
+
+def agregar_cubo(cubo, dimensoes, estatisticas=('sum', 'mean', 'count')):
+    """
+    Responde a um agrupamento a partir do cubo, no mesmo formato de
+    dados.groupby(dimensoes)[medida].agg(estatisticas).reset_index().
+
+    Parâmetros:
+    - cubo (pandas.DataFrame): Cubo gerado por construir_cubo.
+    - dimensoes (str ou list): Dimensão (ou dimensões) do agrupamento.
+    - estatisticas (list): Estatísticas desejadas entre 'sum', 'mean', 'count', 'var' e 'std'.
+
+    Retorna:
+    - pandas.DataFrame: Estatísticas por grupo.
+    """
+    if isinstance(dimensoes, str):
+        dimensoes = [dimensoes]
+    colunas_invalidas = [dim for dim in dimensoes if dim not in cubo.columns]
+    if colunas_invalidas:
+        raise ValueError(f"Dimensões ausentes no cubo: {colunas_invalidas}")
+
+    parcial = cubo.groupby(list(dimensoes), observed=True, sort=True)[['soma', 'contagem', 'soma_quadrados']].sum()
+    soma, contagem = parcial['soma'], parcial['contagem']
+
+    resultado = pd.DataFrame(index=parcial.index)
+    for estatistica in estatisticas:
+        if estatistica == 'sum':
+            resultado['sum'] = soma
+        elif estatistica == 'mean':
+            resultado['mean'] = soma / contagem
+        elif estatistica == 'count':
+            resultado['count'] = contagem.astype('int64')
+        elif estatistica in ('var', 'std'):
+            # Variância amostral (ddof=1) a partir das somas
+            variancia = (parcial['soma_quadrados'] - soma * soma / contagem) / (contagem - 1)
+            variancia = variancia.clip(lower=0).where(contagem > 1)
+            resultado[estatistica] = variancia if estatistica == 'var' else np.sqrt(variancia)
+        else:
+            raise ValueError(f"Estatística não suportada pelo cubo: '{estatistica}'")
+
+    return resultado.reset_index()
+
+
+def agrupar_vendas(dados, dimensoes, coluna_vendas=MEDIDA_PADRAO, estatisticas=('sum', 'mean', 'count'), cubo=None,
+                   amostra=None):
+    """
+    Agrupa as vendas usando a amostra ou o cubo quando disponíveis, ou o DataFrame completo caso contrário.
+
+    Parâmetros:
+    - dados (pandas.DataFrame): DataFrame com as vendas (usado quando não há amostra nem cubo compatível;
+      pode ser None quando a amostra responde ao agrupamento).
+    - dimensoes (str ou list): Dimensão (ou dimensões) do agrupamento.
+    - coluna_vendas (str): Coluna numérica agregada.
+    - estatisticas (list): Estatísticas desejadas.
+    - cubo (pandas.DataFrame, opcional): Cubo gerado por construir_cubo.
+    - amostra (dict, opcional): Amostra do modo aproximado (src.amostragem.construir_amostra). As
+      estatísticas passam a ser estimativas, com as margens de erro em '<estatistica>_erro'.
+
+    Retorna:
+    - pandas.DataFrame: Estatísticas por grupo, com índice reiniciado.
+    """
+    lista_dimensoes = [dimensoes] if isinstance(dimensoes, str) else list(dimensoes)
+    if (amostra is not None and amostra['medida'] == coluna_vendas and len(lista_dimensoes) == 1
+            and lista_dimensoes[0] in amostra['dimensoes'] and set(estatisticas) <= {'sum', 'mean', 'count'}):
+        from src.amostragem import estimar_grupos
+
+        return estimar_grupos(amostra, lista_dimensoes[0], estatisticas).drop(columns='amostra')
+    if (cubo is not None and cubo.attrs.get('medida', MEDIDA_PADRAO) == coluna_vendas
+            and all(dim in cubo.columns for dim in lista_dimensoes)):
+        return agregar_cubo(cubo, lista_dimensoes, estatisticas)
+
+    dados = adicionar_colunas_virtuais(dados, [dim for dim in lista_dimensoes if dim in COLUNAS_VIRTUAIS])
+    return dados.groupby(dimensoes, observed=True)[coluna_vendas].agg(list(estatisticas)).reset_index()
+
+
+def caminho_cubo_padrao(caminho_dados):
+    """
+    Caminho padrão do cubo persistido, ao lado do dataset processado.
+    """
+    return os.path.splitext(caminho_dados.rstrip('/\\'))[0] + '_cubo.pkl'
+
+
+def versao_dados(caminho_dados):
+    """
+    Identificação da versão do dataset usada para invalidar agregados persistidos.
+    """
+    _, mtime, tamanho = chave_arquivo(caminho_dados)
+    return (VERSAO_CUBO, os.path.basename(caminho_dados.rstrip('/\\')), mtime, tamanho)
+
+
+def ler_agregado(caminho_agregado):
+    """
+    Lê um agregado persistido ({'versao': ..., 'cubo': ...}). Retorna None se não existir ou estiver corrompido.
+    """
+    if not os.path.exists(caminho_agregado):
+        return None
+    try:
+        return pd.read_pickle(caminho_agregado)
+    except Exception:
+        return None
+
+
+def salvar_cubo(cubo, caminho_dados, caminho_cubo=None):
+    """
+    Persiste o cubo associado à versão atual do dataset.
+
+    Parâmetros:
+    - cubo (pandas.DataFrame): Cubo de agregação.
+    - caminho_dados (str): Caminho do CSV ou do diretório colunar de origem.
+    - caminho_cubo (str, opcional): Arquivo do cubo. Se None, usa caminho_cubo_padrao.
+    """
+    if caminho_cubo is None:
+        caminho_cubo = caminho_cubo_padrao(caminho_dados)
+    versao = versao_dados(caminho_dados)
+    pd.to_pickle({'versao': versao, 'cubo': cubo}, caminho_cubo)
+    with _trava:
+        _cubos[caminho_cubo] = {'versao': versao, 'cubo': cubo}
+
+
+def obter_cubo(caminho_dados, caminho_cubo=None):
+    """
+    Retorna o cubo do dataset, reaproveitando o cubo em memória ou o persistido em disco
+    enquanto o dataset não for alterado.
+
+    Parâmetros:
+    - caminho_dados (str): Caminho do CSV ou do diretório colunar processado.
+    - caminho_cubo (str, opcional): Arquivo do cubo persistido. Se None, usa caminho_cubo_padrao.
+
+    Retorna:
+    - pandas.DataFrame: Cubo de agregação.
+    """
+    if caminho_cubo is None:
+        caminho_cubo = caminho_cubo_padrao(caminho_dados)
+    versao = versao_dados(caminho_dados)
+
+    with _trava:
+        em_memoria = _cubos.get(caminho_cubo)
+        if em_memoria is not None and em_memoria['versao'] == versao:
+            return em_memoria['cubo']
+
+    persistido = ler_agregado(caminho_cubo)
+    if persistido is not None and persistido.get('versao') == versao:
+        cubo = persistido['cubo']
+        with _trava:
+            _cubos[caminho_cubo] = {'versao': versao, 'cubo': cubo}
+        return cubo
+
+    cubo = construir_cubo(carregar_vendas(caminho_dados))
+    salvar_cubo(cubo, caminho_dados, caminho_cubo)
+    return cubo
+
+
+def mesclar_cubos(cubo, cubo_delta):
+    """
+    Incorpora ao cubo os agregados de um novo lote de vendas (delta-merge), sem reprocessar os dados.
+
+    Parâmetros:
+    - cubo (pandas.DataFrame): Cubo existente.
+    - cubo_delta (pandas.DataFrame): Cubo construído apenas com as novas linhas.
+
+    Retorna:
+    - pandas.DataFrame: Cubo atualizado.
+    """
+    chaves = [col for col in cubo.columns if col not in ('soma', 'contagem', 'soma_quadrados')]
+    if [col for col in cubo_delta.columns if col not in ('soma', 'contagem', 'soma_quadrados')] != chaves:
+        raise ValueError("Os cubos possuem dimensões diferentes e não podem ser mesclados.")
+
+    combinado = pd.concat([cubo, cubo_delta], ignore_index=True)
+    # Une as categorias dos dois lotes antes de reagrupar
+    for chave in chaves:
+        if isinstance(cubo[chave].dtype, pd.CategoricalDtype) or isinstance(cubo_delta[chave].dtype, pd.CategoricalDtype):
+            combinado[chave] = combinado[chave].astype('category')
+    resultado = combinado.groupby(chaves, observed=True, sort=True)[['soma', 'contagem', 'soma_quadrados']].sum().reset_index()
+    resultado.attrs['medida'] = cubo.attrs.get('medida', MEDIDA_PADRAO)
+    return resultado
+
+
+def validar_cubo(dados, cubo, dimensoes=None, coluna_vendas=MEDIDA_PADRAO, tolerancia=TOLERANCIA_CUBO):
+    """
+    Compara as agregações do cubo com o groupby direto sobre os dados.
+
+    As contagens devem ser idênticas. Somas e médias não têm garantia de igualdade bit
+    a bit: o cubo soma parciais diários, em outra ordem que o groupby, e o arredondamento
+    em ponto flutuante pode diferir no último dígito. Por isso a validação aceita uma
+    diferença relativa até a tolerância e informa à parte, em 'Somas Idênticas', se
+    somas e médias coincidiram exatamente.
+
+    Parâmetros:
+    - dados (pandas.DataFrame): DataFrame com as vendas.
+    - cubo (pandas.DataFrame): Cubo gerado a partir de dados.
+    - dimensoes (list, opcional): Dimensões a validar. Se None, valida todas as do cubo.
+    - coluna_vendas (str): Coluna numérica agregada.
+    - tolerancia (float): Diferença relativa máxima aceita.
+
+    Retorna:
+    - pandas.DataFrame: Uma linha por dimensão com a maior diferença relativa, se as
+      somas são idênticas bit a bit e o resultado dentro da tolerância.
+    """
+    if dimensoes is None:
+        dimensoes = [dim for dim in DIMENSOES if dim in cubo.columns]
+    dados = adicionar_colunas_virtuais(dados, [dim for dim in dimensoes if dim in COLUNAS_VIRTUAIS])
+
+    relatorio = []
+    for dimensao in dimensoes:
+        esperado = dados.groupby(dimensao, observed=True)[coluna_vendas].agg(['sum', 'mean', 'count'])
+        obtido = agregar_cubo(cubo, dimensao).set_index(dimensao)
+        mesmos_grupos = list(esperado.index.astype(str)) == list(obtido.index.astype(str))
+        diferenca = 0.0
+        identicas = mesmos_grupos
+        if mesmos_grupos:
+            for estatistica in ('sum', 'mean'):
+                identicas = identicas and bool(
+                    (esperado[estatistica].to_numpy() == obtido[estatistica].to_numpy()).all())
+                escala = esperado[estatistica].abs().clip(lower=1).to_numpy()
+                diferenca = max(diferenca, float(np.max(np.abs(
+                    esperado[estatistica].to_numpy() - obtido[estatistica].to_numpy()) / escala)))
+        contagens_iguais = mesmos_grupos and (esperado['count'].to_numpy() == obtido['count'].to_numpy()).all()
+        relatorio.append({
+            'Dimensão': dimensao,
+            'Diferença Relativa Máxima': diferenca,
+            'Contagens Iguais': bool(contagens_iguais),
+            'Somas Idênticas': bool(identicas),
+            'Válido': bool(contagens_iguais and diferenca <= tolerancia)
+        })
+
+    return pd.DataFrame(relatorio)
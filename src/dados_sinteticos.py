@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.carregamento import TIPOS_COLUNAS
+
+# Domínios das colunas conforme data/info_dataset.txt
+REPRESENTANTES = ['Alice', 'Bob', 'Charlie', 'David', 'Eve']
+REGIOES = ['North', 'South', 'East', 'West']
+CATEGORIAS = ['Electronics', 'Furniture', 'Clothing', 'Food']
+TIPOS_CLIENTE = ['New', 'Returning']
+METODOS_PAGAMENTO = ['Cash', 'Credit Card', 'Bank Transfer']
+CANAIS = ['Online', 'Retail']
+PRODUTOS = (1001, 1100)
+
+ORDEM_COLUNAS = [
+    'Product_ID', 'Sale_Date', 'Sales_Rep', 'Region', 'Sales_Amount', 'Quantity_Sold',
+    'Product_Category', 'Unit_Cost', 'Unit_Price', 'Customer_Type', 'Discount',
+    'Payment_Method', 'Sales_Channel', 'Region_and_Sales_Rep'
+]
+
+
+def _categoria(rng, valores, linhas):
+    return pd.Categorical.from_codes(rng.integers(0, len(valores), linhas, dtype=np.int8), categories=valores)
+
+
+def gerar_vendas(linhas, semente=42, data_inicio='2023-01-01', data_fim='2023-12-31'):
+    """
+    Gera vendas sintéticas no esquema de data/info_dataset.txt, já com os tipos do carregador.
+
+    Parâmetros:
+    - linhas (int): Número de linhas.
+    - semente (int ou numpy.random.SeedSequence): Semente do gerador (mesma semente, mesmos dados).
+    - data_inicio, data_fim (str): Intervalo de Sale_Date (o dataset original cobre 2023).
+
+    Retorna:
+    - pandas.DataFrame: Vendas sintéticas.
+    """
+    rng = np.random.default_rng(semente)
+    inicio, fim = pd.Timestamp(data_inicio), pd.Timestamp(data_fim)
+    dias = (fim - inicio).days + 1
+
+    regiao = rng.integers(0, len(REGIOES), linhas, dtype=np.int8)
+    representante = rng.integers(0, len(REPRESENTANTES), linhas, dtype=np.int8)
+    combinacoes = [f'{r}-{s}' for r in REGIOES for s in REPRESENTANTES]
+
+    unit_cost = rng.uniform(50, 5000, linhas).round(2)
+    # Preço sempre acima do custo (margem de 1% a 60%)
+    unit_price = (unit_cost * rng.uniform(1.01, 1.6, linhas)).round(2)
+
+    dados = pd.DataFrame({
+        'Product_ID': rng.integers(PRODUTOS[0], PRODUTOS[1] + 1, linhas),
+        'Sale_Date': inicio + pd.to_timedelta(rng.integers(0, dias, linhas), unit='D'),
+        'Sales_Rep': pd.Categorical.from_codes(representante, categories=REPRESENTANTES),
+        'Region': pd.Categorical.from_codes(regiao, categories=REGIOES),
+        'Sales_Amount': rng.uniform(100, 10000, linhas).round(2),
+        'Quantity_Sold': rng.integers(1, 51, linhas),
+        'Product_Category': _categoria(rng, CATEGORIAS, linhas),
+        'Unit_Cost': unit_cost,
+        'Unit_Price': unit_price,
+        'Customer_Type': _categoria(rng, TIPOS_CLIENTE, linhas),
+        'Discount': rng.integers(0, 31, linhas) / 100,
+        'Payment_Method': _categoria(rng, METODOS_PAGAMENTO, linhas),
+        'Sales_Channel': _categoria(rng, CANAIS, linhas),
+        'Region_and_Sales_Rep': pd.Categorical.from_codes(
+            regiao.astype(np.int16) * len(REPRESENTANTES) + representante, categories=combinacoes)
+    })
+    return dados.astype(TIPOS_COLUNAS)[ORDEM_COLUNAS]
+
+
+def gravar_vendas(caminho_saida, linhas, semente=42, tamanho_bloco=1_000_000, formato='csv', **opcoes):
+    """
+    Grava vendas sintéticas em blocos, para gerar arquivos maiores que a memória (até 100M de linhas).
+
+    Cada bloco usa uma semente derivada da semente principal, então o arquivo é reprodutível
+    para o mesmo (linhas, semente, tamanho_bloco).
+
+    Parâmetros:
+    - caminho_saida (str): CSV de saída, ou diretório do dataset colunar (formato 'parquet'/'arrow').
+    - linhas (int): Número total de linhas.
+    - semente (int): Semente principal.
+    - tamanho_bloco (int): Linhas geradas por bloco.
+    - formato (str): 'csv', 'parquet' ou 'arrow'.
+    - opcoes: Parâmetros adicionais de gerar_vendas (data_inicio, data_fim).
+
+    Retorna:
+    - str: Caminho gravado.
+    """
+    if formato not in ('csv', 'parquet', 'arrow'):
+        raise ValueError(f"Formato inválido: '{formato}'. Use 'csv', 'parquet' ou 'arrow'.")
+
+    blocos = max(1, -(-linhas // tamanho_bloco))
+    sementes = np.random.SeedSequence(semente).spawn(blocos)
+    if formato == 'csv' and os.path.exists(caminho_saida):
+        os.remove(caminho_saida)
+
+    for indice, semente_bloco in enumerate(sementes):
+        tamanho = min(tamanho_bloco, linhas - indice * tamanho_bloco)
+        bloco = gerar_vendas(tamanho, semente_bloco, **opcoes)
+        if formato == 'csv':
+            bloco.to_csv(caminho_saida, mode='a', header=indice == 0, index=False, date_format='%Y-%m-%d')
+        else:
+            from src.armazenamento import salvar_colunar
+
+            # O primeiro bloco substitui as partições existentes; os seguintes são anexados a elas
+            salvar_colunar(bloco, caminho_saida, formato=formato, anexar=indice > 0)
+    return caminho_saida
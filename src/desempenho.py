@@ -0,0 +1,471 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+
+from src.armazenamento import COLUNA_PARTICAO
+from src.carregamento import carregar_vendas
+from src.coortes import mes_inteiro, rotulo_mes
+from src.cubo import versao_dados
+from src.estruturas_probabilisticas import estimar_cardinalidade, hash_valores, posicoes_hll
+
+# Grão do armazém: mês x região x canal x representante. Região e canal são as partições de
+# sql/optimization_examples/regiao_canal.sql, abaixo da partição por mês usada nas atualizações.
+CHAVES_DESEMPENHO = ['month', 'Region', 'Sales_Channel', 'Sales_Rep']
+DIMENSOES_PARTICAO = ['Region', 'Sales_Channel']
+COLUNAS_SOMAS = ['total_sales', 'soma_desconto', 'contagem']
+
+# Contagem distinta de clientes novos: conjunto exato de pares ou registradores HyperLogLog por grupo
+MODOS_DISTINTOS = ('exato', 'hll')
+PRECISAO_HLL = 12
+
+ARQUIVO_MANIFESTO = 'manifesto.json'
+ARQUIVO_PARTICAO = 'particao.pkl'
+VERSAO_DESEMPENHO = 1
+
+_trava = threading.Lock()
+
+
+def _validar_modo(distintos):
+    if distintos not in MODOS_DISTINTOS:
+        raise ValueError(f"Modo inválido: '{distintos}'. Use 'exato' ou 'hll'.")
+
+
+def _vazio(distintos, precisao):
+    return {
+        'distintos': distintos,
+        'precisao': precisao,
+        'somas': pd.DataFrame(columns=CHAVES_DESEMPENHO + COLUNAS_SOMAS),
+        'novos': pd.DataFrame(columns=CHAVES_DESEMPENHO + (['Product_ID'] if distintos == 'exato' else [])),
+        'registradores': np.zeros((0, 1 << precisao), dtype=np.uint8) if distintos == 'hll' else None
+    }
+
+
+def _unir_registradores(chaves, registradores, colunas):
+    # Um estimador por grupo de 'colunas': união dos HyperLogLog é o máximo de cada registrador
+    if chaves.empty:
+        return chaves[colunas].reset_index(drop=True), registradores
+    codigos = chaves.groupby(colunas, sort=True, observed=True).ngroup().to_numpy()
+    ordem = np.argsort(codigos, kind='stable')
+    inicios = np.flatnonzero(np.r_[True, np.diff(codigos[ordem]) > 0])
+    unidos = np.maximum.reduceat(registradores[ordem], inicios, axis=0)
+    return chaves[colunas].iloc[ordem[inicios]].reset_index(drop=True), unidos
+
+
+def construir_desempenho(dados, distintos='exato', precisao=PRECISAO_HLL, coluna_data='Sale_Date'):
+    """
+    Calcula os agregados de desempenho por (mês, região, canal, representante)
+    (base de sales_rep_performance em sql/table_creation_scripts/performance_repres.sql).
+
+    As somas e os clientes novos distintos (COUNT(DISTINCT Product_ID) dos clientes 'New', como no SQL)
+    ficam em uma forma que pode ser mesclada e reagregada a qualquer nível acima do grão: o conjunto
+    exato dos pares distintos ou, com distintos='hll', um HyperLogLog de 2^precisao registradores por grupo.
+
+    Parâmetros:
+    - dados (pandas.DataFrame): DataFrame com as vendas.
+    - distintos (str): 'exato' ou 'hll'.
+    - precisao (int): Precisão do HyperLogLog (erro relativo típico de 1.04 / sqrt(2^precisao)).
+    - coluna_data (str): Coluna com a data da venda.
+
+    Retorna:
+    - dict: {'distintos', 'precisao', 'somas', 'novos', 'registradores'} (ver tabela_desempenho).
+    """
+    _validar_modo(distintos)
+    colunas_necessarias = [coluna_data, 'Region', 'Sales_Channel', 'Sales_Rep', 'Sales_Amount', 'Discount',
+                           'Customer_Type', 'Product_ID']
+    colunas_invalidas = [col for col in colunas_necessarias if col not in dados.columns]
+    if colunas_invalidas:
+        raise ValueError(f"Colunas inválidas: {colunas_invalidas}")
+
+    # Mês como inteiro no agrupamento; só os rótulos dos grupos são formatados como 'AAAA-MM'
+    base = pd.DataFrame({
+        'month': mes_inteiro(dados[coluna_data]),
+        'Region': dados['Region'].reset_index(drop=True),
+        'Sales_Channel': dados['Sales_Channel'].reset_index(drop=True),
+        'Sales_Rep': dados['Sales_Rep'].reset_index(drop=True),
+        'Sales_Amount': dados['Sales_Amount'].to_numpy(dtype='float64'),
+        'Discount': dados['Discount'].to_numpy(dtype='float64')
+    })
+    somas = base.groupby(CHAVES_DESEMPENHO, sort=True, observed=True).agg(
+        total_sales=('Sales_Amount', 'sum'),
+        soma_desconto=('Discount', 'sum'),
+        contagem=('Sales_Amount', 'count')
+    ).reset_index()
+
+    novos = (dados['Customer_Type'] == 'New').to_numpy()
+    chaves_novos = base.loc[novos, CHAVES_DESEMPENHO].reset_index(drop=True)
+    registradores = None
+    if distintos == 'exato':
+        chaves_novos['Product_ID'] = dados.loc[novos, 'Product_ID'].to_numpy()
+        chaves_novos = chaves_novos.drop_duplicates()
+    else:
+        # Texto: o mesmo produto gera o mesmo hash em lotes tipados de formas diferentes
+        indices, posicoes = posicoes_hll(hash_valores(dados.loc[novos, 'Product_ID'].astype(str)), precisao)
+        grupos = chaves_novos.groupby(CHAVES_DESEMPENHO, sort=True, observed=True)
+        codigos = grupos.ngroup().to_numpy()
+        chaves_novos = grupos.size().reset_index()[CHAVES_DESEMPENHO]
+        registradores = np.zeros((len(chaves_novos), 1 << precisao), dtype=np.uint8)
+        np.maximum.at(registradores, (codigos, indices), posicoes)
+
+    # Texto simples nas chaves: lotes futuros podem trazer categorias diferentes
+    for tabela in (somas, chaves_novos):
+        tabela['month'] = rotulo_mes(tabela['month'].to_numpy())
+        for coluna in DIMENSOES_PARTICAO + ['Sales_Rep']:
+            tabela[coluna] = tabela[coluna].astype(str)
+    ordem_novos = CHAVES_DESEMPENHO + (['Product_ID'] if distintos == 'exato' else [])
+    return {
+        'distintos': distintos,
+        'precisao': precisao,
+        'somas': somas,
+        'novos': chaves_novos.sort_values(ordem_novos).reset_index(drop=True) if distintos == 'exato'
+        else chaves_novos.reset_index(drop=True),
+        'registradores': registradores
+    }
+
+
+def mesclar_desempenho(desempenho, desempenho_delta):
+    """
+    Incorpora os agregados de um novo lote (delta-merge) aos agregados existentes.
+    """
+    if (desempenho['distintos'], desempenho['precisao']) != (desempenho_delta['distintos'], desempenho_delta['precisao']):
+        raise ValueError("Os agregados usam modos de contagem distinta diferentes e não podem ser mesclados.")
+    partes = [parte for parte in (desempenho, desempenho_delta) if len(parte['somas'])]
+    if len(partes) < 2:
+        return partes[0] if partes else desempenho
+
+    somas = pd.concat([parte['somas'] for parte in partes], ignore_index=True)
+    somas = somas.groupby(CHAVES_DESEMPENHO, sort=True)[COLUNAS_SOMAS].sum().reset_index()
+    novos = pd.concat([parte['novos'] for parte in partes], ignore_index=True)
+    registradores = None
+    if desempenho['distintos'] == 'exato':
+        novos = novos.drop_duplicates().sort_values(CHAVES_DESEMPENHO + ['Product_ID']).reset_index(drop=True)
+    else:
+        novos, registradores = _unir_registradores(
+            novos, np.concatenate([parte['registradores'] for parte in partes]), CHAVES_DESEMPENHO)
+    return {'distintos': desempenho['distintos'], 'precisao': desempenho['precisao'], 'somas': somas,
+            'novos': novos, 'registradores': registradores}
+
+
+def tabela_desempenho(desempenho, nivel=('Sales_Rep', 'Region', 'month')):
+    """
+    Reagrega o armazém ao nível pedido (qualquer subconjunto de CHAVES_DESEMPENHO).
+
+    Parâmetros:
+    - desempenho (dict): Agregados de construir_desempenho, mesclar_desempenho ou ler_desempenho.
+    - nivel (list): Colunas do resultado (ex.: ['Sales_Rep', 'month'] reproduz sales_rep_performance).
+
+    Retorna:
+    - pandas.DataFrame: Colunas do nível seguidas de total_sales, avg_sale, sales_count, avg_discount
+      e new_clients (estimado pelo HyperLogLog quando distintos='hll').
+    """
+    nivel = list(nivel)
+    colunas_invalidas = [col for col in nivel if col not in CHAVES_DESEMPENHO]
+    if colunas_invalidas:
+        raise ValueError(f"Colunas inválidas: {colunas_invalidas}")
+
+    somas = desempenho['somas'].groupby(nivel, sort=True)[COLUNAS_SOMAS].sum()
+    contagem = somas['contagem'].astype('int64')
+    tabela = pd.DataFrame({
+        'total_sales': somas['total_sales'].astype('float64'),
+        'avg_sale': somas['total_sales'].astype('float64') / contagem,
+        'sales_count': contagem,
+        'avg_discount': somas['soma_desconto'].astype('float64') / contagem
+    })
+
+    if desempenho['distintos'] == 'exato':
+        novos = desempenho['novos'].drop_duplicates(nivel + ['Product_ID']).groupby(nivel, sort=True).size()
+    else:
+        chaves, registradores = _unir_registradores(desempenho['novos'], desempenho['registradores'], nivel)
+        indice = pd.MultiIndex.from_frame(chaves) if len(nivel) > 1 else pd.Index(chaves[nivel[0]])
+        novos = pd.Series(estimar_cardinalidade(registradores) if len(chaves) else [], index=indice, dtype='int64')
+    tabela['new_clients'] = novos.reindex(tabela.index).fillna(0).astype('int64')
+    return tabela.reset_index()
+
+
+def caminho_desempenho_padrao(caminho_dados, distintos='exato'):
+    """
+    Diretório padrão do armazém de desempenho, ao lado do dataset processado (um por modo de contagem distinta).
+    """
+    _validar_modo(distintos)
+    sufixo = '_desempenho' if distintos == 'exato' else '_desempenho_hll'
+    return os.path.splitext(caminho_dados.rstrip('/\\'))[0] + sufixo
+
+
+def _diretorio_mes(diretorio, mes):
+    return os.path.join(diretorio, f'{COLUNA_PARTICAO}={mes}')
+
+
+def _diretorio_particao(diretorio, mes, regiao, canal):
+    # Partições no estilo hive, com os valores escapados para nomes de diretório
+    return os.path.join(_diretorio_mes(diretorio, mes), f"Region={quote(regiao, safe='')}",
+                        f"Sales_Channel={quote(canal, safe='')}")
+
+
+def _valor_particao(nome, coluna):
+    prefixo = coluna + '='
+    return unquote(nome[len(prefixo):]) if nome.startswith(prefixo) else None
+
+
+def _selecionar(desempenho, linhas_somas, linhas_novos):
+    return {
+        'distintos': desempenho['distintos'],
+        'precisao': desempenho['precisao'],
+        'somas': desempenho['somas'].iloc[linhas_somas].reset_index(drop=True),
+        'novos': desempenho['novos'].iloc[linhas_novos].reset_index(drop=True),
+        'registradores': (desempenho['registradores'][linhas_novos]
+                          if desempenho['registradores'] is not None else None)
+    }
+
+
+def _dividir(desempenho, colunas):
+    # Separa os agregados pelos valores de 'colunas' (as partições), sem copiar as linhas de outras partições
+    grupos_novos = desempenho['novos'].groupby(colunas, sort=True).indices if len(desempenho['novos']) else {}
+    for chave, linhas in desempenho['somas'].groupby(colunas, sort=True).indices.items():
+        yield chave, _selecionar(desempenho, linhas, grupos_novos.get(chave, np.empty(0, dtype='int64')))
+
+
+def _assinatura(desempenho):
+    # Conteúdo de uma partição de mês: só os meses com assinatura diferente são regravados. As somas são
+    # arredondadas para que a ordem das parcelas (lotes mesclados x recálculo) não altere a assinatura
+    resumo = hashlib.sha256()
+    for tabela in (desempenho['somas'].round(6), desempenho['novos']):
+        if len(tabela):
+            resumo.update(hash_valores(tabela).tobytes())
+    if desempenho['registradores'] is not None:
+        resumo.update(desempenho['registradores'].tobytes())
+    return resumo.hexdigest()
+
+
+def _gravar_mes(diretorio, mes, desempenho):
+    # Grava o mês em um diretório temporário e só então substitui a partição anterior
+    temporario = os.path.join(diretorio, f'.{COLUNA_PARTICAO}={mes}-{uuid.uuid4().hex}')
+    for (regiao, canal), parte in _dividir(desempenho, DIMENSOES_PARTICAO):
+        destino = _diretorio_particao(temporario, mes, regiao, canal)
+        os.makedirs(destino, exist_ok=True)
+        pd.to_pickle(parte, os.path.join(destino, ARQUIVO_PARTICAO))
+    final = _diretorio_mes(diretorio, mes)
+    if os.path.isdir(final):
+        shutil.rmtree(final)
+    os.replace(_diretorio_mes(temporario, mes), final)
+    shutil.rmtree(temporario)
+
+
+def ler_manifesto(diretorio):
+    """
+    Lê o manifesto do armazém (versão do dataset, modo de contagem e assinatura de cada mês).
+    Retorna None se não existir ou estiver corrompido.
+    """
+    caminho = os.path.join(diretorio, ARQUIVO_MANIFESTO)
+    if not os.path.exists(caminho):
+        return None
+    try:
+        with open(caminho, encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+
+
+def _salvar_manifesto(diretorio, manifesto):
+    temporario = os.path.join(diretorio, f'.{ARQUIVO_MANIFESTO}-{uuid.uuid4().hex}')
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, os.path.join(diretorio, ARQUIVO_MANIFESTO))
+
+
+def _manifesto_atual(manifesto, versao, distintos, precisao):
+    return (manifesto is not None and manifesto.get('formato') == VERSAO_DESEMPENHO
+            and manifesto.get('versao_dados') == list(versao)
+            and (manifesto.get('distintos'), manifesto.get('precisao')) == (distintos, precisao))
+
+
+def materializar_desempenho(caminho_dados, dados=None, diretorio=None, distintos='exato', precisao=PRECISAO_HLL):
+    """
+    Materializa o armazém de desempenho em disco, particionado por mês, região e canal
+    (mes=AAAA-MM/Region=.../Sales_Channel=.../particao.pkl).
+
+    A atualização é por partição: os agregados de todos os meses são recalculados em uma passada,
+    mas apenas os meses cujo conteúdo mudou são regravados, e os meses que deixaram de existir são removidos.
+
+    Parâmetros:
+    - caminho_dados (str): Caminho do CSV ou do diretório colunar processado.
+    - dados (pandas.DataFrame, opcional): Vendas já carregadas de caminho_dados.
+    - diretorio (str, opcional): Diretório do armazém. Se None, usa caminho_desempenho_padrao.
+    - distintos (str): 'exato' ou 'hll'.
+    - precisao (int): Precisão do HyperLogLog.
+
+    Retorna:
+    - dict: Meses regravados e removidos.
+    """
+    if diretorio is None:
+        diretorio = caminho_desempenho_padrao(caminho_dados, distintos)
+    versao = versao_dados(caminho_dados)
+    if dados is None:
+        dados = carregar_vendas(caminho_dados)
+    desempenho = construir_desempenho(dados, distintos, precisao)
+
+    manifesto = ler_manifesto(diretorio)
+    compativel = (manifesto is not None and manifesto.get('formato') == VERSAO_DESEMPENHO
+                  and (manifesto.get('distintos'), manifesto.get('precisao')) == (distintos, precisao))
+    if not compativel and os.path.isdir(diretorio):
+        shutil.rmtree(diretorio)
+    os.makedirs(diretorio, exist_ok=True)
+    anteriores = manifesto['meses'] if compativel else {}
+
+    meses, regravados = {}, []
+    for mes, parte in _dividir(desempenho, ['month']):
+        meses[mes] = _assinatura(parte)
+        if anteriores.get(mes) != meses[mes]:
+            _gravar_mes(diretorio, mes, parte)
+            regravados.append(mes)
+    removidos = sorted(set(anteriores) - set(meses))
+    for mes in removidos:
+        shutil.rmtree(_diretorio_mes(diretorio, mes), ignore_errors=True)
+
+    _salvar_manifesto(diretorio, {'formato': VERSAO_DESEMPENHO, 'versao_dados': list(versao),
+                                  'distintos': distintos, 'precisao': precisao, 'meses': meses})
+    return {'Meses Regravados': regravados, 'Meses Removidos': removidos}
+
+
+def atualizar_desempenho(diretorio, lote, caminho_dados, versao_anterior):
+    """
+    Incorpora um lote de vendas novas ao armazém, regravando apenas as partições dos meses do lote.
+
+    Só é aplicado se o armazém corresponde à versão anterior do dataset; caso contrário fica
+    desatualizado e é refeito por obter_desempenho (que também regrava apenas os meses alterados).
+
+    Parâmetros:
+    - diretorio (str): Diretório do armazém.
+    - lote (pandas.DataFrame): Vendas novas, já anexadas a caminho_dados.
+    - caminho_dados (str): Dataset atualizado.
+    - versao_anterior: Versão do dataset antes do lote (ver src.cubo.versao_dados).
+
+    Retorna:
+    - list: Meses regravados.
+    """
+    manifesto = ler_manifesto(diretorio)
+    if versao_anterior is None or manifesto is None or not _manifesto_atual(
+            manifesto, versao_anterior, manifesto.get('distintos'), manifesto.get('precisao')):
+        return []
+
+    delta = construir_desempenho(lote, manifesto['distintos'], manifesto['precisao'])
+    regravados = []
+    for mes, parte_delta in _dividir(delta, ['month']):
+        parte = parte_delta
+        if mes in manifesto['meses']:
+            parte = mesclar_desempenho(ler_desempenho(diretorio, meses=[mes]), parte_delta)
+        _gravar_mes(diretorio, mes, parte)
+        manifesto['meses'][mes] = _assinatura(parte)
+        regravados.append(mes)
+
+    manifesto['versao_dados'] = list(versao_dados(caminho_dados))
+    _salvar_manifesto(diretorio, manifesto)
+    return regravados
+
+
+def listar_particoes(diretorio):
+    """
+    Partições (mês, região, canal) presentes no armazém.
+
+    Retorna:
+    - pandas.DataFrame: Colunas month, Region e Sales_Channel.
+    """
+    manifesto = ler_manifesto(diretorio)
+    if manifesto is None:
+        raise FileNotFoundError(f"Armazém de desempenho não encontrado em '{diretorio}'.")
+    particoes = []
+    for mes in sorted(manifesto['meses']):
+        diretorio_mes = _diretorio_mes(diretorio, mes)
+        for nome_regiao in sorted(os.listdir(diretorio_mes)):
+            regiao = _valor_particao(nome_regiao, 'Region')
+            for nome_canal in sorted(os.listdir(os.path.join(diretorio_mes, nome_regiao))):
+                particoes.append((mes, regiao, _valor_particao(nome_canal, 'Sales_Channel')))
+    return pd.DataFrame(particoes, columns=['month'] + DIMENSOES_PARTICAO)
+
+
+def ler_desempenho(diretorio, meses=None, regioes=None, canais=None):
+    """
+    Lê o armazém abrindo apenas as partições dos meses, regiões e canais pedidos.
+
+    Parâmetros:
+    - diretorio (str): Diretório do armazém.
+    - meses, regioes, canais (list, opcional): Valores das partições. Se None, todos.
+
+    Retorna:
+    - dict: Agregados no formato de construir_desempenho (ver tabela_desempenho).
+    """
+    manifesto = ler_manifesto(diretorio)
+    if manifesto is None:
+        raise FileNotFoundError(f"Armazém de desempenho não encontrado em '{diretorio}'.")
+    selecionadas = listar_particoes(diretorio)
+    for coluna, valores in (('month', meses), ('Region', regioes), ('Sales_Channel', canais)):
+        if valores is not None:
+            selecionadas = selecionadas[selecionadas[coluna].isin([str(valor) for valor in valores])]
+
+    partes = [pd.read_pickle(os.path.join(_diretorio_particao(diretorio, mes, regiao, canal), ARQUIVO_PARTICAO))
+              for mes, regiao, canal in selecionadas.itertuples(index=False)]
+    if not partes:
+        return _vazio(manifesto['distintos'], manifesto['precisao'])
+    return {
+        'distintos': manifesto['distintos'],
+        'precisao': manifesto['precisao'],
+        'somas': pd.concat([parte['somas'] for parte in partes], ignore_index=True),
+        'novos': pd.concat([parte['novos'] for parte in partes], ignore_index=True),
+        'registradores': (np.concatenate([parte['registradores'] for parte in partes])
+                          if manifesto['distintos'] == 'hll' else None)
+    }
+
+
+def preparar_desempenho(caminho_dados, distintos='exato', diretorio=None, precisao=PRECISAO_HLL):
+    """
+    Garante que o armazém corresponde à versão atual do dataset, atualizando-o por partição
+    (ver materializar_desempenho) se o dataset mudou.
+
+    Retorna:
+    - str: Diretório do armazém.
+    """
+    if diretorio is None:
+        diretorio = caminho_desempenho_padrao(caminho_dados, distintos)
+    with _trava:
+        if not _manifesto_atual(ler_manifesto(diretorio), versao_dados(caminho_dados), distintos, precisao):
+            materializar_desempenho(caminho_dados, diretorio=diretorio, distintos=distintos, precisao=precisao)
+    return diretorio
+
+
+def obter_desempenho(caminho_dados, distintos='exato', meses=None, regioes=None, canais=None, diretorio=None,
+                     precisao=PRECISAO_HLL):
+    """
+    Retorna os agregados de desempenho das partições pedidas, atualizando antes o armazém se o dataset mudou.
+
+    Parâmetros:
+    - caminho_dados (str): Caminho do CSV ou do diretório colunar processado.
+    - distintos (str): 'exato' ou 'hll'.
+    - meses, regioes, canais (list, opcional): Partições lidas. Se None, todas.
+    - diretorio (str, opcional): Diretório do armazém. Se None, usa caminho_desempenho_padrao.
+    - precisao (int): Precisão do HyperLogLog.
+
+    Retorna:
+    - dict: Agregados de desempenho (ver tabela_desempenho).
+    """
+    diretorio = preparar_desempenho(caminho_dados, distintos, diretorio, precisao)
+    return ler_desempenho(diretorio, meses, regioes, canais)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Materializa o armazém de desempenho por representante, região e mês.")
+    parser.add_argument('caminho_dados', help='CSV ou diretório colunar processado')
+    parser.add_argument('--distintos', choices=MODOS_DISTINTOS, default='exato')
+    argumentos = parser.parse_args()
+
+    resumo = materializar_desempenho(argumentos.caminho_dados, distintos=argumentos.distintos)
+    print(f"Meses regravados: {', '.join(resumo['Meses Regravados']) or 'nenhum'}")
+    print(f"Meses removidos: {', '.join(resumo['Meses Removidos']) or 'nenhum'}")
+    print(tabela_desempenho(obter_desempenho(argumentos.caminho_dados, argumentos.distintos),
+                            ['Sales_Rep', 'Region']).to_string(index=False))
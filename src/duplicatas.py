@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+
+from src.estruturas_probabilisticas import CountMinSketch, HyperLogLog, hash_valores
+
+
+def _fatorar(serie):
+    # Fatoração por tabela hash: códigos inteiros (-1 para nulos) e valores distintos
+    codigos, distintos = pd.factorize(serie, use_na_sentinel=True)
+    contagens = np.bincount(codigos[codigos >= 0], minlength=len(distintos))
+    return contagens, distintos, int(np.count_nonzero(codigos < 0))
+
+
+def _escalar(valor):
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+def _mais_frequentes(contagens, valores, top_k):
+    # Seleciona os top_k maiores contadores (> 1) sem ordenar o vetor inteiro
+    if len(contagens) > top_k:
+        indices = np.argpartition(-contagens, top_k - 1)[:top_k]
+    else:
+        indices = np.arange(len(contagens))
+    indices = indices[contagens[indices] > 1]
+    indices = indices[np.argsort(-contagens[indices], kind='stable')]
+    return {_escalar(valores[i]): int(contagens[i]) for i in indices}
+
+
+def _resultado(total, distintos, mais_frequentes, aproximado):
+    quantidade = max(total - distintos, 0)
+    return {
+        'possui_duplicados': quantidade > 0,
+        'quantidade_duplicados': quantidade,
+        'distintos': distintos,
+        'valores_mais_frequentes': mais_frequentes,
+        'aproximado': aproximado
+    }
+
+
+class PerfilDuplicatasAproximado:
+    """
+    Perfil de duplicatas acumulado bloco a bloco com memória fixa por coluna.
+
+    O número de valores distintos é estimado por HyperLogLog e as contagens dos valores mais
+    frequentes por Count-Min Sketch. Cada bloco contribui com seus valores mais frequentes como
+    candidatos; apenas fator_candidatos * top_k candidatos são mantidos entre os blocos.
+    """
+
+    def __init__(self, top_k=10, precisao=14, largura=1 << 16, profundidade=4, fator_candidatos=10):
+        self.top_k = top_k
+        self.precisao = precisao
+        self.largura = largura
+        self.profundidade = profundidade
+        self.limite_candidatos = max(top_k, 1) * fator_candidatos
+        self.colunas = {}
+
+    def _estado(self, coluna):
+        if coluna not in self.colunas:
+            self.colunas[coluna] = {
+                'total': 0,
+                'nulos': 0,
+                'hll': HyperLogLog(self.precisao),
+                'cms': CountMinSketch(self.largura, self.profundidade),
+                'candidatos': {}
+            }
+        return self.colunas[coluna]
+
+    def atualizar(self, bloco):
+        """
+        Incorpora um bloco (DataFrame) ao perfil.
+        """
+        for coluna in bloco.columns:
+            estado = self._estado(coluna)
+            contagens, distintos, nulos = _fatorar(bloco[coluna])
+            estado['total'] += len(bloco)
+            estado['nulos'] += nulos
+            if not len(distintos):
+                continue
+
+            hashes = hash_valores(pd.Series(distintos))
+            estado['hll'].adicionar(hashes)
+            estado['cms'].adicionar(hashes, contagens)
+
+            # Candidatos a valores mais frequentes: os mais frequentes do bloco
+            locais = min(self.limite_candidatos, len(contagens))
+            for i in np.argpartition(-contagens, locais - 1)[:locais]:
+                estado['candidatos'].setdefault(int(hashes[i]), distintos[i])
+            if len(estado['candidatos']) > self.limite_candidatos:
+                chaves = np.fromiter(estado['candidatos'], dtype=np.uint64)
+                estimativas = estado['cms'].estimar(chaves)
+                manter = chaves[np.argpartition(-estimativas, self.limite_candidatos - 1)[:self.limite_candidatos]]
+                estado['candidatos'] = {int(h): estado['candidatos'][int(h)] for h in manter}
+        return self
+
+    def relatorio(self):
+        """
+        Retorna o perfil no mesmo formato de perfilar_duplicatas.
+        """
+        resultado = {}
+        for coluna, estado in self.colunas.items():
+            nao_nulos = estado['total'] - estado['nulos']
+            distintos = min(estado['hll'].estimar(), nao_nulos) + (1 if estado['nulos'] else 0)
+            mais_frequentes = {}
+            if estado['candidatos']:
+                chaves = np.fromiter(estado['candidatos'], dtype=np.uint64)
+                valores = [estado['candidatos'][int(h)] for h in chaves]
+                mais_frequentes = _mais_frequentes(estado['cms'].estimar(chaves), valores, self.top_k)
+            resultado[coluna] = _resultado(estado['total'], distintos, mais_frequentes, True)
+        return resultado
+
+    @property
+    def memoria_bytes(self):
+        return sum(estado['hll'].memoria_bytes + estado['cms'].memoria_bytes for estado in self.colunas.values())
+
+
+def perfilar_duplicatas(df, colunas=None, top_k=10, aproximado=False, tamanho_bloco=1_000_000, **opcoes_aproximado):
+    """
+    Verifica valores duplicados em todas as colunas em uma única passada por coluna.
+
+    Substitui verificar_valores_duplicados: em vez de duplicated() e value_counts() repetidos e do
+    mapa completo de valores, cada coluna é fatorada uma vez (tabela hash) e apenas os top_k
+    valores mais frequentes são mantidos. Com aproximado=True, os distintos são estimados por
+    HyperLogLog e as contagens por Count-Min Sketch, bloco a bloco, com memória fixa.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame a ser analisado.
+    - colunas (list, opcional): Colunas a verificar. Se None, verifica todas as colunas.
+    - top_k (int): Quantidade de valores mais frequentes reportados por coluna.
+    - aproximado (bool): Se True, usa os estimadores probabilísticos.
+    - tamanho_bloco (int): Linhas por bloco no modo aproximado.
+    - opcoes_aproximado: Parâmetros de PerfilDuplicatasAproximado (precisao, largura, profundidade).
+
+    Retorna:
+    - dict: Para cada coluna, possui_duplicados, quantidade_duplicados, distintos,
+      valores_mais_frequentes (valor -> ocorrências) e aproximado.
+    """
+    if colunas is None:
+        colunas = df.columns
+    colunas_invalidas = [col for col in colunas if col not in df.columns]
+    if colunas_invalidas:
+        raise ValueError(f"Colunas inválidas: {colunas_invalidas}")
+
+    if aproximado:
+        perfil = PerfilDuplicatasAproximado(top_k, **opcoes_aproximado)
+        for inicio in range(0, len(df), tamanho_bloco):
+            perfil.atualizar(df[list(colunas)].iloc[inicio:inicio + tamanho_bloco])
+        return perfil.relatorio()
+
+    resultado = {}
+    for coluna in colunas:
+        contagens, distintos, nulos = _fatorar(df[coluna])
+        # Nulos contam como um valor (como em duplicated()), mas não entram nos mais frequentes
+        total_distintos = len(distintos) + (1 if nulos else 0)
+        resultado[coluna] = _resultado(len(df), total_distintos, _mais_frequentes(contagens, distintos, top_k), False)
+    return resultado
+
+
+def tabela_duplicatas(resultado):
+    """
+    Resume o perfil de duplicatas em uma tabela com uma linha por coluna.
+    """
+    return pd.DataFrame([
+        {
+            'Coluna': coluna,
+            'Distintos': info['distintos'],
+            'Duplicados': info['quantidade_duplicados'],
+            'Mais Frequente': next(iter(info['valores_mais_frequentes']), None),
+            'Ocorrências': next(iter(info['valores_mais_frequentes'].values()), 0),
+            'Aproximado': info['aproximado']
+        }
+        for coluna, info in resultado.items()
+    ])
+
+
+def exibir_duplicatas(resultado):
+    """
+    Exibe o perfil de duplicatas de forma compacta (uma linha por valor frequente).
+    """
+    print("=== Análise de Valores Duplicados ===\n")
+    for coluna, info in resultado.items():
+        print(f"\nColuna: {coluna}")
+        if info['possui_duplicados']:
+            aproximado = ' (aproximado)' if info['aproximado'] else ''
+            print(f"Status: Possui {info['quantidade_duplicados']} valores duplicados "
+                  f"em {info['distintos']} valores distintos{aproximado}")
+            print(f"{len(info['valores_mais_frequentes'])} valores mais frequentes:")
+            for valor, contagem in info['valores_mais_frequentes'].items():
+                print(f"  - Valor: {valor} | Ocorrências: {contagem}")
+        else:
+            print("Status: Não possui valores duplicados")
@@ -0,0 +1,244 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def hash_valores(valores):
+    """
+    Calcula um hash de 64 bits por valor (estável entre blocos e independente do tipo da coluna).
+
+    Parâmetros:
+    - valores (pandas.Series ou pandas.DataFrame): Valores a serem convertidos. Para um DataFrame,
+      o hash representa a linha inteira.
+
+    Retorna:
+    - numpy.ndarray: Hashes uint64.
+    """
+    return pd.util.hash_pandas_object(valores, index=False).to_numpy()
+
+
+def _indices_duplos(hashes, quantidade, modulo):
+    # Hashing duplo: h1 + i * h2 gera 'quantidade' índices por item
+    h1 = hashes & np.uint64(0xFFFFFFFF)
+    h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+    i = np.arange(quantidade, dtype=np.uint64)
+    return (h1[None, :] + i[:, None] * h2[None, :]) % np.uint64(modulo)
+
+
+class FiltroBloom:
+    """
+    Filtro de Bloom sobre hashes de 64 bits, com tamanho fixo definido pela capacidade e taxa de erro.
+    Responde "já visto" com falsos positivos na taxa configurada e sem falsos negativos.
+    """
+
+    def __init__(self, capacidade, taxa_erro=0.01):
+        self.bits = max(64, int(-capacidade * math.log(taxa_erro) / math.log(2) ** 2))
+        self.funcoes = max(1, round(self.bits / capacidade * math.log(2)))
+        self.vetor = np.zeros((self.bits + 7) // 8, dtype=np.uint8)
+
+    def _posicoes(self, hashes):
+        return _indices_duplos(hashes, self.funcoes, self.bits).T
+
+    def contem(self, hashes):
+        """
+        Indica, para cada hash, se ele possivelmente já foi adicionado.
+        """
+        posicoes = self._posicoes(hashes)
+        bits = (self.vetor[posicoes >> np.uint64(3)] >> (posicoes & np.uint64(7)).astype(np.uint8)) & 1
+        return bits.all(axis=1)
+
+    def adicionar(self, hashes):
+        """
+        Adiciona os hashes ao filtro.
+        """
+        posicoes = self._posicoes(hashes).ravel()
+        np.bitwise_or.at(self.vetor, posicoes >> np.uint64(3),
+                         (np.uint8(1) << (posicoes & np.uint64(7)).astype(np.uint8)))
+
+    @property
+    def memoria_bytes(self):
+        return self.vetor.nbytes
+
+
+class ContadorDuplicatas:
+    """
+    Conta valores repetidos ao longo de vários blocos.
+
+    Com metodo='exato', mantém os hashes já vistos em arrays ordenados cujos tamanhos crescem
+    geometricamente (cada array tem mais que o dobro do seguinte, no máximo log2 dos distintos):
+    cada bloco ordena apenas os próprios hashes novos e só os arrays menores são fundidos, sem
+    reordenar o conjunto inteiro a cada bloco.
+    A memória cresce com o número de valores distintos (8 bytes por valor).
+
+    Com metodo='bloom', migra para um filtro de Bloom de tamanho fixo quando o número de valores
+    distintos passa de limite_exato. O filtro ocupa -capacidade_bloom * ln(taxa_erro) / ln(2)^2 bits:
+    com os padrões (1e8 valores, 1%), cerca de 120 MB por contador, alocados de uma vez na migração.
+    """
+
+    def __init__(self, metodo='exato', limite_exato=1_000_000, capacidade_bloom=100_000_000, taxa_erro=0.01):
+        if metodo not in ('exato', 'bloom'):
+            raise ValueError(f"Método inválido: '{metodo}'. Use 'exato' ou 'bloom'.")
+        self.metodo = metodo
+        self.limite_exato = limite_exato
+        self.capacidade_bloom = capacidade_bloom
+        self.taxa_erro = taxa_erro
+        self.vistos = []
+        self.bloom = None
+
+    @property
+    def aproximado(self):
+        return self.bloom is not None
+
+    @property
+    def distintos(self):
+        return sum(len(ordenados) for ordenados in self.vistos)
+
+    def _contem(self, hashes):
+        encontrados = np.zeros(len(hashes), dtype=bool)
+        for ordenados in self.vistos:
+            posicoes = np.minimum(np.searchsorted(ordenados, hashes), len(ordenados) - 1)
+            encontrados |= ordenados[posicoes] == hashes
+        return encontrados
+
+    def _adicionar(self, hashes):
+        if not len(hashes):
+            return
+        # Os hashes já são inéditos; o sort estável (timsort) funde os dois arrays ordenados em tempo linear
+        self.vistos.append(np.sort(hashes))
+        while len(self.vistos) > 1 and len(self.vistos[-2]) <= 2 * len(self.vistos[-1]):
+            ultimo = self.vistos.pop()
+            self.vistos[-1] = np.sort(np.concatenate([self.vistos[-1], ultimo]), kind='stable')
+
+    def atualizar(self, hashes):
+        """
+        Registra um bloco de hashes.
+
+        Retorna:
+        - numpy.ndarray: Máscara booleana com True para os itens repetidos (já vistos antes,
+          neste bloco ou em blocos anteriores).
+        """
+        repetidos_no_bloco = pd.Series(hashes).duplicated(keep='first').to_numpy()
+        repetidos = repetidos_no_bloco.copy()
+        novos = hashes[~repetidos_no_bloco]
+
+        if self.bloom is None:
+            vistos = self._contem(novos)
+            repetidos[~repetidos_no_bloco] = vistos
+            self._adicionar(novos[~vistos])
+            if self.metodo == 'bloom' and self.distintos > self.limite_exato:
+                self.bloom = FiltroBloom(self.capacidade_bloom, self.taxa_erro)
+                for ordenados in self.vistos:
+                    self.bloom.adicionar(ordenados)
+                self.vistos = []
+        else:
+            repetidos[~repetidos_no_bloco] = self.bloom.contem(novos)
+            self.bloom.adicionar(novos)
+
+        return repetidos
+
+    @property
+    def memoria_bytes(self):
+        return self.bloom.memoria_bytes if self.bloom is not None else sum(o.nbytes for o in self.vistos)
+
+
+def posicoes_hll(hashes, precisao):
+    """
+    Registrador e posição do primeiro bit 1 de cada hash no HyperLogLog.
+
+    Retorna:
+    - tuple: (índices dos registradores int64, posições uint8); o registrador guarda a maior posição.
+    """
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    bits_restantes = 64 - precisao
+    indices = (hashes >> np.uint64(bits_restantes)).astype(np.int64)
+    restante = hashes & np.uint64((1 << bits_restantes) - 1)
+
+    # Posição do primeiro bit 1 nos bits restantes (1 = bit mais significativo)
+    posicao = np.full(len(hashes), bits_restantes + 1, dtype=np.uint8)
+    nao_zero = restante > 0
+    posicao[nao_zero] = (bits_restantes - np.floor(np.log2(restante[nao_zero].astype(np.float64)))).astype(np.uint8)
+    return indices, posicao
+
+
+def estimar_cardinalidade(registradores):
+    """
+    Estimativa do HyperLogLog para um vetor de registradores ou para cada linha de uma matriz
+    (vários estimadores de mesma precisão).
+
+    Retorna:
+    - int ou numpy.ndarray: Número estimado de valores distintos.
+    """
+    registradores = np.asarray(registradores)
+    matriz = np.atleast_2d(registradores)
+    m = matriz.shape[1]
+    alfa = 0.7213 / (1 + 1.079 / m)
+    estimativa = alfa * m * m / np.sum(np.power(2.0, -matriz.astype(np.float64)), axis=1)
+    zeros = np.count_nonzero(matriz == 0, axis=1)
+    # Correção para cardinalidades pequenas (contagem linear)
+    linear = (estimativa <= 2.5 * m) & (zeros > 0)
+    estimativa[linear] = m * np.log(m / zeros[linear])
+    estimativa = np.round(estimativa).astype(np.int64)
+    return int(estimativa[0]) if registradores.ndim == 1 else estimativa
+
+
+class HyperLogLog:
+    """
+    Estimador de cardinalidade (número de valores distintos) com memória fixa de 2^precisao bytes.
+    O erro relativo típico é 1.04 / sqrt(2^precisao) (cerca de 0,8% com precisao=14).
+    """
+
+    def __init__(self, precisao=14):
+        self.precisao = precisao
+        self.registradores = np.zeros(1 << precisao, dtype=np.uint8)
+
+    def adicionar(self, hashes):
+        """
+        Adiciona os hashes ao estimador.
+        """
+        indices, posicao = posicoes_hll(hashes, self.precisao)
+        np.maximum.at(self.registradores, indices, posicao)
+
+    def estimar(self):
+        """
+        Retorna a estimativa do número de valores distintos adicionados.
+        """
+        return estimar_cardinalidade(self.registradores)
+
+    @property
+    def memoria_bytes(self):
+        return self.registradores.nbytes
+
+
+class CountMinSketch:
+    """
+    Sketch de frequências com memória fixa (profundidade x largura contadores).
+    Nunca subestima a contagem de um item; a superestimação é limitada por ~ 2 * total / largura.
+    """
+
+    def __init__(self, largura=1 << 16, profundidade=4):
+        self.largura = largura
+        self.profundidade = profundidade
+        self.tabela = np.zeros((profundidade, largura), dtype=np.int64)
+
+    def adicionar(self, hashes, contagens=None):
+        """
+        Soma as contagens (1 por item, se None) aos hashes informados.
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        contagens = np.ones(len(hashes), dtype=np.int64) if contagens is None else np.asarray(contagens, dtype=np.int64)
+        indices = _indices_duplos(hashes, self.profundidade, self.largura).astype(np.int64)
+        for linha in range(self.profundidade):
+            self.tabela[linha] += np.bincount(indices[linha], weights=contagens, minlength=self.largura).astype(np.int64)
+
+    def estimar(self, hashes):
+        """
+        Retorna a contagem estimada de cada hash.
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        indices = _indices_duplos(hashes, self.profundidade, self.largura).astype(np.int64)
+        return self.tabela[np.arange(self.profundidade)[:, None], indices].min(axis=0)
+
+    @property
+    def memoria_bytes(self):
+        return self.tabela.nbytes
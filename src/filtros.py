@@ -0,0 +1,313 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.carregamento import carregar_vendas
+from src.cubo import COLUNA_DIA, versao_dados
+
+# Dimensões disponíveis nos filtros da barra lateral dos dashboards
+DIMENSOES_FILTRO = ['Region', 'Sales_Channel', 'Customer_Type', 'Payment_Method']
+
+ROTULOS_FILTRO = {
+    'Region': 'Região',
+    'Sales_Channel': 'Canal de Vendas',
+    'Customer_Type': 'Tipo de Cliente',
+    'Payment_Method': 'Método de Pagamento'
+}
+
+# Número de combinações de filtros mantidas em cache (as menos usadas recentemente são descartadas)
+LIMITE_CACHE_FILTROS = int(os.environ.get('SALES_FILTER_CACHE_SIZE', 32))
+
+_indices = {}
+_trava = threading.Lock()
+
+
+class IndiceBitmap:
+    """
+    Índice de filtros sobre as vendas: Sale_Date ordenada (intervalos por busca binária) e,
+    para cada dimensão, um bitmap compactado (numpy.packbits) por categoria.
+
+    Os bitmaps seguem a ordem das datas, então um intervalo de datas corresponde a uma faixa
+    contígua de bytes, e a seleção é a interseção (AND) das uniões (OR) de bitmaps de cada
+    dimensão apenas dentro dessa faixa.
+    """
+
+    def __init__(self, dados, dimensoes=None, coluna_data=COLUNA_DIA):
+        if dimensoes is None:
+            dimensoes = [dim for dim in DIMENSOES_FILTRO if dim in dados.columns]
+        colunas_invalidas = [col for col in list(dimensoes) + [coluna_data] if col not in dados.columns]
+        if colunas_invalidas:
+            raise ValueError(f"Colunas inválidas: {colunas_invalidas}")
+
+        datas = pd.to_datetime(dados[coluna_data]).to_numpy()
+        ordem = np.argsort(datas, kind='stable')
+        self.ordem = ordem.astype(np.int32) if len(ordem) < 2 ** 31 else ordem
+        self.datas = datas[ordem]
+        self.linhas = len(dados)
+        self.categorias = {}
+        self.bitmaps = {}
+        for dimensao in dimensoes:
+            valores = dados[dimensao]
+            if isinstance(valores.dtype, pd.CategoricalDtype):
+                codigos, categorias = valores.cat.codes.to_numpy(), list(valores.cat.categories)
+            else:
+                codigos, categorias = pd.factorize(valores, sort=True)
+                categorias = list(categorias)
+            codigos = codigos[self.ordem]
+            self.categorias[dimensao] = categorias
+            self.bitmaps[dimensao] = np.vstack(
+                [np.packbits(codigos == codigo) for codigo in range(len(categorias))]
+            ) if categorias else np.zeros((0, -(-self.linhas // 8)), dtype=np.uint8)
+
+    @property
+    def memoria_bytes(self):
+        return (self.ordem.nbytes + self.datas.nbytes
+                + sum(bitmap.nbytes for bitmap in self.bitmaps.values()))
+
+    def intervalo_datas(self):
+        """
+        Primeira e última data do índice.
+        """
+        if not self.linhas:
+            return None, None
+        return pd.Timestamp(self.datas[0]), pd.Timestamp(self.datas[-1])
+
+    def _faixa(self, data_inicio, data_fim):
+        # Posições [inicio, fim) no vetor ordenado; data_fim é inclusiva (dia inteiro)
+        inicio = 0 if data_inicio is None else int(np.searchsorted(
+            self.datas, np.datetime64(pd.Timestamp(data_inicio)), side='left'))
+        fim = self.linhas if data_fim is None else int(np.searchsorted(
+            self.datas, np.datetime64(pd.Timestamp(data_fim).normalize() + pd.Timedelta(days=1)), side='left'))
+        return inicio, max(inicio, fim)
+
+    def posicoes(self, data_inicio=None, data_fim=None, selecoes=None):
+        """
+        Posições (iloc) das linhas que atendem aos filtros, em ordem crescente.
+
+        Parâmetros:
+        - data_inicio, data_fim (str ou Timestamp, opcional): Intervalo de Sale_Date (inclusivo).
+        - selecoes (dict, opcional): Dimensão -> valores aceitos. Dimensões ausentes (ou None) não filtram.
+
+        Retorna:
+        - numpy.ndarray: Posições das linhas selecionadas.
+        """
+        inicio, fim = self._faixa(data_inicio, data_fim)
+        byte_inicio, byte_fim = inicio // 8, -(-fim // 8)
+
+        selecao = None
+        for dimensao, valores in (selecoes or {}).items():
+            if valores is None:
+                continue
+            if dimensao not in self.bitmaps:
+                raise ValueError(f"Dimensão sem índice: '{dimensao}'")
+            codigos = [self.categorias[dimensao].index(valor) for valor in valores if valor in self.categorias[dimensao]]
+            if not codigos:
+                return np.array([], dtype='int64')
+            bits = np.bitwise_or.reduce(self.bitmaps[dimensao][codigos, byte_inicio:byte_fim], axis=0)
+            selecao = bits if selecao is None else selecao & bits
+
+        if selecao is None:
+            ordenadas = np.arange(inicio, fim)
+        else:
+            ordenadas = np.flatnonzero(np.unpackbits(selecao)) + byte_inicio * 8
+            # Os bytes das bordas podem conter linhas fora do intervalo de datas
+            ordenadas = ordenadas[(ordenadas >= inicio) & (ordenadas < fim)]
+        return np.sort(self.ordem[ordenadas])
+
+    def filtrar(self, dados, data_inicio=None, data_fim=None, selecoes=None):
+        """
+        Retorna as linhas de dados (o mesmo DataFrame usado no índice) que atendem aos filtros.
+        """
+        if len(dados) != self.linhas:
+            raise ValueError("O DataFrame não corresponde ao índice (número de linhas diferente).")
+        if data_inicio is None and data_fim is None and not any(v is not None for v in (selecoes or {}).values()):
+            return dados
+        return dados.iloc[self.posicoes(data_inicio, data_fim, selecoes)]
+
+
+def normalizar_filtros(indice, data_inicio=None, data_fim=None, selecoes=None):
+    """
+    Converte os filtros escolhidos em uma chave imutável e canônica: filtros que não restringem
+    nada (todas as categorias, intervalo completo de datas) são descartados, de modo que
+    combinações equivalentes compartilham a mesma entrada de cache.
+
+    Retorna:
+    - tuple: (data_inicio, data_fim, ((dimensão, valores), ...)).
+    """
+    primeira, ultima = indice.intervalo_datas()
+    inicio = pd.Timestamp(data_inicio).normalize() if data_inicio is not None else None
+    fim = pd.Timestamp(data_fim).normalize() if data_fim is not None else None
+    if inicio is not None and primeira is not None and inicio <= primeira.normalize():
+        inicio = None
+    if fim is not None and ultima is not None and fim >= ultima.normalize():
+        fim = None
+
+    dimensoes = []
+    for dimensao, valores in sorted((selecoes or {}).items()):
+        if valores is None:
+            continue
+        valores = tuple(sorted(set(valores), key=str))
+        if set(valores) >= set(indice.categorias.get(dimensao, [])):
+            continue
+        dimensoes.append((dimensao, valores))
+    return (inicio, fim, tuple(dimensoes))
+
+
+def filtrar_cubo(cubo, filtros, coluna_data=COLUNA_DIA):
+    """
+    Aplica os filtros (chave de normalizar_filtros) ao cubo de agregação, que tem as mesmas
+    dimensões e granularidade diária; o cubo filtrado continua válido para agrupar_vendas.
+    """
+    inicio, fim, dimensoes = filtros
+    if cubo is None or (inicio is None and fim is None and not dimensoes):
+        return cubo
+    mascara = np.ones(len(cubo), dtype=bool)
+    if inicio is not None:
+        mascara &= (cubo[coluna_data] >= inicio).to_numpy()
+    if fim is not None:
+        mascara &= (cubo[coluna_data] <= fim).to_numpy()
+    for dimensao, valores in dimensoes:
+        if dimensao not in cubo.columns:
+            return None  # o cubo não tem a dimensão: as análises usam as linhas filtradas
+        mascara &= cubo[dimensao].isin(valores).to_numpy()
+    filtrado = cubo[mascara]
+    filtrado.attrs = dict(cubo.attrs)
+    return filtrado
+
+
+class CacheLRU:
+    """
+    Cache com descarte do item usado há mais tempo (LRU), seguro entre threads.
+    """
+
+    def __init__(self, limite=LIMITE_CACHE_FILTROS):
+        self.limite = limite
+        self.acertos = 0
+        self.faltas = 0
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    def obter(self, chave, calcular):
+        """
+        Retorna o valor da chave, calculando-o com calcular() na primeira vez.
+        """
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return self._itens[chave]
+            self.faltas += 1
+
+        valor = calcular()
+        with self._trava:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.limite:
+                self._itens.popitem(last=False)
+        return valor
+
+    def estatisticas(self):
+        with self._trava:
+            return {'Itens': len(self._itens), 'Limite': self.limite, 'Acertos': self.acertos, 'Faltas': self.faltas}
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+
+
+_agregados = CacheLRU()
+
+
+def obter_indice(caminho_dados):
+    """
+    Retorna o índice de filtros do dataset, reaproveitando-o enquanto o dataset não for alterado.
+    O índice é construído sobre o DataFrame de carregar_vendas (mesma ordem de linhas).
+    """
+    chave = os.path.abspath(caminho_dados)
+    versao = versao_dados(caminho_dados)
+    with _trava:
+        em_memoria = _indices.get(chave)
+        if em_memoria is not None and em_memoria['versao'] == versao:
+            return em_memoria['indice']
+
+    indice = IndiceBitmap(carregar_vendas(caminho_dados))
+    with _trava:
+        _indices[chave] = {'versao': versao, 'indice': indice}
+    return indice
+
+
+def aplicar_filtros(dados, cubo, indice, filtros):
+    """
+    Aplica os filtros (chave de normalizar_filtros) às linhas, pelo índice, e ao cubo.
+
+    Retorna:
+    - tuple: (dados filtrados, cubo filtrado ou None).
+    """
+    inicio, fim, dimensoes = filtros
+    dados_filtrados = indice.filtrar(dados, inicio, fim, dict(dimensoes))
+    return dados_filtrados, filtrar_cubo(cubo, filtros)
+
+
+def agregado_filtrado(nome, caminho_dados, filtros, calcular):
+    """
+    Memoriza o resultado de uma análise por (análise, versão do dataset, filtros), com descarte LRU.
+
+    Parâmetros:
+    - nome (str): Identificação da análise.
+    - caminho_dados (str): Dataset analisado (a versão invalida as entradas antigas).
+    - filtros (tuple): Chave de normalizar_filtros.
+    - calcular (callable): Função sem argumentos que produz o resultado.
+    """
+    return _agregados.obter((nome, versao_dados(caminho_dados), filtros), calcular)
+
+
+def estatisticas_filtros():
+    """
+    Acertos e faltas do cache de agregados filtrados.
+    """
+    return _agregados.estatisticas()
+
+
+def barra_filtros(indice):
+    """
+    Desenha os filtros na barra lateral do Streamlit e retorna a chave normalizada da seleção.
+
+    O índice fornece as categorias e o período: um IndiceBitmap ou, no modo aproximado, o
+    src.amostragem.DominioAmostra, que dispensa carregar as vendas.
+    """
+    import streamlit as st
+
+    st.sidebar.header("Filtros")
+    primeira, ultima = indice.intervalo_datas()
+    data_inicio = data_fim = None
+    if primeira is not None:
+        periodo = st.sidebar.date_input("Período", value=(primeira.date(), ultima.date()),
+                                        min_value=primeira.date(), max_value=ultima.date())
+        if isinstance(periodo, (tuple, list)):
+            data_inicio = periodo[0] if len(periodo) > 0 else None
+            data_fim = periodo[1] if len(periodo) > 1 else None
+        else:
+            data_inicio = periodo
+
+    selecoes = {}
+    for dimensao, categorias in indice.categorias.items():
+        selecoes[dimensao] = st.sidebar.multiselect(ROTULOS_FILTRO.get(dimensao, dimensao), categorias,
+                                                    default=categorias)
+    return normalizar_filtros(indice, data_inicio, data_fim, selecoes)
+
+
+def descrever_filtros(filtros, linhas, linhas_total):
+    """
+    Resumo textual dos filtros aplicados (para st.caption).
+    """
+    inicio, fim, dimensoes = filtros
+    if inicio is None and fim is None and not dimensoes:
+        return f"Sem filtros: {linhas_total:,} vendas."
+    partes = []
+    if inicio is not None or fim is not None:
+        partes.append(f"{inicio.date() if inicio is not None else 'início'} a {fim.date() if fim is not None else 'fim'}")
+    partes += [f"{ROTULOS_FILTRO.get(dimensao, dimensao)}: {', '.join(map(str, valores))}" for dimensao, valores in dimensoes]
+    return f"Filtros: {' · '.join(partes)} — {linhas:,} de {linhas_total:,} vendas."
@@ -0,0 +1,251 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import pandas as pd
+
+from src.cubo import versao_dados
+from src.instrumentacao import medir
+
+# Número de resultados de análise mantidos em memória (configurável por variável de ambiente)
+LIMITE_CACHE_GRAFICOS = int(os.environ.get('SALES_CHART_CACHE_SIZE', 64))
+
+FORMATO_PLOTLY = 'plotly_json'
+FORMATO_PNG = 'png'
+
+# Tempo de construção das figuras da análise em andamento nesta thread (ver construindo_figuras)
+_construcao = threading.local()
+
+
+def chave_grafico(analise, parametros, versao):
+    """
+    Chave de uma requisição de gráfico: hash SHA-256 de (análise, parâmetros, versão do dataset).
+
+    Os parâmetros são serializados em JSON com chaves ordenadas (datas e outros valores não
+    nativos viram texto), de modo que requisições iguais produzem sempre a mesma chave.
+    """
+    texto = json.dumps([analise, parametros, versao], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+@contextmanager
+def construindo_figuras():
+    """
+    Marca o trecho de uma análise que constrói as figuras. O tempo do trecho entra na renderização
+    registrada pelo cache de gráficos; os agregados calculados antes dele ficam de fora.
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _construcao.tempo = getattr(_construcao, 'tempo', 0.0) + time.perf_counter() - inicio
+
+
+def serializar_figura(figura, dpi=100):
+    """
+    Serializa uma figura para o cache: plotly em JSON e matplotlib em PNG.
+
+    A figura matplotlib é fechada após a renderização, liberando-a do gerenciador do pyplot
+    (sem isso, cada execução do dashboard acumularia uma figura aberta).
+
+    Retorna:
+    - tuple: (formato, bytes) ou None se o objeto não for uma figura.
+    """
+    if hasattr(figura, 'to_plotly_json'):
+        return FORMATO_PLOTLY, figura.to_json().encode('utf-8')
+    if hasattr(figura, 'savefig'):
+        import matplotlib.pyplot as plt
+
+        buffer = io.BytesIO()
+        figura.savefig(buffer, format='png', dpi=dpi)
+        plt.close(figura)
+        return FORMATO_PNG, buffer.getvalue()
+    return None
+
+
+def restaurar_figura(formato, conteudo):
+    """
+    Reconstrói a figura serializada: plotly.graph_objects.Figure para JSON e os bytes para PNG
+    (aceitos diretamente por st.image).
+    """
+    if formato == FORMATO_PLOTLY:
+        import plotly.io as pio
+
+        return pio.from_json(conteudo.decode('utf-8'))
+    return conteudo
+
+
+class CacheGraficos:
+    """
+    Cache de resultados de análise com as figuras armazenadas por conteúdo, seguro entre threads.
+
+    Cada requisição (chave_grafico) aponta para os hashes das suas figuras serializadas; figuras
+    idênticas produzidas por requisições diferentes (ex.: filtros que não alteram o gráfico) são
+    guardadas uma única vez. Os demais elementos do resultado (insights, métricas) ficam na entrada.
+
+    O tempo de renderização registrado é o da construção das figuras (trechos marcados com
+    construindo_figuras) somado ao da serialização, sem o cálculo dos agregados da análise.
+    """
+
+    def __init__(self, limite=LIMITE_CACHE_GRAFICOS):
+        self.limite = limite
+        self._entradas = OrderedDict()
+        self._conteudos = {}
+        self._referencias = {}
+        self._estatisticas = {}
+        self._trava = threading.Lock()
+
+    def _registrar(self, analise, acerto, tempo=None):
+        estatistica = self._estatisticas.setdefault(
+            analise, {'acertos': 0, 'faltas': 0, 'renderizacoes': 0, 'tempo_total': 0.0, 'ultimo_tempo': None})
+        estatistica['acertos' if acerto else 'faltas'] += 1
+        if tempo is not None:
+            estatistica['renderizacoes'] += 1
+            estatistica['tempo_total'] += tempo
+            estatistica['ultimo_tempo'] = tempo
+
+    def _descartar(self, chave):
+        entrada = self._entradas.pop(chave)
+        for hash_conteudo in entrada['hashes']:
+            self._referencias[hash_conteudo] -= 1
+            if not self._referencias[hash_conteudo]:
+                del self._referencias[hash_conteudo]
+                del self._conteudos[hash_conteudo]
+
+    def _copiar(self, entrada):
+        # Chamado com a trava: separa os bytes da entrada para a reconstrução fora dela
+        figuras = [(posicao, formato, self._conteudos[hash_conteudo])
+                   for posicao, formato, hash_conteudo in entrada['figuras']]
+        return list(entrada['elementos']), figuras, entrada['tupla']
+
+    @staticmethod
+    def _restaurar(elementos, figuras, tupla):
+        for posicao, formato, conteudo in figuras:
+            elementos[posicao] = restaurar_figura(formato, conteudo)
+        return tuple(elementos) if tupla else elementos[0]
+
+    def obter(self, analise, parametros, versao, calcular):
+        """
+        Retorna o resultado da análise, renderizando-o com calcular() apenas na primeira requisição.
+
+        Parâmetros:
+        - analise (str): Identificação da análise.
+        - parametros (dict): Parâmetros que alteram o resultado (filtros, modo de detalhe...).
+        - versao: Versão do dataset (ver src.cubo.versao_dados).
+        - calcular (callable): Função sem argumentos que retorna uma figura ou uma tupla com figuras.
+
+        Retorna:
+        - O resultado de calcular(), com as figuras plotly reconstruídas e as matplotlib em PNG (bytes).
+        """
+        chave = chave_grafico(analise, parametros, versao)
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                self._entradas.move_to_end(chave)
+                self._registrar(analise, acerto=True)
+                copia = self._copiar(entrada)
+        if entrada is not None:
+            with medir(f'{analise}/restaurar', 'renderizacao'):
+                return self._restaurar(*copia)
+
+        _construcao.tempo = 0.0
+        resultado = calcular()
+        tempo_construcao = _construcao.tempo
+        tupla = isinstance(resultado, tuple)
+        elementos = list(resultado) if tupla else [resultado]
+        serializadas = {}
+        inicio = time.perf_counter()
+        with medir(f'{analise}/serializar', 'renderizacao'):
+            for posicao, elemento in enumerate(elementos):
+                serializada = serializar_figura(elemento)
+                if serializada is not None:
+                    serializadas[posicao] = serializada
+                    elementos[posicao] = None
+        tempo = tempo_construcao + time.perf_counter() - inicio
+
+        figuras = []
+        with self._trava:
+            if chave in self._entradas:
+                self._descartar(chave)
+            for posicao, (formato, conteudo) in serializadas.items():
+                hash_conteudo = hashlib.sha256(conteudo).hexdigest()
+                self._conteudos.setdefault(hash_conteudo, conteudo)
+                self._referencias[hash_conteudo] = self._referencias.get(hash_conteudo, 0) + 1
+                figuras.append((posicao, formato, hash_conteudo))
+            entrada = {
+                'analise': analise,
+                'elementos': elementos,
+                'figuras': figuras,
+                'hashes': [hash_conteudo for _, _, hash_conteudo in figuras],
+                'tupla': tupla
+            }
+            self._entradas[chave] = entrada
+            while len(self._entradas) > self.limite:
+                self._descartar(next(iter(self._entradas)))
+            self._registrar(analise, acerto=False, tempo=tempo)
+            copia = self._copiar(entrada)
+        with medir(f'{analise}/restaurar', 'renderizacao'):
+            return self._restaurar(*copia)
+
+    def estatisticas(self):
+        """
+        Acertos, faltas e tempo de renderização por análise.
+
+        Retorna:
+        - pandas.DataFrame: Uma linha por análise.
+        """
+        with self._trava:
+            linhas = [{
+                'Análise': analise,
+                'Acertos': estatistica['acertos'],
+                'Faltas': estatistica['faltas'],
+                'Taxa de Acerto': estatistica['acertos'] / (estatistica['acertos'] + estatistica['faltas']),
+                'Renderização Média (ms)': (estatistica['tempo_total'] / estatistica['renderizacoes'] * 1000
+                                            if estatistica['renderizacoes'] else None),
+                'Última Renderização (ms)': (estatistica['ultimo_tempo'] * 1000
+                                             if estatistica['ultimo_tempo'] is not None else None)
+            } for analise, estatistica in self._estatisticas.items()]
+        return pd.DataFrame(linhas, columns=['Análise', 'Acertos', 'Faltas', 'Taxa de Acerto',
+                                             'Renderização Média (ms)', 'Última Renderização (ms)'])
+
+    def memoria_bytes(self):
+        """
+        Bytes das figuras serializadas armazenadas (cada conteúdo distinto conta uma vez).
+        """
+        with self._trava:
+            return sum(len(conteudo) for conteudo in self._conteudos.values())
+
+    def limpar(self):
+        with self._trava:
+            self._entradas.clear()
+            self._conteudos.clear()
+            self._referencias.clear()
+            self._estatisticas.clear()
+
+
+_graficos = CacheGraficos()
+
+
+def graficos_em_cache(analise, caminho_dados, parametros, calcular):
+    """
+    Resultado de uma análise com gráficos, memorizado por (análise, parâmetros, versão do dataset).
+
+    Parâmetros:
+    - analise (str): Identificação da análise.
+    - caminho_dados (str): Dataset analisado (a versão invalida as entradas antigas).
+    - parametros (dict): Parâmetros que alteram o resultado (ex.: {'filtros': ...}).
+    - calcular (callable): Função sem argumentos que produz o resultado.
+    """
+    return _graficos.obter(analise, parametros, versao_dados(caminho_dados), calcular)
+
+
+def estatisticas_graficos():
+    """
+    Acertos, faltas e tempo de renderização de cada gráfico do cache (ver CacheGraficos.estatisticas).
+    """
+    return _graficos.estatisticas()
@@ -0,0 +1,298 @@
+import io
+import json
+import os
+
+import pandas as pd
+
+from src.amostragem import VERSAO_AMOSTRA, atualizar_amostra, caminho_amostra_padrao, salvar_amostra
+from src.carregamento import COLUNAS_DATA, TIPOS_COLUNAS, chave_arquivo
+from src.coortes import caminho_coortes_padrao, construir_coortes, mesclar_coortes, salvar_coortes
+from src.cubo import (caminho_cubo_padrao, construir_cubo, ler_agregado, mesclar_cubos,
+                      salvar_cubo, versao_dados)
+from src.desempenho import MODOS_DISTINTOS, atualizar_desempenho, caminho_desempenho_padrao
+from src.limpeza import limpar_dados
+
+
+def caminho_estado_padrao(caminho_processado):
+    """
+    Caminho padrão do arquivo de estado (marca d'água) do modo incremental.
+    """
+    return os.path.splitext(caminho_processado)[0] + '_estado.json'
+
+
+def ler_estado(caminho_estado):
+    """
+    Lê o estado do processamento incremental. Retorna None se ainda não existir.
+    """
+    if not os.path.exists(caminho_estado):
+        return None
+    with open(caminho_estado, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def salvar_estado(estado, caminho_estado):
+    """
+    Grava o estado do processamento incremental.
+    """
+    with open(caminho_estado, 'w', encoding='utf-8') as arquivo:
+        json.dump(estado, arquivo, ensure_ascii=False, indent=2)
+
+
+def _ler_cabecalho(caminho_bruto):
+    with open(caminho_bruto, 'rb') as arquivo:
+        return arquivo.readline()
+
+
+def ler_novas_linhas(caminho_bruto, offset):
+    """
+    Lê as linhas do arquivo bruto a partir de um offset em bytes.
+
+    Apenas linhas completas (terminadas em quebra de linha) são consumidas, para que um
+    lote ainda em gravação seja lido inteiro na próxima execução.
+
+    Parâmetros:
+    - caminho_bruto (str): Caminho do CSV bruto.
+    - offset (int): Posição (em bytes) até onde o arquivo já foi processado.
+
+    Retorna:
+    - pandas.DataFrame: Novas linhas (com os nomes de colunas do cabeçalho).
+    - int: Novo offset.
+    """
+    cabecalho = _ler_cabecalho(caminho_bruto)
+    with open(caminho_bruto, 'rb') as arquivo:
+        arquivo.seek(max(offset, len(cabecalho)))
+        conteudo = arquivo.read()
+
+    fim = conteudo.rfind(b'\n') + 1
+    novo_offset = max(offset, len(cabecalho)) + fim
+    conteudo = conteudo[:fim]
+    if not conteudo.strip():
+        return pd.DataFrame(), novo_offset
+
+    return pd.read_csv(io.BytesIO(cabecalho + conteudo), sep=','), novo_offset
+
+
+class _TrechoArquivo(io.RawIOBase):
+    # Leitura de um arquivo binário até a posição 'fim' (exclusiva)
+    def __init__(self, arquivo, fim):
+        self.arquivo = arquivo
+        self.fim = fim
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        restante = self.fim - self.arquivo.tell()
+        if restante <= 0:
+            return 0
+        return self.arquivo.readinto(memoryview(buffer)[:min(len(buffer), restante)])
+
+
+def _fim_linhas_completas(caminho_bruto, tamanho_trecho=1 << 16):
+    # Posição logo após a última quebra de linha do arquivo
+    with open(caminho_bruto, 'rb') as arquivo:
+        posicao = arquivo.seek(0, os.SEEK_END)
+        while posicao > 0:
+            inicio = max(0, posicao - tamanho_trecho)
+            arquivo.seek(inicio)
+            quebra = arquivo.read(posicao - inicio).rfind(b'\n')
+            if quebra >= 0:
+                return inicio + quebra + 1
+            posicao = inicio
+    return 0
+
+
+def ler_linhas_posteriores(caminho_bruto, marca_dagua, coluna_data='Sale_Date', tamanho_bloco=500_000):
+    """
+    Lê em blocos as linhas do arquivo bruto com data posterior à marca d'água (modo 'data').
+
+    A data de cada bloco é interpretada antes do tratamento, e só as linhas posteriores à marca
+    d'água são mantidas: a memória e o tratamento dependem do lote novo, não do arquivo inteiro.
+    Como em ler_novas_linhas, apenas linhas completas são consumidas.
+
+    Parâmetros:
+    - caminho_bruto (str): Caminho do CSV bruto.
+    - marca_dagua (str, opcional): Maior data já processada ('AAAA-MM-DD'). Se None, lê todas as linhas.
+    - coluna_data (str): Coluna de datas comparada com a marca d'água.
+    - tamanho_bloco (int): Número de linhas por bloco.
+
+    Retorna:
+    - pandas.DataFrame: Linhas novas, ainda sem tratamento.
+    - int: Offset do fim das linhas completas.
+    """
+    fim = _fim_linhas_completas(caminho_bruto)
+    limite = pd.Timestamp(marca_dagua) if marca_dagua is not None else None
+    partes = []
+    with open(caminho_bruto, 'rb') as arquivo:
+        for bloco in pd.read_csv(io.BufferedReader(_TrechoArquivo(arquivo, fim)), sep=',', chunksize=tamanho_bloco):
+            if limite is not None:
+                datas = bloco[coluna_data]
+                if pd.api.types.is_string_dtype(datas.dtype):
+                    datas = datas.str.strip()
+                bloco = bloco[(pd.to_datetime(datas) > limite).to_numpy()]
+            if len(bloco):
+                partes.append(bloco)
+    if not partes:
+        return pd.DataFrame(), fim
+    return pd.concat(partes, ignore_index=True), fim
+
+
+def _tipar_como_processado(lote):
+    # Lote com os mesmos valores e tipos que o carregador lê do dataset processado,
+    # para que o CSV, o dataset colunar e os agregados fiquem consistentes
+    texto = lote.to_csv(index=False)
+    tipos = {col: tipo for col, tipo in TIPOS_COLUNAS.items() if col in lote.columns}
+    datas = [col for col in COLUNAS_DATA if col in lote.columns]
+    return pd.read_csv(io.StringIO(texto), dtype=tipos, parse_dates=datas)
+
+
+def _anexar_csv(df, caminho_processado):
+    if os.path.exists(caminho_processado):
+        colunas = pd.read_csv(caminho_processado, nrows=0).columns
+        df[list(colunas)].to_csv(caminho_processado, mode='a', header=False, index=False)
+    else:
+        df.to_csv(caminho_processado, index=False)
+
+
+def _anexar_colunar(df, diretorio_colunar, coluna_data):
+    from src.armazenamento import COLUNA_PARTICAO, ler_colunar, listar_meses, mes_da_data, salvar_colunar
+
+    # Reescreve apenas as partições (meses) tocadas pelo lote
+    meses_lote = sorted(mes_da_data(df[coluna_data]).unique())
+    partes = [df]
+    if os.path.isdir(diretorio_colunar):
+        existentes = [mes for mes in meses_lote if mes in listar_meses(diretorio_colunar)]
+        if existentes:
+            partes.insert(0, ler_colunar(diretorio_colunar, meses=existentes))
+    combinado = pd.concat(partes, ignore_index=True)
+    # Une categorias diferentes entre o lote e a partição existente
+    for coluna in combinado.columns:
+        if combinado[coluna].dtype == object and any(isinstance(p[coluna].dtype, pd.CategoricalDtype) for p in partes):
+            combinado[coluna] = combinado[coluna].astype('category')
+    salvar_colunar(combinado.drop(columns=[COLUNA_PARTICAO], errors='ignore'), diretorio_colunar, coluna_data=coluna_data)
+    return meses_lote
+
+
+def _atualizar_agregados(caminho_dados, versao_anterior, lote):
+    # Cubo diário: delta-merge quando o agregado persistido corresponde à versão anterior do dataset
+    caminho_cubo = caminho_cubo_padrao(caminho_dados)
+    persistido = ler_agregado(caminho_cubo)
+    if persistido is not None and persistido.get('versao') == versao_anterior:
+        salvar_cubo(mesclar_cubos(persistido['cubo'], construir_cubo(lote)), caminho_dados, caminho_cubo)
+    elif os.path.exists(caminho_cubo):
+        os.remove(caminho_cubo)  # desatualizado; será recalculado sob demanda
+
+    # Amostra estratificada do modo aproximado: reservatório mesclado com a amostra do lote
+    caminho_amostra = caminho_amostra_padrao(caminho_dados)
+    persistido = ler_agregado(caminho_amostra)
+    if (persistido is not None and persistido.get('versao') == versao_anterior
+            and persistido.get('formato') == VERSAO_AMOSTRA):
+        salvar_amostra(atualizar_amostra(persistido['amostra'], lote), caminho_dados, caminho_amostra)
+    elif os.path.exists(caminho_amostra):
+        os.remove(caminho_amostra)
+
+    # Armazém de desempenho (representante, região, canal e mês): regrava apenas as partições dos meses do lote
+    for distintos in MODOS_DISTINTOS:
+        atualizar_desempenho(caminho_desempenho_padrao(caminho_dados, distintos), lote, caminho_dados, versao_anterior)
+
+    # Coortes: apenas as células dos meses presentes no lote são recalculadas
+    caminho_coortes = caminho_coortes_padrao(caminho_dados)
+    persistido = ler_agregado(caminho_coortes)
+    if persistido is not None and persistido.get('versao') == versao_anterior:
+        coortes = mesclar_coortes(persistido['coortes'], construir_coortes(lote))
+        salvar_coortes(coortes, caminho_dados, caminho_coortes)
+    elif os.path.exists(caminho_coortes):
+        os.remove(caminho_coortes)
+
+
+def processar_incremental(caminho_bruto, caminho_processado, diretorio_colunar=None,
+                          caminho_estado=None, modo='offset', coluna_data='Sale_Date'):
+    """
+    Processa apenas as linhas novas do arquivo bruto e as anexa ao dataset processado,
+    atualizando os agregados (cubo diário, amostra do modo aproximado, armazém de desempenho por
+    representante/região/canal/mês e coortes) por delta-merge.
+
+    Modos de marca d'água:
+    - 'offset': lê o arquivo bruto a partir da última posição processada (feeds só de anexação).
+    - 'data': lê o arquivo em blocos e trata apenas as vendas com data posterior à maior data já
+      processada (ver ler_linhas_posteriores).
+
+    Se o dataset processado já existir sem estado, ou tiver sido regravado por um tratamento
+    completo (notebook), o estado é inicializado no fim do arquivo bruto e nada é reprocessado.
+
+    Parâmetros:
+    - caminho_bruto (str): Caminho do CSV bruto (ex.: '../data/raw/sales_data.csv').
+    - caminho_processado (str): Caminho do CSV processado.
+    - diretorio_colunar (str, opcional): Dataset colunar a ser atualizado junto com o CSV.
+    - caminho_estado (str, opcional): Arquivo de estado. Se None, usa caminho_estado_padrao.
+    - modo (str): 'offset' ou 'data'.
+    - coluna_data (str): Coluna de datas usada na marca d'água e nas partições.
+
+    Retorna:
+    - dict: Resumo do lote processado.
+    """
+    if modo not in ('offset', 'data'):
+        raise ValueError(f"Modo inválido: '{modo}'. Use 'offset' ou 'data'.")
+    if caminho_estado is None:
+        caminho_estado = caminho_estado_padrao(caminho_processado)
+
+    cabecalho = _ler_cabecalho(caminho_bruto).decode('utf-8')
+    tamanho_bruto = os.path.getsize(caminho_bruto)
+    estado = ler_estado(caminho_estado)
+
+    # Sem estado, ou com o CSV processado regravado fora do modo incremental (tratamento completo
+    # pelo notebook): considera o arquivo bruto atual como já processado
+    processado_externo = (estado is not None and os.path.exists(caminho_processado)
+                          and estado.get('versao_processado') != list(chave_arquivo(caminho_processado)[1:]))
+    if (estado is None or processado_externo) and os.path.exists(caminho_processado):
+        datas = pd.read_csv(caminho_processado, usecols=[coluna_data], parse_dates=[coluna_data])[coluna_data]
+        estado = {
+            'cabecalho': cabecalho,
+            'offset': tamanho_bruto,
+            'marca_dagua': str(datas.max().date()) if len(datas) else None,
+            'linhas_processadas': len(datas),
+            'versao_processado': list(chave_arquivo(caminho_processado)[1:])
+        }
+        salvar_estado(estado, caminho_estado)
+        return {'Linhas Novas': 0, 'Meses Afetados': [], 'Marca d\'Água': estado['marca_dagua']}
+
+    if estado is None:
+        estado = {'cabecalho': cabecalho, 'offset': 0, 'marca_dagua': None, 'linhas_processadas': 0}
+    elif estado['cabecalho'] != cabecalho or (modo == 'offset' and tamanho_bruto < estado['offset']):
+        raise ValueError("O arquivo bruto foi reescrito desde o último processamento. "
+                         f"Remova '{caminho_estado}' e o dataset processado para reprocessar tudo.")
+
+    # Seleção das linhas novas conforme a marca d'água
+    if modo == 'offset':
+        lote, novo_offset = ler_novas_linhas(caminho_bruto, estado['offset'])
+    else:
+        lote, novo_offset = ler_linhas_posteriores(caminho_bruto, estado['marca_dagua'], coluna_data)
+
+    if len(lote):
+        lote = _tipar_como_processado(limpar_dados(lote))
+
+    meses = []
+    if len(lote):
+        destinos = [caminho_processado] + ([diretorio_colunar] if diretorio_colunar else [])
+        versoes_anteriores = {destino: versao_dados(destino) if os.path.exists(destino) else None for destino in destinos}
+
+        _anexar_csv(lote, caminho_processado)
+        if diretorio_colunar:
+            meses = _anexar_colunar(lote, diretorio_colunar, coluna_data)
+        else:
+            meses = sorted(lote[coluna_data].dt.strftime('%Y-%m').unique())
+
+        for destino in destinos:
+            _atualizar_agregados(destino, versoes_anteriores[destino], lote)
+
+        maior_data = str(lote[coluna_data].max().date())
+        if estado['marca_dagua'] is None or maior_data > estado['marca_dagua']:
+            estado['marca_dagua'] = maior_data
+        estado['linhas_processadas'] += len(lote)
+
+    estado['offset'] = novo_offset
+    if os.path.exists(caminho_processado):
+        estado['versao_processado'] = list(chave_arquivo(caminho_processado)[1:])
+    salvar_estado(estado, caminho_estado)
+
+    return {'Linhas Novas': len(lote), 'Meses Afetados': meses, 'Marca d\'Água': estado['marca_dagua']}
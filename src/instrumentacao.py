@@ -0,0 +1,391 @@
+import csv
+import functools
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+# Instrumentação das etapas quentes (carga, limpeza, análise e renderização). Cada medição
+# registra tempo, linhas, linhas/s e memória; o custo com as opções padrão é de alguns
+# microssegundos por chamada (perf_counter e getrusage). Configuração por variáveis de ambiente:
+# - SALES_PERF=0 desliga as medições;
+# - SALES_PERF_MEMORY=1 mede o pico de memória alocada de cada etapa (tracemalloc, mais lento);
+# - SALES_PERF_LOG=arquivo.csv ou arquivo.jsonl grava cada medição no arquivo;
+# - SALES_PROFILE=cprofile ou pyinstrument captura o perfil de cada requisição em SALES_PROFILE_DIR;
+# - SALES_PROFILE_URL=1 permite escolher o perfilador pela URL (?perfil=cprofile). Desligado por
+#   padrão: qualquer visitante poderia ligar o perfil e gravar arquivos no servidor.
+INSTRUMENTACAO_ATIVA = os.environ.get('SALES_PERF', '1') != '0'
+MEDIR_MEMORIA = os.environ.get('SALES_PERF_MEMORY', '0') == '1'
+ARQUIVO_MEDICOES = os.environ.get('SALES_PERF_LOG') or None
+PERFILADOR_PADRAO = os.environ.get('SALES_PROFILE') or None
+DIRETORIO_PERFIS = os.environ.get('SALES_PROFILE_DIR', 'perfis')
+PERFIL_POR_URL = os.environ.get('SALES_PROFILE_URL', '0') == '1'
+
+# Número de medições mantidas em memória (as mais antigas são descartadas)
+LIMITE_MEDICOES = int(os.environ.get('SALES_PERF_HISTORY', 5000))
+
+PERFILADORES = ('cprofile', 'pyinstrument')
+
+COLUNAS_MEDICAO = ['Requisição', 'Etapa', 'Categoria', 'Início', 'Duração (s)', 'Linhas', 'Linhas/s',
+                   'Pico de Memória (MB)', 'RSS Máximo (MB)', 'Sucesso']
+
+_medicoes = deque(maxlen=LIMITE_MEDICOES)
+_trava = threading.Lock()
+_local = threading.local()
+
+
+def rss_maximo_mb():
+    """
+    Pico de memória residente (RSS) do processo atual, em MB.
+    """
+    try:
+        import resource
+    except ImportError:
+        # Windows: o pico do working set equivale ao RSS máximo
+        try:
+            import psutil
+        except ImportError:
+            return float('nan')
+        return psutil.Process().memory_info().peak_wset / 1024 ** 2
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é medido em bytes no macOS e em KB no Linux
+    return pico / 1024 ** 2 if sys.platform == 'darwin' else pico / 1024
+
+
+class Medicao:
+    """
+    Medição de uma etapa em andamento (ver medir). O número de linhas pode ser informado
+    durante a etapa, atribuindo-o a 'linhas'.
+    """
+
+    def __init__(self, etapa, categoria, linhas=None):
+        self.etapa = etapa
+        self.categoria = categoria
+        self.linhas = linhas
+        self.requisicao = None
+        self.pico_memoria = 0
+        self.memoria_inicial = 0
+
+
+def _pilha():
+    if not hasattr(_local, 'pilha'):
+        _local.pilha = []
+    return _local.pilha
+
+
+def _registrar(registro):
+    with _trava:
+        _medicoes.append(registro)
+        if ARQUIVO_MEDICOES:
+            _anexar_arquivo(registro, ARQUIVO_MEDICOES)
+
+
+def _anexar_arquivo(registro, caminho):
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    if caminho.endswith('.csv'):
+        novo = not os.path.exists(caminho)
+        with open(caminho, 'a', newline='', encoding='utf-8') as arquivo:
+            escritor = csv.DictWriter(arquivo, fieldnames=COLUNAS_MEDICAO)
+            if novo:
+                escritor.writeheader()
+            escritor.writerow(registro)
+    else:
+        # JSON Lines: uma medição por linha, para anexar sem reescrever o arquivo
+        with open(caminho, 'a', encoding='utf-8') as arquivo:
+            arquivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+
+@contextmanager
+def medir(etapa, categoria='geral', linhas=None):
+    """
+    Mede o tempo, as linhas processadas e a memória de um bloco de código.
+
+    As medições aninhadas (ex.: etapas da limpeza dentro de limpar_dados) compartilham o
+    identificador da requisição da medição mais externa da thread.
+
+    Parâmetros:
+    - etapa (str): Nome da etapa (ex.: 'carregar_dados').
+    - categoria (str): 'carga', 'limpeza', 'analise', 'renderizacao', 'pagina'...
+    - linhas (int, opcional): Linhas processadas; também pode ser atribuído à medição dentro do bloco.
+
+    Exemplo:
+        with medir('grafico_regiao', 'renderizacao') as medicao:
+            medicao.linhas = len(dados)
+            ...
+    """
+    medicao = Medicao(etapa, categoria, linhas)
+    if not INSTRUMENTACAO_ATIVA:
+        yield medicao
+        return
+
+    pilha = _pilha()
+    medicao.requisicao = pilha[0].requisicao if pilha else uuid.uuid4().hex[:8]
+    memoria = MEDIR_MEMORIA
+    if memoria:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        atual, pico = tracemalloc.get_traced_memory()
+        if pilha:
+            # O pico observado até aqui pertence à medição externa, antes de ser reiniciado
+            pilha[-1].pico_memoria = max(pilha[-1].pico_memoria, pico)
+        tracemalloc.reset_peak()
+        medicao.memoria_inicial = atual
+    pilha.append(medicao)
+
+    inicio_relogio = datetime.now()
+    inicio = time.perf_counter()
+    sucesso = False
+    try:
+        yield medicao
+        sucesso = True
+    finally:
+        duracao = time.perf_counter() - inicio
+        pilha.pop()
+        pico_mb = None
+        if memoria and tracemalloc.is_tracing():
+            medicao.pico_memoria = max(medicao.pico_memoria, tracemalloc.get_traced_memory()[1])
+            pico_mb = max(medicao.pico_memoria - medicao.memoria_inicial, 0) / 1024 ** 2
+            if pilha:
+                pilha[-1].pico_memoria = max(pilha[-1].pico_memoria, medicao.pico_memoria)
+            else:
+                tracemalloc.stop()
+        _registrar({
+            'Requisição': medicao.requisicao,
+            'Etapa': etapa,
+            'Categoria': categoria,
+            'Início': inicio_relogio.isoformat(timespec='milliseconds'),
+            'Duração (s)': duracao,
+            'Linhas': medicao.linhas,
+            'Linhas/s': medicao.linhas / duracao if medicao.linhas is not None and duracao > 0 else None,
+            'Pico de Memória (MB)': pico_mb,
+            'RSS Máximo (MB)': rss_maximo_mb(),
+            'Sucesso': sucesso
+        })
+
+
+def _linhas_dataframe(objeto):
+    # Linhas de um DataFrame/Series sem importar o pandas
+    if hasattr(objeto, 'shape') and hasattr(objeto, 'iloc'):
+        return int(objeto.shape[0])
+    return None
+
+
+def instrumentar(categoria, etapa=None, linhas=None):
+    """
+    Decorador que mede cada chamada da função (ver medir).
+
+    As linhas processadas são as do primeiro DataFrame recebido como argumento; sem DataFrame
+    na entrada (funções de carga), as do DataFrame retornado.
+
+    Parâmetros:
+    - categoria (str): Categoria da etapa.
+    - etapa (str, opcional): Nome da etapa. Se None, o nome da função.
+    - linhas (callable, opcional): Função que recebe o resultado e retorna as linhas processadas.
+    """
+    def decorador(funcao):
+        nome = etapa or funcao.__name__
+
+        @functools.wraps(funcao)
+        def instrumentada(*args, **kwargs):
+            entrada = next((n for n in map(_linhas_dataframe, list(args) + list(kwargs.values())) if n is not None), None)
+            with medir(nome, categoria, entrada) as medicao:
+                resultado = funcao(*args, **kwargs)
+                if linhas is not None:
+                    medicao.linhas = linhas(resultado)
+                elif entrada is None:
+                    medicao.linhas = _linhas_dataframe(resultado)
+            return resultado
+
+        return instrumentada
+
+    return decorador
+
+
+def medicoes(requisicao=None):
+    """
+    Medições registradas no processo (as LIMITE_MEDICOES mais recentes).
+
+    Parâmetros:
+    - requisicao (str, opcional): Retorna apenas as medições desta requisição.
+
+    Retorna:
+    - pandas.DataFrame: Uma linha por medição, com as colunas de COLUNAS_MEDICAO.
+    """
+    import pandas as pd
+
+    with _trava:
+        registros = list(_medicoes)
+    if requisicao is not None:
+        registros = [registro for registro in registros if registro['Requisição'] == requisicao]
+    return pd.DataFrame(registros, columns=COLUNAS_MEDICAO)
+
+
+def resumo_medicoes(registros=None):
+    """
+    Resumo por etapa: chamadas, tempo total/médio/máximo, linhas/s e maiores picos de memória.
+
+    Parâmetros:
+    - registros (pandas.DataFrame, opcional): Resultado de medicoes(). Se None, todas as medições.
+    """
+    if registros is None:
+        registros = medicoes()
+    chaves = ['Categoria', 'Etapa']
+    resumo = registros.groupby(chaves, sort=False).agg(**{
+        'Chamadas': ('Duração (s)', 'size'),
+        'Tempo Total (s)': ('Duração (s)', 'sum'),
+        'Tempo Médio (s)': ('Duração (s)', 'mean'),
+        'Tempo Máximo (s)': ('Duração (s)', 'max'),
+        'Pico de Memória (MB)': ('Pico de Memória (MB)', 'max'),
+        'RSS Máximo (MB)': ('RSS Máximo (MB)', 'max')
+    })
+    # Vazão agregada: linhas das chamadas que as informaram sobre o tempo dessas mesmas chamadas
+    com_linhas = registros[registros['Linhas'].notna()].astype({'Linhas': 'float64'}).groupby(chaves, sort=False)
+    resumo['Linhas'] = com_linhas['Linhas'].sum()
+    resumo['Linhas/s'] = resumo['Linhas'] / com_linhas['Duração (s)'].sum()
+    resumo = resumo.reset_index()
+    return resumo.sort_values('Tempo Total (s)', ascending=False).reset_index(drop=True)
+
+
+def salvar_medicoes(caminho, registros=None):
+    """
+    Exporta as medições para CSV (extensão .csv) ou JSON (demais extensões).
+
+    Retorna:
+    - str: Caminho gravado.
+    """
+    if registros is None:
+        registros = medicoes()
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    if caminho.endswith('.csv'):
+        registros.to_csv(caminho, index=False)
+    else:
+        registros.to_json(caminho, orient='records', force_ascii=False, indent=2)
+    return caminho
+
+
+def limpar_medicoes():
+    with _trava:
+        _medicoes.clear()
+
+
+def perfilador_requisicao(parametro=None):
+    """
+    Perfilador de uma requisição: o valor da URL só é usado com SALES_PROFILE_URL=1 e se for um
+    perfilador disponível; caso contrário, vale o padrão (SALES_PROFILE).
+
+    Parâmetros:
+    - parametro (str, opcional): Valor recebido na URL (ex.: st.query_params['perfil']).
+
+    Retorna:
+    - str ou None: 'cprofile', 'pyinstrument' ou None.
+    """
+    if not PERFIL_POR_URL or parametro not in PERFILADORES:
+        return PERFILADOR_PADRAO
+    if parametro == 'pyinstrument' and importlib.util.find_spec('pyinstrument') is None:
+        return PERFILADOR_PADRAO
+    return parametro
+
+
+@contextmanager
+def capturar_perfil(nome, perfilador=PERFILADOR_PADRAO, diretorio=None):
+    """
+    Captura opcional do perfil de execução de um bloco (ex.: uma requisição do dashboard).
+
+    Com perfilador=None nada é capturado. 'cprofile' grava um arquivo .prof (abrir com pstats ou
+    snakeviz); 'pyinstrument' (pacote opcional) grava um relatório .html.
+
+    Parâmetros:
+    - nome (str): Identificação do bloco, usada no nome do arquivo.
+    - perfilador (str, opcional): None, 'cprofile' ou 'pyinstrument'. Padrão: SALES_PROFILE.
+    - diretorio (str, opcional): Destino dos arquivos. Se None, DIRETORIO_PERFIS.
+
+    Retorna (no 'as' do with):
+    - dict: {'perfilador', 'arquivo'}, com o arquivo preenchido ao fim do bloco.
+    """
+    captura = {'perfilador': perfilador, 'arquivo': None}
+    if perfilador is None:
+        yield captura
+        return
+    if perfilador not in PERFILADORES:
+        raise ValueError(f"Perfilador inválido: '{perfilador}'. Use 'cprofile' ou 'pyinstrument'.")
+
+    if diretorio is None:
+        diretorio = DIRETORIO_PERFIS
+    os.makedirs(diretorio, exist_ok=True)
+    nome_arquivo = ''.join(c if c.isalnum() or c in '-_' else '_' for c in nome)
+    base = os.path.join(diretorio, f"{nome_arquivo}-{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}")
+
+    if perfilador == 'cprofile':
+        import cProfile
+
+        perfil = cProfile.Profile()
+        perfil.enable()
+        try:
+            yield captura
+        finally:
+            perfil.disable()
+            captura['arquivo'] = base + '.prof'
+            perfil.dump_stats(captura['arquivo'])
+    else:
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ImportError("O perfilador 'pyinstrument' requer o pacote 'pyinstrument' (pip install pyinstrument).")
+
+        perfil = Profiler()
+        perfil.start()
+        try:
+            yield captura
+        finally:
+            perfil.stop()
+            captura['arquivo'] = base + '.html'
+            with open(captura['arquivo'], 'w', encoding='utf-8') as arquivo:
+                arquivo.write(perfil.output_html())
+
+
+def painel_desempenho(requisicao=None):
+    """
+    Desenha no Streamlit o painel de desempenho: medições da última requisição e resumo do processo.
+    """
+    import streamlit as st
+
+    registros = medicoes()
+    if registros.empty:
+        st.caption("Nenhuma medição registrada.")
+        return
+    if requisicao is None:
+        requisicao = registros['Requisição'].iloc[-1]
+    st.caption(f"Requisição {requisicao}")
+    st.dataframe(registros[registros['Requisição'] == requisicao][
+        ['Etapa', 'Categoria', 'Duração (s)', 'Linhas', 'Linhas/s', 'Pico de Memória (MB)']], hide_index=True)
+    st.caption("Acumulado no processo")
+    st.dataframe(resumo_medicoes(registros)[['Etapa', 'Chamadas', 'Tempo Médio (s)', 'Tempo Máximo (s)', 'Linhas/s']],
+                 hide_index=True)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Resumo por etapa de um log de medições (SALES_PERF_LOG).")
+    parser.add_argument('arquivo', help='Log .csv ou .jsonl')
+    argumentos = parser.parse_args()
+
+    if argumentos.arquivo.endswith('.csv'):
+        log = pd.read_csv(argumentos.arquivo)
+    else:
+        log = pd.read_json(argumentos.arquivo, lines=True)
+    with pd.option_context('display.float_format', '{:,.4f}'.format, 'display.width', 160):
+        print(resumo_medicoes(log).to_string(index=False))
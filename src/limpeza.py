@@ -0,0 +1,393 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.armazenamento import salvar_colunar
+from src.estruturas_probabilisticas import ContadorDuplicatas, hash_valores
+from src.instrumentacao import instrumentar
+from src.tipos import DOMINIOS_COLUNAS, otimizar_serie
+
+
+@instrumentar('carga')
+def carregar_dados(caminho_arquivo, coluna_data=None):
+    """
+    Carrega um arquivo CSV com dados.
+
+    Parâmetros:
+    - caminho_arquivo (str): Caminho do arquivo CSV.
+    - coluna_data (str, opcional): Nome da coluna de datas para converter para datetime.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com os dados carregados.
+    """
+    dados = pd.read_csv(caminho_arquivo, sep=',')
+
+    if coluna_data:
+        dados[coluna_data] = pd.to_datetime(dados[coluna_data], utc=True)
+
+    return dados
+
+
+def _tabela_ausentes(ausentes, linhas):
+    tabela_ausentes = pd.DataFrame({
+        'Quantidade de Valores Ausentes': ausentes.astype('int64'),
+        'Percentual de Valores Ausentes (%)': (ausentes / max(linhas, 1)) * 100
+    })
+    tabela_ausentes = tabela_ausentes[tabela_ausentes['Quantidade de Valores Ausentes'] > 0]
+    return tabela_ausentes.sort_values(by='Percentual de Valores Ausentes (%)', ascending=False)
+
+
+@instrumentar('limpeza')
+def verificar_valores_ausentes(df):
+    """
+    Verifica a quantidade e o percentual de valores ausentes em cada coluna de um DataFrame.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame a ser verificado.
+
+    Retorna:
+    - pandas.DataFrame: Colunas com valores ausentes, ordenadas pelo percentual (decrescente).
+    """
+    return _tabela_ausentes(df.isnull().sum(), len(df))
+
+
+def _tabela_max_min(max_min):
+    return pd.DataFrame({
+        'Coluna': list(max_min),
+        'Valor Mínimo': [valores[0] for valores in max_min.values()],
+        'Valor Máximo': [valores[1] for valores in max_min.values()]
+    })
+
+
+@instrumentar('limpeza')
+def valores_max_min(df):
+    """
+    Valores mínimo e máximo de cada coluna numérica de um DataFrame.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame a ser analisado.
+
+    Retorna:
+    - pandas.DataFrame: Tabela com Coluna, Valor Mínimo e Valor Máximo.
+    """
+    max_min = {}
+    _atualizar_max_min(max_min, df)
+    return _tabela_max_min(max_min)
+
+
+def _com_espacos(valores):
+    # Strip dos valores distintos e máscara dos que mudam com ele (valores que não são strings ficam de fora)
+    valores = pd.Index(valores)
+    limpos = np.asarray(valores.str.strip(), dtype=object)
+    return limpos, pd.notna(limpos) & (limpos != np.asarray(valores, dtype=object))
+
+
+def _remover_espacos_categorias(serie):
+    # Opera sobre as categorias (poucos valores) em vez das linhas
+    categorias = serie.cat.categories
+    if not (pd.api.types.is_object_dtype(categorias) or pd.api.types.is_string_dtype(categorias)):
+        return serie, 0, 0
+
+    categorias_limpas, alteradas = _com_espacos(categorias)
+    if not alteradas.any():
+        return serie, 0, 0
+
+    codigos = serie.cat.codes.to_numpy()
+    contagens = np.bincount(codigos[codigos >= 0], minlength=len(categorias))
+    espacos_antes = int(contagens[alteradas].sum())
+
+    # Categorias que ficam iguais após o strip (ex.: ' North' e 'North') são unificadas
+    novos_codigos, unicas = pd.factorize(categorias_limpas)
+    codigos_limpos = np.where(codigos >= 0, novos_codigos[codigos], -1)
+    resultado = pd.Categorical.from_codes(codigos_limpos, categories=unicas, ordered=serie.cat.ordered)
+
+    # Linhas cujas categorias resultantes ainda mudariam com o strip
+    restantes = _com_espacos(unicas)[1]
+    contagens_limpas = np.bincount(codigos_limpos[codigos_limpos >= 0], minlength=len(unicas))
+    return pd.Series(resultado, index=serie.index, name=serie.name), espacos_antes, int(contagens_limpas[restantes].sum())
+
+
+def _remover_espacos_valores(serie):
+    # Fatoriza a coluna e aplica o strip apenas aos valores distintos
+    codigos, unicos = pd.factorize(serie)
+    if len(unicos) == 0:
+        return serie, 0, 0
+    unicos = pd.Index(unicos)
+    if unicos.inferred_type not in ('string', 'mixed', 'mixed-integer'):
+        return serie, 0, 0
+
+    # Valores que não são strings resultam em NaN no .str e não são alterados
+    limpos, alterados = _com_espacos(unicos)
+    if not alterados.any():
+        return serie, 0, 0
+
+    linhas = (codigos >= 0) & alterados[np.maximum(codigos, 0)]
+    resultado = serie.copy()
+    resultado[linhas] = limpos[codigos[linhas]]
+
+    # Os valores de cada linha após a remoção são os distintos limpos: verifica-os e conta as linhas
+    restantes = _com_espacos(np.where(alterados, limpos, np.asarray(unicos, dtype=object)))[1]
+    contagens = np.bincount(codigos[codigos >= 0], minlength=len(unicos))
+    return resultado, int(linhas.sum()), int(contagens[restantes].sum())
+
+
+@instrumentar('limpeza')
+def remover_espacos(df):
+    """
+    Remove espaços em branco à esquerda e à direita das strings em todas as colunas e nos nomes das colunas.
+
+    Versão vetorizada: cada coluna é percorrida uma única vez (fatoração) e o strip via acessor
+    .str é aplicado somente aos valores distintos; nas colunas categóricas, apenas às categorias.
+    Os espaços restantes após a remoção também são verificados nos valores distintos resultantes.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame a ser processado.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com os espaços removidos.
+    - pandas.DataFrame: DataFrame com informações sobre as remoções realizadas.
+    """
+    if not isinstance(df, pd.DataFrame):
+        raise ValueError("O argumento fornecido não é um DataFrame.")
+
+    colunas_com_espacos = [col for col in df.columns if col != col.strip()]
+    df.columns = df.columns.str.strip()
+    colunas_depois = sum(col != col.strip() for col in df.columns)
+
+    informacoes_remocoes = [{
+        'Coluna': 'NOMES DAS COLUNAS',
+        'Espaços Antes': len(colunas_com_espacos),
+        'Espaços Depois': colunas_depois,
+        'Remoção Bem-Sucedida': colunas_depois == 0
+    }]
+
+    for col in df.select_dtypes(include=['object', 'string', 'category']).columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            df[col], espacos_antes, espacos_depois = _remover_espacos_categorias(serie)
+        else:
+            df[col], espacos_antes, espacos_depois = _remover_espacos_valores(serie)
+
+        informacoes_remocoes.append({
+            'Coluna': col,
+            'Espaços Antes': espacos_antes,
+            'Espaços Depois': espacos_depois,
+            'Remoção Bem-Sucedida': espacos_depois == 0
+        })
+
+    return df, pd.DataFrame(informacoes_remocoes)
+
+
+@instrumentar('limpeza')
+def remover_espacos_por_celula(df):
+    """
+    Versão original (lambdas por célula) de remover_espacos, mantida como referência para o benchmark.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame a ser processado.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com os espaços removidos.
+    - pandas.DataFrame: DataFrame com informações sobre as remoções realizadas.
+    """
+    if not isinstance(df, pd.DataFrame):
+        raise ValueError("O argumento fornecido não é um DataFrame.")
+
+    colunas_com_espacos = [col for col in df.columns if col != col.strip()]
+    df.columns = df.columns.str.strip()
+
+    informacoes_remocoes = [{
+        'Coluna': 'NOMES DAS COLUNAS',
+        'Espaços Antes': len(colunas_com_espacos),
+        'Espaços Depois': 0,
+        'Remoção Bem-Sucedida': True
+    }]
+
+    for col in df.select_dtypes(include=['object', 'category']).columns:
+        espacos_antes = df[col].apply(lambda x: x != x.strip() if isinstance(x, str) else False).sum()
+        df[col] = df[col].map(lambda x: x.strip() if isinstance(x, str) else x)
+        espacos_depois = df[col].apply(lambda x: x != x.strip() if isinstance(x, str) else False).sum()
+
+        informacoes_remocoes.append({
+            'Coluna': col,
+            'Espaços Antes': espacos_antes,
+            'Espaços Depois': espacos_depois,
+            'Remoção Bem-Sucedida': espacos_depois == 0
+        })
+
+    return df, pd.DataFrame(informacoes_remocoes)
+
+
+@instrumentar('limpeza')
+def modificar_tipo_colunas(df, colunas_tipos=None):
+    """
+    Modifica o tipo de dado das colunas informadas (apenas as presentes no DataFrame).
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame original.
+    - colunas_tipos (dict, opcional): Mapeamento coluna -> tipo. Se None, cada coluna recebe o tipo
+      escolhido por src.tipos.otimizar_serie, o mesmo de otimizar_tipos no notebook de limpeza.
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com os tipos de dados modificados.
+    """
+    if colunas_tipos is None:
+        for coluna in df.columns:
+            df[coluna] = otimizar_serie(df[coluna], DOMINIOS_COLUNAS.get(coluna))
+        return df
+
+    for coluna, tipo in colunas_tipos.items():
+        if coluna in df.columns:
+            df[coluna] = df[coluna].astype(tipo)
+
+    return df
+
+
+@instrumentar('limpeza')
+def limpar_dados(df, colunas_tipos=None):
+    """
+    Aplica as etapas de tratamento do pipeline (remoção de espaços e conversão de tipos).
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame bruto.
+    - colunas_tipos (dict, opcional): Mapeamento coluna -> tipo. Se None, tipos automáticos
+      (ver modificar_tipo_colunas).
+
+    Retorna:
+    - pandas.DataFrame: DataFrame tratado.
+    """
+    df, _ = remover_espacos(df)
+    return modificar_tipo_colunas(df, colunas_tipos)
+
+
+@instrumentar('carga')
+def salvar_dados(df, caminho_arquivo_saida, diretorio_colunar=None, formato_colunar='parquet'):
+    """
+    Salva o DataFrame em um arquivo CSV e, opcionalmente, em formato colunar particionado por mês.
+
+    Parâmetros:
+    - df (pandas.DataFrame): DataFrame a ser salvo.
+    - caminho_arquivo_saida (str): Caminho do arquivo CSV de saída.
+    - diretorio_colunar (str, opcional): Diretório do dataset colunar (Parquet/Arrow).
+    - formato_colunar (str): 'parquet' ou 'arrow'.
+
+    Retorna:
+    - list: Partições mensais gravadas no dataset colunar (vazia sem diretorio_colunar).
+    """
+    df.to_csv(caminho_arquivo_saida, index=False)
+    if not diretorio_colunar:
+        return []
+    return salvar_colunar(df, diretorio_colunar, formato=formato_colunar)
+
+
+def _atualizar_max_min(max_min, bloco):
+    for coluna in bloco.select_dtypes(include='number').columns:
+        minimo, maximo = bloco[coluna].min(), bloco[coluna].max()
+        if coluna not in max_min:
+            max_min[coluna] = [minimo, maximo]
+        else:
+            max_min[coluna] = [min(max_min[coluna][0], minimo), max(max_min[coluna][1], maximo)]
+
+
+def _estimar_linhas_csv(caminho, amostra_bytes=1 << 20):
+    # Linhas do arquivo estimadas pelo tamanho médio das linhas do primeiro megabyte
+    with open(caminho, 'rb') as arquivo:
+        amostra = arquivo.read(amostra_bytes)
+    return max(1, int(os.path.getsize(caminho) * max(amostra.count(b'\n'), 1) / max(len(amostra), 1)))
+
+
+@instrumentar('limpeza', linhas=lambda relatorio: relatorio['Linhas'])
+def limpar_em_blocos(caminho_bruto, caminho_saida, tamanho_bloco=500_000, colunas_tipos=None,
+                     remover_linhas_duplicadas=False, metodo_duplicatas='bloom', **opcoes_duplicatas):
+    """
+    Executa o tratamento em blocos de tamanho fixo, para arquivos brutos maiores que a memória.
+
+    Cada bloco é lido, tratado (limpar_dados) e gravado no CSV de saída antes da leitura do próximo.
+    Valores ausentes, mínimos/máximos e duplicatas são acumulados entre os blocos.
+
+    As duplicatas são contadas por coluna e por linha completa (até 16 contadores no arquivo de
+    vendas). Com metodo_duplicatas='bloom' (padrão), colunas que passam de limite_exato valores
+    distintos migram para um filtro de Bloom de tamanho fixo (contagem aproximada, com falsos
+    positivos na taxa configurada). Se capacidade_bloom não for informada, ela é estimada pelo
+    número de linhas do arquivo, o que custa cerca de 1,2 byte por linha e por contador migrado
+    com taxa_erro=0.01; a memória fica definida no início e não cresce durante a leitura.
+    Com metodo_duplicatas='exato', a contagem é exata, mas cada contador guarda 8 bytes por
+    valor distinto e a memória cresce com o arquivo.
+
+    Parâmetros:
+    - caminho_bruto (str): Caminho do CSV bruto.
+    - caminho_saida (str): Caminho do CSV tratado (sobrescrito).
+    - tamanho_bloco (int): Número de linhas por bloco.
+    - colunas_tipos (dict, opcional): Mapeamento coluna -> tipo. Se None, tipos automáticos
+      (ver modificar_tipo_colunas).
+    - remover_linhas_duplicadas (bool): Se True, linhas inteiras repetidas não são gravadas.
+    - metodo_duplicatas (str): 'exato' ou 'bloom'.
+    - opcoes_duplicatas: Parâmetros adicionais de ContadorDuplicatas (limite_exato, capacidade_bloom, taxa_erro).
+      O padrão de ContadorDuplicatas, capacidade_bloom=1e8, ocupa cerca de 120 MB por contador.
+
+    Retorna:
+    - dict: Relatório com linhas, blocos, valores ausentes, máximos/mínimos e duplicatas.
+    """
+    if os.path.exists(caminho_saida):
+        os.remove(caminho_saida)
+
+    total_linhas, blocos, linhas_removidas = 0, 0, 0
+    ausentes = None
+    max_min = {}
+    contadores = {}
+    repetidas = {}
+    if metodo_duplicatas == 'bloom' and 'capacidade_bloom' not in opcoes_duplicatas:
+        opcoes_duplicatas['capacidade_bloom'] = _estimar_linhas_csv(caminho_bruto)
+    contador_linhas = ContadorDuplicatas(metodo_duplicatas, **opcoes_duplicatas)
+
+    for bloco in pd.read_csv(caminho_bruto, sep=',', chunksize=tamanho_bloco):
+        bloco = limpar_dados(bloco, colunas_tipos)
+        blocos += 1
+        total_linhas += len(bloco)
+
+        # Valores ausentes
+        nulos = bloco.isnull().sum()
+        ausentes = nulos if ausentes is None else ausentes.add(nulos, fill_value=0)
+
+        # Máximos e mínimos das colunas numéricas
+        _atualizar_max_min(max_min, bloco)
+
+        # Duplicatas por coluna
+        for coluna in bloco.columns:
+            if coluna not in contadores:
+                contadores[coluna] = ContadorDuplicatas(metodo_duplicatas, **opcoes_duplicatas)
+                repetidas[coluna] = 0
+            repetidas[coluna] += int(contadores[coluna].atualizar(hash_valores(bloco[coluna])).sum())
+
+        # Duplicatas de linhas inteiras
+        linhas_repetidas = contador_linhas.atualizar(hash_valores(bloco))
+        repetidas['LINHAS COMPLETAS'] = repetidas.get('LINHAS COMPLETAS', 0) + int(linhas_repetidas.sum())
+        if remover_linhas_duplicadas:
+            linhas_removidas += int(linhas_repetidas.sum())
+            bloco = bloco[~linhas_repetidas]
+
+        bloco.to_csv(caminho_saida, mode='a', header=not os.path.exists(caminho_saida), index=False)
+
+    ausentes = ausentes if ausentes is not None else pd.Series(dtype='int64')
+    tabela_ausentes = _tabela_ausentes(ausentes, total_linhas)
+    tabela_max_min = _tabela_max_min(max_min)
+
+    contadores['LINHAS COMPLETAS'] = contador_linhas
+    duplicados = {
+        coluna: {
+            'possui_duplicados': quantidade > 0,
+            'quantidade_duplicados': quantidade,
+            'aproximado': contadores[coluna].aproximado
+        }
+        for coluna, quantidade in repetidas.items()
+    }
+
+    return {
+        'Linhas': total_linhas,
+        'Blocos': blocos,
+        'Linhas Duplicadas Removidas': linhas_removidas,
+        'Valores Ausentes': tabela_ausentes,
+        'Máximos e Mínimos': tabela_max_min,
+        'Duplicados': duplicados
+    }
@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+
+COLUNAS_MARGEM = ['unit_margin', 'margin_percent', 'total_profit', 'quantity', 'sales', 'margin_quartile',
+                  'profit_share', 'cumulative_profit_share', 'cumulative_product_share', 'pareto_class']
+
+# Limites da participação acumulada no lucro para as classes A, B e C da curva de Pareto
+LIMITES_PARETO = (0.8, 0.95)
+
+
+def ntile(posicoes, total, grupos=4):
+    """
+    Grupo (1..grupos) de cada posição 0..total-1 de uma ordenação, como NTILE(grupos) do SQL:
+    os primeiros total % grupos grupos recebem um elemento a mais.
+    """
+    posicoes = np.asarray(posicoes, dtype='int64')
+    tamanho, resto = divmod(total, grupos)
+    limite = resto * (tamanho + 1)
+    if tamanho == 0:
+        return (posicoes + 1).astype('int8')
+    grupo = np.where(posicoes < limite, posicoes // (tamanho + 1), resto + (posicoes - limite) // tamanho)
+    return (grupo + 1).astype('int8')
+
+
+def codigos_produto(coluna):
+    """
+    Códigos inteiros dos produtos para as somas por np.bincount.
+
+    Identificadores inteiros em uma faixa densa (o caso de Product_ID) viram códigos por simples
+    deslocamento, sem tabela de hash; os demais passam por pd.factorize. Códigos sem nenhuma linha
+    (lacunas da faixa) são descartados depois das somas.
+
+    Retorna:
+    - tuple: (códigos int64, com -1 para nulos; rótulos de cada código).
+    """
+    valores = coluna.to_numpy()
+    if valores.dtype.kind in 'iu' and len(valores):
+        minimo, maximo = int(valores.min()), int(valores.max())
+        if maximo - minimo < 2 * len(valores):
+            return valores.astype('int64') - minimo, np.arange(minimo, maximo + 1, dtype=valores.dtype)
+    codigos, rotulos = pd.factorize(coluna)
+    return codigos, np.asarray(rotulos)
+
+
+def calcular_margens(dados, coluna_produto='Product_ID', coluna_preco='Unit_Price', coluna_custo='Unit_Cost',
+                     coluna_quantidade='Quantity_Sold', limites_pareto=LIMITES_PARETO):
+    """
+    Margem, lucro, quartis de margem e curva de Pareto por produto
+    (equivalente vetorizado de sql/table_creation_scripts/margem_produto.sql).
+
+    Os produtos são convertidos em códigos inteiros (codigos_produto) e todas as somas saem de
+    np.bincount sobre esses códigos; as classificações usam argsort e a curva de Pareto, cumsum. Não há groupby
+    nem laço por produto, de modo que o custo é linear nas linhas mais O(p log p) nos produtos.
+
+    - unit_margin: lucro / quantidade (média das margens unitárias ponderada pela quantidade).
+    - margin_percent: lucro / custo total ((Unit_Price - Unit_Cost) / Unit_Cost quando o preço é único).
+    - total_profit: soma de (Unit_Price - Unit_Cost) * Quantity_Sold.
+    - margin_quartile: NTILE(4) por unit_margin decrescente (1 = maiores margens), como no SQL.
+    - profit_share / cumulative_profit_share: participação no lucro total, acumulada por lucro decrescente.
+    - cumulative_product_share: fração dos produtos até a linha (eixo x da curva de Pareto).
+    - pareto_class: 'A' até atingir limites_pareto[0] do lucro acumulado, 'B' até limites_pareto[1], 'C' no restante.
+
+    Parâmetros:
+    - dados (pandas.DataFrame): DataFrame com as vendas.
+    - coluna_produto, coluna_preco, coluna_custo, coluna_quantidade (str): Colunas usadas.
+    - limites_pareto (tuple): Limites (A, B) da participação acumulada no lucro.
+
+    Retorna:
+    - pandas.DataFrame: Uma linha por produto, ordenada por total_profit decrescente, com a coluna
+      do produto seguida de COLUNAS_MARGEM.
+    """
+    colunas_necessarias = [coluna_produto, coluna_preco, coluna_custo, coluna_quantidade]
+    colunas_invalidas = [col for col in colunas_necessarias if col not in dados.columns]
+    if colunas_invalidas:
+        raise ValueError(f"Colunas inválidas: {colunas_invalidas}")
+
+    codigos, produtos = codigos_produto(dados[coluna_produto])
+    preco = dados[coluna_preco].to_numpy(dtype='float64')
+    custo = dados[coluna_custo].to_numpy(dtype='float64')
+    quantidade = dados[coluna_quantidade].to_numpy(dtype='float64')
+    validos = codigos >= 0
+    if not validos.all():
+        # Linhas sem produto ficam de fora
+        codigos, preco, custo, quantidade = codigos[validos], preco[validos], custo[validos], quantidade[validos]
+    somas = [np.bincount(codigos, minlength=len(produtos))] + [
+        np.bincount(codigos, weights=pesos, minlength=len(produtos))
+        for pesos in (quantidade, custo * quantidade, (preco - custo) * quantidade)
+    ]
+    presentes = somas[0] > 0
+    if not presentes.all():
+        produtos = produtos[presentes]
+        somas = [soma[presentes] for soma in somas]
+    vendas, quantidade_total, custo_total, lucro = somas
+    total_produtos = len(produtos)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        margem_unitaria = lucro / quantidade_total
+        margem_percentual = lucro / custo_total
+
+    # Quartis: posição de cada produto na ordenação por margem unitária decrescente
+    posicoes = np.empty(total_produtos, dtype='int64')
+    posicoes[np.argsort(-margem_unitaria)] = np.arange(total_produtos)
+    quartil = ntile(posicoes, total_produtos, 4)
+
+    # Curva de Pareto: produtos por lucro decrescente e lucro acumulado
+    ordem = np.argsort(-lucro)
+    lucro_total = lucro.sum()
+    participacao = lucro[ordem] / lucro_total if lucro_total else np.zeros(total_produtos)
+    acumulada = np.cumsum(participacao)
+    # O produto que cruza o limite ainda pertence à classe: compara a participação acumulada antes dele
+    anterior = acumulada - participacao
+    classe = np.select([anterior < limites_pareto[0], anterior < limites_pareto[1]], [0, 1], 2).astype('int8')
+
+    return pd.DataFrame({
+        coluna_produto: produtos[ordem],
+        'unit_margin': margem_unitaria[ordem],
+        'margin_percent': margem_percentual[ordem],
+        'total_profit': lucro[ordem],
+        'quantity': quantidade_total[ordem].astype('int64'),
+        'sales': vendas[ordem],
+        'margin_quartile': quartil[ordem],
+        'profit_share': participacao,
+        'cumulative_profit_share': acumulada,
+        'cumulative_product_share': np.arange(1, total_produtos + 1) / total_produtos,
+        'pareto_class': pd.Categorical.from_codes(classe, categories=['A', 'B', 'C'])
+    })
+
+
+def resumo_quartis(margens):
+    """
+    Resumo por quartil de margem: produtos, faixa e média da margem unitária e lucro total.
+
+    Parâmetros:
+    - margens (pandas.DataFrame): Resultado de calcular_margens.
+    """
+    return margens.groupby('margin_quartile', sort=True).agg(
+        products=('unit_margin', 'size'),
+        min_unit_margin=('unit_margin', 'min'),
+        max_unit_margin=('unit_margin', 'max'),
+        avg_margin_percent=('margin_percent', 'mean'),
+        total_profit=('total_profit', 'sum')
+    ).reset_index()
+
+
+def curva_pareto(margens, pontos=101):
+    """
+    Curva de Pareto reduzida a um número fixo de pontos, para gráficos com milhões de produtos.
+
+    Parâmetros:
+    - margens (pandas.DataFrame): Resultado de calcular_margens.
+    - pontos (int): Pontos da curva (frações de produtos igualmente espaçadas entre 0 e 1).
+
+    Retorna:
+    - pandas.DataFrame: Colunas cumulative_product_share e cumulative_profit_share.
+    """
+    x = np.concatenate([[0.0], margens['cumulative_product_share'].to_numpy()])
+    y = np.concatenate([[0.0], margens['cumulative_profit_share'].to_numpy()])
+    fracoes = np.linspace(0.0, 1.0, pontos)
+    return pd.DataFrame({'cumulative_product_share': fracoes, 'cumulative_profit_share': np.interp(fracoes, x, y)})
+
+
+def resumo_pareto(margens, limite=LIMITES_PARETO[0]):
+    """
+    Fração dos produtos que concentra a participação 'limite' do lucro (ex.: quantos % dos
+    produtos geram 80% do lucro).
+    """
+    if margens.empty:
+        return {'Limite': limite, 'Produtos': 0, 'Fração dos Produtos': float('nan')}
+    # Com lucros negativos no fim, a curva sobe e depois desce: vale o primeiro produto que atinge o limite
+    atingiu = margens['cumulative_profit_share'].to_numpy() >= limite
+    produtos = int(np.argmax(atingiu)) + 1 if atingiu.any() else len(margens)
+    return {'Limite': limite, 'Produtos': produtos, 'Fração dos Produtos': produtos / len(margens)}
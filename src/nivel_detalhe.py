@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+# Acima deste número de linhas, os gráficos recebem dados pré-agregados em vez das linhas
+LIMITE_PONTOS = 20_000
+
+
+def histograma(valores, bins=20, intervalo=None):
+    """
+    Calcula as contagens do histograma no servidor (NumPy), para enviar apenas as barras ao gráfico.
+
+    Parâmetros:
+    - valores (array-like): Valores numéricos.
+    - bins (int): Número de intervalos.
+    - intervalo (tuple, opcional): (mínimo, máximo). Se None, usa os extremos dos dados.
+
+    Retorna:
+    - pandas.DataFrame: Colunas 'inicio', 'fim', 'centro' e 'contagem', uma linha por intervalo.
+    """
+    valores = np.asarray(valores, dtype='float64')
+    valores = valores[~np.isnan(valores)]
+    contagens, bordas = np.histogram(valores, bins=bins, range=intervalo)
+    return pd.DataFrame({
+        'inicio': bordas[:-1],
+        'fim': bordas[1:],
+        'centro': (bordas[:-1] + bordas[1:]) / 2,
+        'contagem': contagens
+    })
+
+
+def _bins_eixo(valores, bins_maximo):
+    # Colunas discretas (ex.: Discount em centésimos, Quantity_Sold inteiro) ganham um bin por valor
+    distintos = np.unique(valores)
+    if len(distintos) <= bins_maximo:
+        passos = np.diff(distintos)
+        meio = passos / 2 if len(passos) else np.array([])
+        primeiro = distintos[0] - (meio[0] if len(meio) else 0.5)
+        ultimo = distintos[-1] + (meio[-1] if len(meio) else 0.5)
+        return np.concatenate([[primeiro], distintos[:-1] + meio, [ultimo]])
+    return bins_maximo
+
+
+def grade_densidade(x, y, bins=50):
+    """
+    Agrega pares (x, y) em uma grade 2D de contagens (substitui o gráfico de dispersão em bases grandes).
+
+    Parâmetros:
+    - x, y (array-like): Coordenadas.
+    - bins (int): Número máximo de células por eixo; eixos discretos usam uma célula por valor.
+
+    Retorna:
+    - pandas.DataFrame: Colunas 'x', 'y' (centros das células) e 'contagem', apenas células não vazias.
+    """
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    validos = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[validos], y[validos]
+    if not len(x):
+        return pd.DataFrame({'x': [], 'y': [], 'contagem': []})
+
+    contagens, bordas_x, bordas_y = np.histogram2d(x, y, bins=[_bins_eixo(x, bins), _bins_eixo(y, bins)])
+    centros_x = (bordas_x[:-1] + bordas_x[1:]) / 2
+    centros_y = (bordas_y[:-1] + bordas_y[1:]) / 2
+    i, j = np.nonzero(contagens)
+    return pd.DataFrame({'x': centros_x[i], 'y': centros_y[j], 'contagem': contagens[i, j].astype('int64')})
+
+
+def amostra_estratificada(dados, coluna_estrato, tamanho=LIMITE_PONTOS, bins=20, semente=42):
+    """
+    Amostra linhas preservando a distribuição de uma coluna (estratos = intervalos da coluna).
+
+    Cada estrato contribui proporcionalmente ao seu tamanho, com pelo menos uma linha,
+    de modo que caudas raras continuam visíveis no gráfico.
+
+    Parâmetros:
+    - dados (pandas.DataFrame): Dados completos.
+    - coluna_estrato (str): Coluna usada para formar os estratos.
+    - tamanho (int): Número aproximado de linhas da amostra.
+    - bins (int): Número de estratos (para colunas numéricas).
+    - semente (int): Semente da amostragem.
+
+    Retorna:
+    - pandas.DataFrame: Amostra (ou os dados completos, se já forem menores que o tamanho).
+    """
+    if len(dados) <= tamanho:
+        return dados
+
+    valores = dados[coluna_estrato]
+    if pd.api.types.is_numeric_dtype(valores):
+        estratos = pd.cut(valores, bins=bins, labels=False, include_lowest=True).to_numpy()
+    else:
+        estratos = pd.factorize(valores)[0]
+
+    rng = np.random.default_rng(semente)
+    ordem = rng.permutation(len(dados))
+    estratos_embaralhados = estratos[ordem]
+    codigos, contagens = np.unique(estratos_embaralhados, return_counts=True)
+    cotas = np.maximum(1, np.round(contagens * tamanho / len(dados))).astype('int64')
+
+    # Posição de cada linha dentro do seu estrato (após o embaralhamento): mantém as primeiras 'cota'
+    ordenado = np.argsort(estratos_embaralhados, kind='stable')
+    inicio_estrato = np.repeat(np.cumsum(contagens) - contagens, contagens)
+    posicao = np.empty(len(dados), dtype='int64')
+    posicao[ordenado] = np.arange(len(dados)) - inicio_estrato
+    cota_linha = cotas[np.searchsorted(codigos, estratos_embaralhados)]
+    selecionadas = np.sort(ordem[posicao < cota_linha])
+    return dados.iloc[selecionadas]
+
+
+class CorrelacaoPearson:
+    """
+    Correlação de Pearson acumulada bloco a bloco (médias e co-momentos mesclados pelo
+    algoritmo de Chan), com o mesmo resultado de scipy.stats.pearsonr sobre os dados completos.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.media_x = 0.0
+        self.media_y = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+        self.c_xy = 0.0
+
+    def atualizar(self, x, y):
+        """
+        Incorpora um bloco de pares (x, y).
+        """
+        x = np.asarray(x, dtype='float64')
+        y = np.asarray(y, dtype='float64')
+        n_bloco = len(x)
+        if not n_bloco:
+            return self
+
+        media_x, media_y = x.mean(), y.mean()
+        dx, dy = x - media_x, y - media_y
+        m2_x, m2_y, c_xy = np.dot(dx, dx), np.dot(dy, dy), np.dot(dx, dy)
+
+        n_total = self.n + n_bloco
+        delta_x, delta_y = media_x - self.media_x, media_y - self.media_y
+        fator = self.n * n_bloco / n_total
+        self.m2_x += m2_x + delta_x * delta_x * fator
+        self.m2_y += m2_y + delta_y * delta_y * fator
+        self.c_xy += c_xy + delta_x * delta_y * fator
+        self.media_x += delta_x * n_bloco / n_total
+        self.media_y += delta_y * n_bloco / n_total
+        self.n = n_total
+        return self
+
+    def resultado(self):
+        """
+        Retorna o coeficiente de correlação e o p-valor bilateral (teste t com n - 2 graus de liberdade).
+        """
+        from scipy.stats import t
+
+        if self.n < 2 or self.m2_x == 0 or self.m2_y == 0:
+            return float('nan'), float('nan')
+        r = float(np.clip(self.c_xy / np.sqrt(self.m2_x * self.m2_y), -1.0, 1.0))
+        if self.n == 2 or abs(r) == 1.0:
+            return r, (1.0 if self.n == 2 else 0.0)
+        graus = self.n - 2
+        estatistica = r * np.sqrt(graus / (1.0 - r * r))
+        return r, float(2 * t.sf(abs(estatistica), graus))
+
+
+def correlacao_pearson(x, y, tamanho_bloco=1_000_000):
+    """
+    Calcula a correlação de Pearson (r, p-valor) percorrendo os dados em blocos,
+    sem as cópias intermediárias do tamanho dos dados completos.
+    """
+    correlacao = CorrelacaoPearson()
+    x, y = np.asarray(x), np.asarray(y)
+    for inicio in range(0, len(x), tamanho_bloco):
+        correlacao.atualizar(x[inicio:inicio + tamanho_bloco], y[inicio:inicio + tamanho_bloco])
+    return correlacao.resultado()
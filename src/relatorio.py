@@ -0,0 +1,607 @@
+"""
+Relatório em lote: executa as análises do notebook em paralelo sobre uma única carga dos dados.
+
+Uso (a partir da raiz do projeto):
+    python -m src.relatorio data/processed/sales_data_atualizado.csv relatorio --processos 4
+"""
+import argparse
+import html
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src.analises import estatisticas_vendas
+from src.cubo import agrupar_vendas
+from src.margens import calcular_margens, resumo_pareto, resumo_quartis
+from src.nivel_detalhe import correlacao_pearson
+from src.tendencias import decompor_serie
+from src.tipos import adicionar_colunas_virtuais
+
+# Estado de cada processo trabalhador (dados reconstruídos a partir da memória compartilhada)
+_dados = None
+_cubo = None
+_blocos = []
+
+
+# ---------------------------------------------------------------------------
+# Memória compartilhada
+# ---------------------------------------------------------------------------
+
+def compartilhar_colunas(dados):
+    """
+    Copia as colunas do DataFrame para blocos de memória compartilhada.
+
+    Colunas numéricas vão como estão; datas como inteiros (UTC) e textos/categorias como
+    códigos inteiros, com as categorias no descritor. Os trabalhadores reconstroem o
+    DataFrame a partir dos blocos sem receber os dados por pickle.
+
+    Retorna:
+    - dict: Descritor das colunas (nome do bloco, tipo, tamanho e metadados).
+    - list: Blocos SharedMemory criados (devem ser liberados com liberar_blocos).
+    """
+    descritor, blocos = {}, []
+    for coluna in dados.columns:
+        serie = dados[coluna]
+        meta = {'tipo': 'numerico'}
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            valores = serie.cat.codes.to_numpy()
+            meta = {'tipo': 'categoria', 'categorias': serie.cat.categories.tolist()}
+        elif pd.api.types.is_datetime64_any_dtype(serie):
+            fuso = getattr(serie.dtype, 'tz', None)
+            naive = serie.dt.tz_convert(None) if fuso is not None else serie
+            valores = naive.to_numpy()
+            meta = {'tipo': 'data', 'fuso': str(fuso) if fuso is not None else None}
+        elif pd.api.types.is_numeric_dtype(serie) and isinstance(serie.dtype, np.dtype):
+            valores = serie.to_numpy()
+        else:
+            codigos, categorias = pd.factorize(serie)
+            valores = codigos
+            meta = {'tipo': 'categoria', 'categorias': categorias.tolist()}
+
+        valores = np.ascontiguousarray(valores)
+        bloco = shared_memory.SharedMemory(create=True, size=max(valores.nbytes, 1))
+        np.ndarray(valores.shape, dtype=valores.dtype, buffer=bloco.buf)[:] = valores
+        blocos.append(bloco)
+        descritor[coluna] = dict(meta, nome=bloco.name, dtype=valores.dtype.str, linhas=len(valores))
+    return descritor, blocos
+
+
+def reconstruir_dados(descritor):
+    """
+    Reconstrói o DataFrame a partir do descritor gerado por compartilhar_colunas.
+
+    Retorna:
+    - pandas.DataFrame: Dados reconstruídos.
+    - list: Blocos SharedMemory abertos (mantê-los referenciados enquanto os dados forem usados).
+    """
+    colunas, blocos = {}, []
+    for coluna, meta in descritor.items():
+        bloco = shared_memory.SharedMemory(name=meta['nome'])
+        blocos.append(bloco)
+        valores = np.ndarray((meta['linhas'],), dtype=np.dtype(meta['dtype']), buffer=bloco.buf)
+        if meta['tipo'] == 'categoria':
+            colunas[coluna] = pd.Categorical.from_codes(valores, categories=meta['categorias'])
+        elif meta['tipo'] == 'data':
+            serie = pd.Series(valores, copy=False)
+            colunas[coluna] = serie.dt.tz_localize('UTC').dt.tz_convert(meta['fuso']) if meta['fuso'] else serie
+        else:
+            colunas[coluna] = pd.Series(valores, copy=False)
+    return pd.DataFrame(colunas), blocos
+
+
+def liberar_blocos(blocos, remover=True):
+    """
+    Fecha (e, no processo que os criou, remove) os blocos de memória compartilhada.
+    """
+    for bloco in blocos:
+        bloco.close()
+        if remover:
+            bloco.unlink()
+
+
+def _iniciar_trabalhador(descritor, cubo):
+    global _dados, _cubo, _blocos
+    import matplotlib
+    matplotlib.use('Agg')
+    _dados, _blocos = reconstruir_dados(descritor)
+    _cubo = cubo
+
+
+# ---------------------------------------------------------------------------
+# Análises (cálculo sem efeitos colaterais + figuras), equivalentes às do notebook. Os cálculos
+# reaproveitam os de src.analises (estatisticas_vendas), src.margens e src.nivel_detalhe.
+# ---------------------------------------------------------------------------
+
+def _validar(dados, colunas):
+    colunas_invalidas = [col for col in colunas if col not in dados.columns]
+    if colunas_invalidas:
+        raise ValueError(f"Colunas inválidas: {colunas_invalidas}")
+
+
+def _estatisticas(dados, coluna, cubo, nome_contagem='Quantidade_Vendas', coluna_vendas='Sales_Amount'):
+    _validar(dados, [coluna, coluna_vendas])
+    return estatisticas_vendas(dados, coluna, coluna_vendas, nome_contagem=nome_contagem, cubo=cubo, ordenar=True)
+
+
+# Rótulos usados nos insights do notebook
+ROTULOS = {
+    'Total_Vendas': 'Total de Vendas',
+    'Media_Vendas': 'Média de Vendas',
+    'Quantidade_Vendas': 'Quantidade de Vendas',
+    'Quantidade_Transacoes': 'Quantidade de Transações',
+    'Margem_Unitaria': 'Margem de Lucro Unitária',
+    'Margem_Percentual': 'Margem de Lucro Percentual',
+    'Lucro_Total': 'Lucro Total',
+    'Quantidade_Total': 'Quantidade Total Vendida',
+    'Quartil_Margem': 'Quartil da Margem',
+    'Classe_Pareto': 'Classe de Pareto'
+}
+
+# Colunas de calcular_margens exibidas no relatório
+COLUNAS_MARGEM_RELATORIO = {
+    'unit_margin': 'Margem_Unitaria',
+    'margin_percent': 'Margem_Percentual',
+    'total_profit': 'Lucro_Total',
+    'quantity': 'Quantidade_Total',
+    'margin_quartile': 'Quartil_Margem',
+    'pareto_class': 'Classe_Pareto'
+}
+
+
+def _extremos(tabela, coluna, rotulo, ordenar_por='Total_Vendas'):
+    def linha(indice):
+        registro = tabela.loc[[indice]].rename(columns=ROTULOS).to_dict(orient='records')[0]
+        return {rotulo: registro.pop(coluna), **registro}
+    return linha(tabela[ordenar_por].idxmax()), linha(tabela[ordenar_por].idxmin())
+
+
+def calcular_vendas_por_regiao(dados, cubo=None):
+    tabela = _estatisticas(dados, 'Region', cubo)
+    maior, menor = _extremos(tabela, 'Region', 'Região')
+    insights = {
+        "Resumo": "Análise detalhada das vendas por região.",
+        "Região com Maior Volume de Vendas": maior,
+        "Região com Menor Volume de Vendas": menor,
+        "Estatísticas Gerais": tabela.to_dict(orient='records')
+    }
+    return insights, {'tabela': tabela}
+
+
+def calcular_desempenho_representantes(dados, cubo=None):
+    tabela = _estatisticas(dados, 'Sales_Rep', cubo)
+    melhor, pior = _extremos(tabela, 'Sales_Rep', 'Nome')
+    insights = {
+        "Resumo": "Análise detalhada do desempenho dos representantes de vendas.",
+        "Melhor Representante": melhor,
+        "Pior Representante": pior,
+        "Ranking Completo": tabela.to_dict(orient='records')
+    }
+    return insights, {'tabela': tabela}
+
+
+def calcular_metodo_pagamento(dados, cubo=None):
+    tabela = _estatisticas(dados, 'Payment_Method', cubo, nome_contagem='Quantidade_Transacoes')
+    maior, menor = _extremos(tabela, 'Payment_Method', 'Método')
+    insights = {
+        "Resumo": "Análise detalhada da relação entre métodos de pagamento e valores de vendas.",
+        "Método com Maior Volume de Vendas": maior,
+        "Método com Menor Volume de Vendas": menor,
+        "Estatísticas Gerais": tabela.to_dict(orient='records')
+    }
+    return insights, {'tabela': tabela}
+
+
+def calcular_vendas_por_categoria(dados, cubo=None):
+    tabela = _estatisticas(dados, 'Product_Category', cubo)
+    maior, menor = _extremos(tabela, 'Product_Category', 'Categoria')
+    insights = {
+        "Resumo": "Análise detalhada das vendas por categoria de produto.",
+        "Categoria com Maior Volume de Vendas": maior,
+        "Categoria com Menor Volume de Vendas": menor,
+        "Estatísticas Gerais": tabela.to_dict(orient='records')
+    }
+    return insights, {'tabela': tabela}
+
+
+def calcular_eficacia_canal_vendas(dados, cubo=None):
+    tabela = _estatisticas(dados, 'Sales_Channel', cubo)
+    maior, menor = _extremos(tabela, 'Sales_Channel', 'Canal')
+    insights = {
+        "Resumo": "Análise detalhada da eficácia dos canais de vendas.",
+        "Canal com Maior Volume de Vendas": maior,
+        "Canal com Menor Volume de Vendas": menor,
+        "Estatísticas Gerais": tabela.to_dict(orient='records')
+    }
+    return insights, {'tabela': tabela}
+
+
+def calcular_tipo_cliente_vendas(dados, cubo=None):
+    tabela = _estatisticas(dados, 'Customer_Type', cubo)
+    maior, menor = _extremos(tabela, 'Customer_Type', 'Tipo de Cliente', ordenar_por='Media_Vendas')
+    insights = {
+        "Resumo": "Análise detalhada da relação entre o tipo de cliente e o valor total de vendas.",
+        "Tipo de Cliente com Maior Média de Vendas": maior,
+        "Tipo de Cliente com Menor Média de Vendas": menor,
+        "Estatísticas Gerais": tabela.to_dict(orient='records')
+    }
+    return insights, {'tabela': tabela}
+
+
+def calcular_representantes_por_regiao(dados, cubo=None):
+    dados = adicionar_colunas_virtuais(dados, ['Region_and_Sales_Rep'])
+    tabela = _estatisticas(dados, 'Region_and_Sales_Rep', cubo)
+    melhor, pior = _extremos(tabela, 'Region_and_Sales_Rep', 'Região e Representante')
+    pivot = agrupar_vendas(dados, ['Region', 'Sales_Rep'], 'Sales_Amount', ['sum'], cubo=cubo).pivot(
+        index='Region', columns='Sales_Rep', values='sum').fillna(0)
+    insights = {
+        "Resumo": "Análise detalhada da relação entre região e representante e o valor total de vendas.",
+        "Melhor Combinação": melhor,
+        "Pior Combinação": pior,
+        "Tabela Pivot": pivot.to_dict(),
+        "Estatísticas Gerais": tabela.to_dict(orient='records')
+    }
+    return insights, {'tabela': tabela}
+
+
+def calcular_impacto_desconto_vendas(dados, cubo=None):
+    _validar(dados, ['Discount', 'Quantity_Sold'])
+    estatisticas_descritivas = dados[['Discount', 'Quantity_Sold']].describe()
+    correlacao, p_valor = correlacao_pearson(dados['Discount'], dados['Quantity_Sold'])
+    insights = {
+        "Resumo": "Análise detalhada da relação entre desconto e quantidade vendida.",
+        "Estatísticas Descritivas": estatisticas_descritivas.to_dict(),
+        "Correlação": {
+            "Coeficiente de Correlação de Pearson": correlacao,
+            "P-Valor": p_valor
+        }
+    }
+    return insights, {'desconto': dados['Discount'], 'quantidade': dados['Quantity_Sold']}
+
+
+def calcular_margem_lucro(dados, cubo=None):
+    margens = calcular_margens(dados)
+    tabela = margens[['Product_ID', *COLUNAS_MARGEM_RELATORIO]].rename(columns=COLUNAS_MARGEM_RELATORIO)
+    maior, menor = _extremos(tabela, 'Product_ID', 'Product_ID', ordenar_por='Margem_Unitaria')
+    insights = {
+        "Resumo": "Análise detalhada da margem de lucro por produto.",
+        "Produto com Maior Margem de Lucro": maior,
+        "Produto com Menor Margem de Lucro": menor,
+        "Quartis de Margem": resumo_quartis(margens).to_dict(orient='records'),
+        "Pareto": resumo_pareto(margens),
+        "Estatísticas Gerais": tabela.to_dict(orient='records')
+    }
+    return insights, {'tabela': tabela}
+
+
+def calcular_vendas_ao_longo_tempo(dados, cubo=None, freq='ME'):
+    _validar(dados, ['Sale_Date', 'Sales_Amount'])
+    vendas = dados.groupby(pd.Grouper(key='Sale_Date', freq=freq))['Sales_Amount'].sum().reset_index()
+    # Reaproveita a decomposição enquanto a série mensal não mudar
+    decomposicao = decompor_serie(vendas.set_index('Sale_Date')['Sales_Amount'], periodo=12)
+
+    # Sem decomposição (série curta demais) não há tendência a informar
+    tendencia_geral = None
+    if decomposicao is not None:
+        tendencia = decomposicao.trend.dropna()
+        tendencia_geral = "Crescente" if tendencia.iloc[-1] > tendencia.iloc[0] else "Decrescente"
+    insights = {
+        "Resumo": "Análise detalhada das vendas ao longo do tempo, identificando tendências e padrões sazonais.",
+        "Tendência Geral": tendencia_geral,
+        "Estatísticas de Sazonalidade": decomposicao.seasonal.describe().to_dict() if decomposicao is not None else None,
+        "Vendas por Período": {str(data.date()): valor for data, valor in zip(vendas['Sale_Date'], vendas['Sales_Amount'])}
+    }
+    return insights, {'tabela': vendas, 'decomposicao': decomposicao}
+
+
+def _barras(x, y, titulo, rotulo_x, rotulo_y, horizontal=False, figsize=(10, 6)):
+    import matplotlib.pyplot as plt
+
+    figura, eixo = plt.subplots(figsize=figsize)
+    if horizontal:
+        eixo.barh(x.astype(str), y, color='skyblue', alpha=0.8)
+        eixo.invert_yaxis()
+        eixo.grid(axis='x', linestyle='--', alpha=0.7)
+    else:
+        eixo.bar(x.astype(str), y, color='skyblue', alpha=0.8)
+        eixo.tick_params(axis='x', rotation=45)
+        eixo.grid(axis='y', linestyle='--', alpha=0.7)
+    eixo.set_title(titulo, fontsize=16)
+    eixo.set_xlabel(rotulo_x, fontsize=12)
+    eixo.set_ylabel(rotulo_y, fontsize=12)
+    figura.tight_layout()
+    return figura
+
+
+def desenhar_total(coluna, titulo, rotulo, horizontal=False):
+    def desenhar(partes):
+        tabela = partes['tabela']
+        if horizontal:
+            return [_barras(tabela[coluna], tabela['Total_Vendas'], titulo, 'Total de Vendas', rotulo,
+                            horizontal=True, figsize=(12, 6))]
+        return [_barras(tabela[coluna], tabela['Total_Vendas'], titulo, rotulo, 'Total de Vendas')]
+    return desenhar
+
+
+def desenhar_metodo_pagamento(partes):
+    import matplotlib.pyplot as plt
+
+    tabela = partes['tabela']
+    pizza, eixo = plt.subplots(figsize=(8, 8))
+    eixo.pie(tabela['Total_Vendas'], labels=tabela['Payment_Method'].astype(str), autopct='%1.1f%%', startangle=140)
+    eixo.set_title('Distribuição dos Métodos de Pagamento por Total de Vendas', fontsize=14)
+    pizza.tight_layout()
+    barras = _barras(tabela['Payment_Method'], tabela['Total_Vendas'], 'Total de Vendas por Método de Pagamento',
+                     'Método de Pagamento', 'Total de Vendas')
+    return [pizza, barras]
+
+
+def desenhar_tipo_cliente(partes):
+    tabela = partes['tabela']
+    return [_barras(tabela['Customer_Type'], tabela['Media_Vendas'], 'Média de Vendas por Tipo de Cliente',
+                    'Tipo de Cliente', 'Média de Vendas')]
+
+
+def desenhar_impacto_desconto(partes):
+    import matplotlib.pyplot as plt
+
+    dispersao, eixo = plt.subplots(figsize=(10, 6))
+    eixo.scatter(partes['desconto'], partes['quantidade'], alpha=0.6, color='blue', s=10)
+    eixo.set_title('Relação entre Desconto e Quantidade Vendida', fontsize=16)
+    eixo.set_xlabel('Desconto', fontsize=12)
+    eixo.set_ylabel('Quantidade Vendida', fontsize=12)
+    eixo.grid(True, linestyle='--', alpha=0.7)
+    dispersao.tight_layout()
+
+    histograma, eixo = plt.subplots(figsize=(10, 6))
+    eixo.hist(partes['desconto'], bins=20, color='green', alpha=0.7)
+    eixo.set_title('Distribuição dos Descontos', fontsize=16)
+    eixo.set_xlabel('Desconto', fontsize=12)
+    eixo.set_ylabel('Frequência', fontsize=12)
+    eixo.grid(True, linestyle='--', alpha=0.7)
+    histograma.tight_layout()
+    return [dispersao, histograma]
+
+
+def desenhar_margem_lucro(partes):
+    import matplotlib.pyplot as plt
+
+    tabela = partes['tabela']
+    figura, eixo = plt.subplots(figsize=(10, 6))
+    quantidade = tabela['Quantidade_Total'].astype('float64')
+    tamanhos = 20 + 180 * (quantidade - quantidade.min()) / max(quantidade.max() - quantidade.min(), 1)
+    eixo.scatter(tabela['Margem_Unitaria'], quantidade, s=tamanhos, alpha=0.7, color='blue')
+    eixo.set_title('Relação entre Margem de Lucro e Quantidade Vendida', fontsize=16)
+    eixo.set_xlabel('Margem de Lucro Unitária', fontsize=12)
+    eixo.set_ylabel('Quantidade Total Vendida', fontsize=12)
+    eixo.grid(True, linestyle='--', alpha=0.7)
+    figura.tight_layout()
+    return [figura]
+
+
+def desenhar_vendas_ao_longo_tempo(partes):
+    import matplotlib.pyplot as plt
+
+    tabela = partes['tabela']
+    figura, eixo = plt.subplots(figsize=(12, 6))
+    eixo.plot(tabela['Sale_Date'], tabela['Sales_Amount'], marker='o', color='blue', label='Vendas Totais')
+    eixo.set_title('Tendência de Vendas ao Longo do Tempo', fontsize=16)
+    eixo.set_xlabel('Data', fontsize=12)
+    eixo.set_ylabel('Valor Total de Vendas', fontsize=12)
+    eixo.grid(True, linestyle='--', alpha=0.7)
+    eixo.legend()
+    figura.tight_layout()
+    figuras = [figura]
+    if partes['decomposicao'] is not None:
+        decomposicao = partes['decomposicao'].plot()
+        decomposicao.tight_layout()
+        figuras.append(decomposicao)
+    return figuras
+
+
+# Nome -> (título, cálculo, figuras)
+ANALISES = {
+    'vendas_por_regiao': ('Vendas por Região', calcular_vendas_por_regiao,
+                          desenhar_total('Region', 'Total de Vendas por Região', 'Região')),
+    'desempenho_representantes': ('Desempenho dos Representantes de Vendas', calcular_desempenho_representantes,
+                                  desenhar_total('Sales_Rep', 'Total de Vendas por Representante', 'Representante de Vendas')),
+    'impacto_desconto_vendas': ('Impacto do Desconto nas Vendas', calcular_impacto_desconto_vendas, desenhar_impacto_desconto),
+    'metodo_pagamento': ('Método de Pagamento Preferido', calcular_metodo_pagamento, desenhar_metodo_pagamento),
+    'vendas_por_categoria': ('Vendas por Categoria de Produto', calcular_vendas_por_categoria,
+                             desenhar_total('Product_Category', 'Total de Vendas por Categoria de Produto',
+                                            'Categoria de Produto', horizontal=True)),
+    'eficacia_canal_vendas': ('Eficácia do Canal de Vendas', calcular_eficacia_canal_vendas,
+                              desenhar_total('Sales_Channel', 'Total de Vendas por Canal de Vendas', 'Canal de Vendas')),
+    'tipo_cliente_vendas': ('Tipo de Cliente vs. Valor da Venda', calcular_tipo_cliente_vendas, desenhar_tipo_cliente),
+    'margem_lucro': ('Margem de Lucro por Produto', calcular_margem_lucro, desenhar_margem_lucro),
+    'vendas_ao_longo_tempo': ('Vendas ao Longo do Tempo', calcular_vendas_ao_longo_tempo, desenhar_vendas_ao_longo_tempo),
+    'representantes_por_regiao': ('Representantes por Região', calcular_representantes_por_regiao,
+                                  desenhar_total('Region_and_Sales_Rep', 'Total de Vendas por Região e Representante',
+                                                 'Região e Representante', horizontal=True))
+}
+
+
+def executar_analise(nome, diretorio_figuras, dados=None, cubo=None):
+    """
+    Executa uma análise, grava as figuras em PNG e fecha-as.
+
+    Nos processos trabalhadores, dados e cubo vêm da memória compartilhada (_iniciar_trabalhador).
+
+    Retorna:
+    - dict: Insights, caminhos das figuras e tempos de cálculo e de renderização.
+    """
+    import matplotlib.pyplot as plt
+
+    dados = _dados if dados is None else dados
+    cubo = _cubo if cubo is None else cubo
+    _, calcular, desenhar = ANALISES[nome]
+
+    inicio = time.perf_counter()
+    insights, partes = calcular(dados, cubo=cubo)
+    tempo_calculo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    figuras = []
+    for indice, figura in enumerate(desenhar(partes), start=1):
+        caminho = os.path.join(diretorio_figuras, f'{nome}_{indice}.png')
+        figura.savefig(caminho, dpi=100)
+        plt.close(figura)
+        figuras.append(caminho)
+    tempo_figuras = time.perf_counter() - inicio
+
+    return {
+        'insights': insights,
+        'figuras': figuras,
+        'Tempo de Cálculo (s)': tempo_calculo,
+        'Tempo de Figuras (s)': tempo_figuras
+    }
+
+
+# ---------------------------------------------------------------------------
+# Saídas
+# ---------------------------------------------------------------------------
+
+def _serializavel(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, (pd.Timestamp, np.datetime64)):
+        return str(valor)
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return valor.to_dict()
+    return str(valor)
+
+
+def _chaves_texto(valor):
+    # json exige chaves de texto (a tabela pivot usa rótulos categóricos como chave)
+    if isinstance(valor, dict):
+        return {str(chave): _chaves_texto(item) for chave, item in valor.items()}
+    if isinstance(valor, list):
+        return [_chaves_texto(item) for item in valor]
+    return valor
+
+
+def salvar_insights(resultados, caminho_json):
+    """
+    Grava os insights de todas as análises em um único JSON.
+    """
+    with open(caminho_json, 'w', encoding='utf-8') as arquivo:
+        json.dump(_chaves_texto({nome: resultado['insights'] for nome, resultado in resultados.items()}),
+                  arquivo, ensure_ascii=False, indent=2, default=_serializavel)
+
+
+def salvar_html(resultados, caminho_html, diretorio_saida):
+    """
+    Grava um relatório HTML com as figuras (PNG referenciadas) e as tabelas de estatísticas.
+    """
+    secoes = []
+    for nome, resultado in resultados.items():
+        titulo = ANALISES[nome][0]
+        imagens = ''.join(
+            f'<img src="{html.escape(os.path.relpath(caminho, diretorio_saida).replace(os.sep, "/"))}" alt="{html.escape(titulo)}">'
+            for caminho in resultado['figuras']
+        )
+        registros = next((valor for chave, valor in resultado['insights'].items()
+                          if chave in ('Estatísticas Gerais', 'Ranking Completo')), None)
+        tabela = pd.DataFrame(registros).to_html(index=False, float_format='{:,.2f}'.format) if registros else ''
+        secoes.append(f'<section><h2>{html.escape(titulo)}</h2><p>{html.escape(resultado["insights"]["Resumo"])}</p>'
+                      f'{imagens}{tabela}</section>')
+
+    with open(caminho_html, 'w', encoding='utf-8') as arquivo:
+        arquivo.write('<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8"><title>Relatório de Vendas</title>'
+                      '<style>body{font-family:sans-serif;margin:2em}img{max-width:48%;margin:.5em}'
+                      'table{border-collapse:collapse}td,th{border:1px solid #ccc;padding:.3em .6em}</style></head>'
+                      '<body><h1>Relatório de Vendas</h1>' + ''.join(secoes) + '</body></html>')
+
+
+# ---------------------------------------------------------------------------
+# Execução em lote
+# ---------------------------------------------------------------------------
+
+def gerar_relatorio(caminho_dados, diretorio_saida, analises=None, processos=None, usar_cubo=True):
+    """
+    Carrega os dados uma única vez e executa as análises em um pool de processos.
+
+    As colunas são publicadas em memória compartilhada (compartilhar_colunas); cada trabalhador
+    reconstrói o DataFrame sem cópia via pickle, calcula a análise e renderiza as figuras
+    (backend Agg), de modo que o tempo total escala com o número de núcleos.
+
+    Parâmetros:
+    - caminho_dados (str): CSV ou diretório colunar processado.
+    - diretorio_saida (str): Diretório das saídas (figuras/*.png, relatorio.html e insights.json).
+    - analises (list, opcional): Nomes em ANALISES. Se None, executa todas.
+    - processos (int, opcional): Número de processos. Se None, usa os núcleos disponíveis.
+    - usar_cubo (bool): Se True, os agrupamentos usam o cubo persistido (src/cubo.py).
+
+    Retorna:
+    - dict: Resumo com tempos por análise, tempo total e caminhos das saídas.
+    """
+    from src.carregamento import carregar_vendas
+    from src.cubo import obter_cubo
+
+    analises = list(ANALISES) if analises is None else list(analises)
+    analises_invalidas = [nome for nome in analises if nome not in ANALISES]
+    if analises_invalidas:
+        raise ValueError(f"Análises inválidas: {analises_invalidas}. Opções: {list(ANALISES)}")
+    processos = processos or os.cpu_count() or 1
+
+    inicio = time.perf_counter()
+    diretorio_figuras = os.path.join(diretorio_saida, 'figuras')
+    os.makedirs(diretorio_figuras, exist_ok=True)
+
+    dados = carregar_vendas(caminho_dados)
+    cubo = obter_cubo(caminho_dados) if usar_cubo else None
+    tempo_carga = time.perf_counter() - inicio
+
+    resultados = {}
+    if processos == 1:
+        import matplotlib
+        matplotlib.use('Agg')
+        for nome in analises:
+            resultados[nome] = executar_analise(nome, diretorio_figuras, dados, cubo)
+    else:
+        descritor, blocos = compartilhar_colunas(dados)
+        try:
+            with ProcessPoolExecutor(max_workers=min(processos, len(analises)), initializer=_iniciar_trabalhador,
+                                     initargs=(descritor, cubo)) as executor:
+                tarefas = {executor.submit(executar_analise, nome, diretorio_figuras): nome for nome in analises}
+                for tarefa in as_completed(tarefas):
+                    resultados[tarefas[tarefa]] = tarefa.result()
+        finally:
+            liberar_blocos(blocos)
+
+    # Mantém a ordem de ANALISES nas saídas
+    resultados = {nome: resultados[nome] for nome in analises}
+    caminho_json = os.path.join(diretorio_saida, 'insights.json')
+    caminho_html = os.path.join(diretorio_saida, 'relatorio.html')
+    salvar_insights(resultados, caminho_json)
+    salvar_html(resultados, caminho_html, diretorio_saida)
+
+    return {
+        'Processos': processos,
+        'Tempo de Carga (s)': tempo_carga,
+        'Tempo Total (s)': time.perf_counter() - inicio,
+        'Tempos': pd.DataFrame({
+            nome: {chave: valor for chave, valor in resultado.items() if chave.startswith('Tempo')}
+            for nome, resultado in resultados.items()
+        }).T,
+        'Saídas': {'insights': caminho_json, 'html': caminho_html, 'figuras': diretorio_figuras}
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('caminho_dados')
+    parser.add_argument('diretorio_saida')
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--analises', nargs='+', default=None, choices=list(ANALISES))
+    parser.add_argument('--sem-cubo', action='store_true')
+    argumentos = parser.parse_args()
+    resumo = gerar_relatorio(argumentos.caminho_dados, argumentos.diretorio_saida, argumentos.analises,
+                             argumentos.processos, usar_cubo=not argumentos.sem_cubo)
+    print(resumo['Tempos'].to_string())
+    print(f"Carga: {resumo['Tempo de Carga (s)']:.2f}s | Total: {resumo['Tempo Total (s)']:.2f}s | "
+          f"Processos: {resumo['Processos']}")
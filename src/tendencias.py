@@ -0,0 +1,296 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Mesmos parâmetros de sql/advanced_queries/tendencia_janela_movel.sql
+JANELA_PADRAO = 7
+LIMITE_PICO = 1.5
+LIMITE_VALE = 0.5
+
+# Segmentações mantidas pelo monitor de tendências
+DIMENSOES_TENDENCIA = {
+    'Region': ['Region'],
+    'Product_Category': ['Product_Category'],
+    'Sales_Rep': ['Sales_Rep']
+}
+
+# Somas da janela recalculadas a partir do buffer a cada tantas atualizações (evita acúmulo de erro de arredondamento)
+RECALCULO_SOMAS = 1024
+
+COLUNAS_TENDENCIA = ['daily_sales', 'weekly_avg', 'deviation_percent', 'sales_status']
+
+LIMITE_DECOMPOSICOES = 64
+
+_decomposicoes = OrderedDict()
+_trava = threading.Lock()
+
+
+def decompor_serie(serie, periodo=12, modelo='additive'):
+    """
+    Decomposição sazonal (statsmodels) com cache pelo conteúdo da série: a mesma série
+    não é decomposta novamente enquanto não chegarem dados novos.
+
+    Parâmetros:
+    - serie (pandas.Series): Série temporal indexada por data.
+    - periodo (int): Período da sazonalidade (12 para séries mensais).
+    - modelo (str): 'additive' ou 'multiplicative'.
+
+    Retorna:
+    - DecomposeResult ou None: None quando há menos de dois períodos completos de dados.
+    """
+    if len(serie) < 2 * periodo:
+        return None
+    chave = (int(pd.util.hash_pandas_object(serie, index=True).sum()), len(serie), periodo, modelo)
+    with _trava:
+        if chave in _decomposicoes:
+            _decomposicoes.move_to_end(chave)
+            return _decomposicoes[chave]
+
+    from statsmodels.tsa.seasonal import seasonal_decompose
+
+    resultado = seasonal_decompose(serie, model=modelo, period=periodo)
+    with _trava:
+        _decomposicoes[chave] = resultado
+        while len(_decomposicoes) > LIMITE_DECOMPOSICOES:
+            _decomposicoes.popitem(last=False)
+    return resultado
+
+
+class MonitorTendencias:
+    """
+    Média móvel das vendas diárias por segmento (ex.: Region) com buffers circulares:
+    cada novo dia custa O(1) por segmento, independentemente do histórico acumulado.
+
+    Segue a semântica de tendencia_janela_movel.sql: a janela cobre os últimos 'janela' dias
+    com vendas do segmento (ROWS BETWEEN 6 PRECEDING AND CURRENT ROW), e cada dia recebe
+    deviation_percent e o status Pico/Vale/Normal em relação à média da janela.
+
+    A memória não cresce com os dias processados: o histórico de linhas guarda apenas os
+    últimos 'janela' dias de cada segmento, e a decomposição usa totais mensais por segmento.
+    """
+
+    def __init__(self, dimensoes=('Region',), janela=JANELA_PADRAO, limite_pico=LIMITE_PICO, limite_vale=LIMITE_VALE):
+        self.dimensoes = [dimensoes] if isinstance(dimensoes, str) else list(dimensoes)
+        self.janela = janela
+        self.limite_pico = limite_pico
+        self.limite_vale = limite_vale
+        self.segmentos = {}
+        self.versao = 0
+
+        self._buffer = np.zeros((0, janela), dtype='float64')
+        self._somas = np.zeros(0, dtype='float64')
+        self._preenchidos = np.zeros(0, dtype='int64')
+        self._posicoes = np.zeros(0, dtype='int64')
+        self._ultimos_dias = np.zeros(0, dtype='datetime64[D]')
+        self._valores_dimensoes = [[] for _ in self.dimensoes]
+        self._atualizacoes = 0
+        self._historico = None
+        self._mensais = {}
+        self._cache_decomposicao = {}
+
+    def _indices(self, chaves):
+        novos = [chave for chave in dict.fromkeys(chaves) if chave not in self.segmentos]
+        if novos:
+            for chave in novos:
+                self.segmentos[chave] = len(self.segmentos)
+                valores = chave if isinstance(chave, tuple) else (chave,)
+                for lista, valor in zip(self._valores_dimensoes, valores):
+                    lista.append(valor)
+            quantidade = len(novos)
+            self._buffer = np.vstack([self._buffer, np.zeros((quantidade, self.janela))])
+            self._somas = np.concatenate([self._somas, np.zeros(quantidade)])
+            self._preenchidos = np.concatenate([self._preenchidos, np.zeros(quantidade, dtype='int64')])
+            self._posicoes = np.concatenate([self._posicoes, np.zeros(quantidade, dtype='int64')])
+            self._ultimos_dias = np.concatenate(
+                [self._ultimos_dias, np.full(quantidade, np.datetime64('NaT'), dtype='datetime64[D]')])
+        return np.fromiter((self.segmentos[chave] for chave in chaves), dtype='int64', count=len(chaves))
+
+    def _avancar(self, dia, indices, valores):
+        # Atualiza os buffers dos segmentos 'indices' com as vendas do dia e devolve (vendas do dia, média da janela)
+        ultimos = self._ultimos_dias[indices]
+        if (ultimos > dia).any():
+            raise ValueError(f"Os dias devem chegar em ordem: {dia} é anterior ao último dia já processado.")
+
+        # Mesmo dia do último valor: acumula na posição anterior do buffer
+        mesmo_dia = ultimos == dia
+        if mesmo_dia.any():
+            idx = indices[mesmo_dia]
+            anterior = (self._posicoes[idx] - 1) % self.janela
+            self._buffer[idx, anterior] += valores[mesmo_dia]
+            self._somas[idx] += valores[mesmo_dia]
+
+        # Dia novo: o valor mais antigo sai da janela e o novo entra no seu lugar
+        idx = indices[~mesmo_dia]
+        if len(idx):
+            posicoes = self._posicoes[idx]
+            self._somas[idx] += valores[~mesmo_dia] - self._buffer[idx, posicoes]
+            self._buffer[idx, posicoes] = valores[~mesmo_dia]
+            self._posicoes[idx] = (posicoes + 1) % self.janela
+            self._preenchidos[idx] = np.minimum(self._preenchidos[idx] + 1, self.janela)
+            self._ultimos_dias[idx] = dia
+
+        # Totais mensais por segmento, para a decomposição sazonal
+        mes = np.datetime64(dia, 'M')
+        totais = self._mensais.setdefault(mes, np.zeros(0))
+        if len(totais) < len(self.segmentos):
+            totais = self._mensais[mes] = np.concatenate([totais, np.zeros(len(self.segmentos) - len(totais))])
+        np.add.at(totais, indices, valores)
+
+        self._atualizacoes += 1
+        if self._atualizacoes % RECALCULO_SOMAS == 0:
+            self._somas = self._buffer.sum(axis=1)
+        self.versao += 1
+
+        diarios = self._buffer[indices, (self._posicoes[indices] - 1) % self.janela]
+        medias = self._somas[indices] / self._preenchidos[indices]
+        return diarios, medias
+
+    def _linhas(self, dias, indices, diarios, medias):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            desvios = np.where(medias != 0, (diarios - medias) / medias * 100, np.nan)
+        status = np.where(diarios > self.limite_pico * medias, 'Pico',
+                          np.where(diarios < self.limite_vale * medias, 'Vale', 'Normal'))
+
+        linhas = pd.DataFrame({'Sale_Date': pd.to_datetime(dias)})
+        for dimensao, valores in zip(self.dimensoes, self._valores_dimensoes):
+            linhas[dimensao] = np.asarray(valores, dtype=object)[indices]
+        linhas['daily_sales'] = diarios
+        linhas['weekly_avg'] = medias
+        linhas['deviation_percent'] = desvios
+        linhas['sales_status'] = status
+        return linhas
+
+    def _registrar(self, linhas):
+        # Mantém apenas os últimos 'janela' dias de cada segmento (o mesmo limite dos buffers)
+        historico = linhas if self._historico is None else pd.concat([self._historico, linhas], ignore_index=True)
+        historico = historico.drop_duplicates(['Sale_Date'] + self.dimensoes, keep='last')
+        self._historico = historico.groupby(self.dimensoes, observed=True, sort=False).tail(self.janela) \
+            .reset_index(drop=True)
+
+    def atualizar(self, dia, vendas):
+        """
+        Incorpora as vendas de um dia.
+
+        Vendas adicionais de um dia que já é o último do segmento (lote que dividiu o dia)
+        são somadas ao valor existente, sem avançar a janela.
+
+        Parâmetros:
+        - dia (str ou Timestamp): Data das vendas.
+        - vendas (dict ou pandas.Series): Total do dia por segmento (chave = valor da dimensão,
+          ou tupla de valores quando há mais de uma dimensão).
+
+        Retorna:
+        - pandas.DataFrame: Uma linha por segmento atualizado, com Sale_Date, as dimensões,
+          daily_sales, weekly_avg, deviation_percent e sales_status.
+        """
+        vendas = pd.Series(vendas, dtype='float64')
+        dia = np.datetime64(pd.Timestamp(dia), 'D')
+        indices = self._indices(list(vendas.index))
+        diarios, medias = self._avancar(dia, indices, vendas.to_numpy())
+        linhas = self._linhas(np.full(len(indices), dia), indices, diarios, medias)
+        self._registrar(linhas)
+        return linhas
+
+    def processar(self, dados, coluna_data='Sale_Date', coluna_vendas='Sales_Amount'):
+        """
+        Incorpora um lote de vendas (linhas individuais), dia a dia e em ordem de data.
+
+        Retorna:
+        - pandas.DataFrame: Linhas emitidas para os dias do lote (ver atualizar).
+        """
+        colunas_invalidas = [col for col in self.dimensoes + [coluna_data, coluna_vendas] if col not in dados.columns]
+        if colunas_invalidas:
+            raise ValueError(f"Colunas inválidas: {colunas_invalidas}")
+
+        diario = dados.groupby([coluna_data] + self.dimensoes, observed=True, sort=True)[coluna_vendas].sum()
+        if diario.empty:
+            return pd.DataFrame(columns=['Sale_Date'] + self.dimensoes + COLUNAS_TENDENCIA)
+        dias = diario.index.get_level_values(0).to_numpy().astype('datetime64[D]')
+        codigos, unicos = pd.factorize(diario.index.droplevel(0))
+        indices = self._indices(list(unicos))[codigos]
+        valores = diario.to_numpy(dtype='float64')
+
+        # Fronteiras de cada dia no índice ordenado
+        inicios = np.flatnonzero(np.r_[True, dias[1:] != dias[:-1]])
+        fins = np.r_[inicios[1:], len(diario)]
+        diarios, medias = np.empty(len(diario)), np.empty(len(diario))
+        for inicio, fim in zip(inicios, fins):
+            diarios[inicio:fim], medias[inicio:fim] = self._avancar(dias[inicio], indices[inicio:fim], valores[inicio:fim])
+
+        linhas = self._linhas(dias, indices, diarios, medias)
+        self._registrar(linhas)
+        return linhas
+
+    def tabela(self):
+        """
+        Linhas emitidas para os últimos 'janela' dias de cada segmento (a última versão de cada dia).
+
+        Retorna:
+        - pandas.DataFrame: Colunas Sale_Date, dimensões, daily_sales, weekly_avg, deviation_percent e sales_status.
+        """
+        if self._historico is None:
+            return pd.DataFrame(columns=['Sale_Date'] + self.dimensoes + COLUNAS_TENDENCIA)
+        return self._historico.sort_values('Sale_Date', kind='stable', ignore_index=True)
+
+    def anomalias(self):
+        """
+        Dias classificados como Pico ou Vale, entre os últimos 'janela' dias de cada segmento.
+        """
+        tabela = self.tabela()
+        return tabela[tabela['sales_status'] != 'Normal'].reset_index(drop=True)
+
+    def decomposicao(self, segmento=None, periodo=12, modelo='additive'):
+        """
+        Decomposição sazonal da série mensal (total ou de um segmento), reaproveitada enquanto o
+        monitor não receber dados novos.
+
+        Parâmetros:
+        - segmento (opcional): Valor da dimensão (ou tupla de valores). Se None, usa o total de todos os segmentos.
+        - periodo (int): Período da sazonalidade (12 = anual).
+        - modelo (str): 'additive' ou 'multiplicative'.
+
+        Retorna:
+        - DecomposeResult ou None: None quando há menos de dois períodos completos de dados.
+        """
+        chave = (segmento, periodo, modelo)
+        em_cache = self._cache_decomposicao.get(chave)
+        if em_cache is not None and em_cache[0] == self.versao:
+            return em_cache[1]
+
+        if segmento is None:
+            totais = {mes: valores.sum() for mes, valores in self._mensais.items()}
+        else:
+            indice = self.segmentos.get(segmento if len(self.dimensoes) > 1 or not isinstance(segmento, tuple)
+                                        else segmento[0])
+            totais = {mes: valores[indice] if indice is not None and indice < len(valores) else 0.0
+                      for mes, valores in self._mensais.items()}
+        if totais:
+            # Meses sem vendas entram com zero, como no agrupamento mensal das datas
+            meses = pd.period_range(min(totais), max(totais), freq='M')
+            serie = pd.Series([float(totais.get(np.datetime64(mes.start_time, 'M'), 0.0)) for mes in meses],
+                              index=meses.to_timestamp(how='end').normalize())
+        else:
+            serie = pd.Series(dtype='float64')
+
+        resultado = decompor_serie(serie, periodo, modelo)
+        self._cache_decomposicao[chave] = (self.versao, resultado)
+        return resultado
+
+
+def monitorar_tendencias(dados, dimensoes=None, janela=JANELA_PADRAO, coluna_data='Sale_Date', coluna_vendas='Sales_Amount'):
+    """
+    Cria e alimenta um monitor por segmentação (por padrão, Region, Product_Category e Sales_Rep).
+
+    Retorna:
+    - dict: Nome da segmentação -> MonitorTendencias já atualizado com os dados.
+    """
+    if dimensoes is None:
+        dimensoes = DIMENSOES_TENDENCIA
+    monitores = {}
+    for nome, colunas in dimensoes.items():
+        monitor = MonitorTendencias(colunas, janela)
+        monitor.processar(dados, coluna_data, coluna_vendas)
+        monitores[nome] = monitor
+    return monitores
@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+
+# Domínios conhecidos (mínimo, máximo) das colunas numéricas. O tipo escolhido cobre o domínio
+# e os valores observados, de modo que lotes futuros dentro do domínio não estouram o tipo.
+DOMINIOS_COLUNAS = {
+    'Quantity_Sold': (1, 50),
+    'Discount': (0.0, 1.0)
+}
+
+# Medidas somadas em todas as análises permanecem em float64 (ver carregamento.TIPOS_COLUNAS)
+COLUNAS_PRECISAO_DUPLA = ['Sales_Amount']
+
+COLUNAS_DATA = ['Sale_Date']
+
+# Colunas redundantes, derivadas de outras duas: coluna -> (esquerda, direita, separador)
+COLUNAS_VIRTUAIS = {
+    'Region_and_Sales_Rep': ('Region', 'Sales_Rep', '-')
+}
+
+# Texto com no máximo esta fração de valores distintos vira categoria
+LIMITE_CARDINALIDADE = 0.5
+
+
+def tipo_inteiro(minimo, maximo):
+    """
+    Menor tipo inteiro com sinal que representa a faixa [minimo, maximo].
+    """
+    for tipo in ('int8', 'int16', 'int32'):
+        limites = np.iinfo(tipo)
+        if limites.min <= minimo and maximo <= limites.max:
+            return tipo
+    return 'int64'
+
+
+def derivar_coluna_virtual(dados, nome):
+    """
+    Deriva uma coluna de COLUNAS_VIRTUAIS a partir dos códigos das duas colunas de origem.
+
+    A combinação é calculada sobre os códigos das categorias (codigo_esquerda * n + codigo_direita),
+    sem concatenar texto linha a linha; só os rótulos das categorias são montados como texto.
+
+    Retorna:
+    - pandas.Series: Coluna categórica com as combinações observadas.
+    """
+    if nome not in COLUNAS_VIRTUAIS:
+        raise ValueError(f"Coluna virtual desconhecida: '{nome}'.")
+    esquerda, direita, separador = COLUNAS_VIRTUAIS[nome]
+    colunas_invalidas = [col for col in (esquerda, direita) if col not in dados.columns]
+    if colunas_invalidas:
+        raise ValueError(f"Colunas inválidas: {colunas_invalidas}")
+
+    serie_esquerda = dados[esquerda].astype('category')
+    serie_direita = dados[direita].astype('category')
+    categorias_direita = serie_direita.cat.categories
+    codigos_esquerda = serie_esquerda.cat.codes.to_numpy().astype('int64')
+    codigos_direita = serie_direita.cat.codes.to_numpy().astype('int64')
+    codigos = np.where((codigos_esquerda < 0) | (codigos_direita < 0), -1,
+                       codigos_esquerda * len(categorias_direita) + codigos_direita)
+    categorias = [f'{valor_esquerda}{separador}{valor_direita}'
+                  for valor_esquerda in serie_esquerda.cat.categories for valor_direita in categorias_direita]
+    coluna = pd.Categorical.from_codes(codigos, categories=categorias)
+    return pd.Series(coluna, index=dados.index, name=nome).cat.remove_unused_categories()
+
+
+def adicionar_colunas_virtuais(dados, colunas=None):
+    """
+    Acrescenta as colunas virtuais ausentes cujas colunas de origem estão presentes.
+
+    Parâmetros:
+    - dados (pandas.DataFrame): DataFrame com as vendas (não é modificado).
+    - colunas (list, opcional): Colunas virtuais desejadas. Se None, todas as de COLUNAS_VIRTUAIS.
+
+    Retorna:
+    - pandas.DataFrame: O próprio DataFrame, se nada foi acrescentado, ou uma cópia rasa com as colunas.
+    """
+    novas = {}
+    for nome in (COLUNAS_VIRTUAIS if colunas is None else colunas):
+        esquerda, direita, _ = COLUNAS_VIRTUAIS[nome]
+        if nome not in dados.columns and esquerda in dados.columns and direita in dados.columns:
+            novas[nome] = derivar_coluna_virtual(dados, nome)
+    return dados.assign(**novas) if novas else dados
+
+
+def _coluna_virtual_redundante(dados, nome):
+    # A coluna só é descartada se for exatamente a derivação das colunas de origem
+    esquerda, direita, _ = COLUNAS_VIRTUAIS[nome]
+    if esquerda not in dados.columns or direita not in dados.columns:
+        return False
+    derivada = derivar_coluna_virtual(dados, nome)
+    armazenada = pd.Categorical(dados[nome], categories=derivada.cat.categories)
+    return bool(np.array_equal(armazenada.codes, derivada.cat.codes.to_numpy())
+                and (armazenada.codes >= 0).sum() == dados[nome].notna().sum())
+
+
+def otimizar_serie(serie, dominio=None, limite_cardinalidade=LIMITE_CARDINALIDADE):
+    """
+    Converte uma coluna para o tipo mais compacto que preserva os seus valores.
+
+    - Inteiros: menor inteiro com sinal que cobre o domínio e os valores observados.
+    - Reais: float32 (exceto COLUNAS_PRECISAO_DUPLA), se os valores couberem no float32.
+    - Texto: categoria quando a fração de valores distintos não passa de limite_cardinalidade.
+    - Datas (COLUNAS_DATA em texto): datetime64.
+    """
+    tipo = serie.dtype
+    if isinstance(tipo, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(tipo) \
+            or pd.api.types.is_datetime64_any_dtype(tipo):
+        return serie
+    if serie.name in COLUNAS_DATA:
+        return pd.to_datetime(serie)
+
+    if pd.api.types.is_integer_dtype(tipo) and isinstance(tipo, np.dtype):
+        if serie.empty:
+            return serie
+        minimo, maximo = int(serie.min()), int(serie.max())
+        if dominio is not None:
+            minimo, maximo = min(minimo, int(dominio[0])), max(maximo, int(dominio[1]))
+        return serie.astype(tipo_inteiro(minimo, maximo))
+
+    if pd.api.types.is_float_dtype(tipo) and isinstance(tipo, np.dtype):
+        if serie.name in COLUNAS_PRECISAO_DUPLA:
+            return serie.astype('float64')
+        maximo = serie.abs().max()
+        if pd.isna(maximo) or maximo < np.finfo('float32').max:
+            return serie.astype('float32')
+        return serie
+
+    if pd.api.types.is_string_dtype(tipo) or pd.api.types.is_object_dtype(tipo):
+        if len(serie) and serie.nunique(dropna=True) <= limite_cardinalidade * len(serie):
+            return serie.astype('category')
+    return serie
+
+
+def otimizar_tipos(dados, dominios=None, limite_cardinalidade=LIMITE_CARDINALIDADE, manter_virtuais=False):
+    """
+    Escolhe automaticamente tipos compactos para todas as colunas (em vez de um mapa escrito à mão)
+    e informa a memória de cada coluna antes e depois.
+
+    Parâmetros:
+    - dados (pandas.DataFrame): DataFrame com as vendas (não é modificado).
+    - dominios (dict, opcional): Domínios (mínimo, máximo) por coluna. Se None, usa DOMINIOS_COLUNAS.
+    - limite_cardinalidade (float): Fração máxima de valores distintos para o texto virar categoria.
+    - manter_virtuais (bool): Se False, as colunas de COLUNAS_VIRTUAIS idênticas à derivação das
+      colunas de origem são removidas (ver adicionar_colunas_virtuais para recriá-las).
+
+    Retorna:
+    - pandas.DataFrame: DataFrame com os tipos otimizados.
+    - pandas.DataFrame: Relatório por coluna (tipos e memória antes/depois), com uma linha 'Total'.
+    """
+    if dominios is None:
+        dominios = DOMINIOS_COLUNAS
+
+    colunas = {}
+    relatorio = []
+    for coluna in dados.columns:
+        serie = dados[coluna]
+        antes = int(serie.memory_usage(deep=True, index=False))
+        if coluna in COLUNAS_VIRTUAIS and not manter_virtuais and _coluna_virtual_redundante(dados, coluna):
+            tipo_depois, depois = 'virtual', 0
+        else:
+            colunas[coluna] = otimizar_serie(serie, dominios.get(coluna), limite_cardinalidade)
+            tipo_depois = str(colunas[coluna].dtype)
+            depois = int(colunas[coluna].memory_usage(deep=True, index=False))
+        relatorio.append({'Coluna': coluna, 'Tipo Antes': str(serie.dtype), 'Tipo Depois': tipo_depois,
+                          'Memória Antes (MB)': antes / 1024 ** 2, 'Memória Depois (MB)': depois / 1024 ** 2})
+
+    otimizado = pd.DataFrame(colunas, index=dados.index)
+    relatorio = pd.DataFrame(relatorio)
+    relatorio.loc[len(relatorio)] = {
+        'Coluna': 'Total', 'Tipo Antes': '', 'Tipo Depois': '',
+        'Memória Antes (MB)': relatorio['Memória Antes (MB)'].sum(),
+        'Memória Depois (MB)': relatorio['Memória Depois (MB)'].sum()
+    }
+    with np.errstate(divide='ignore'):
+        relatorio['Redução (x)'] = relatorio['Memória Antes (MB)'] / relatorio['Memória Depois (MB)']
+    return otimizado, relatorio
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Relatório de memória por coluna antes e depois da otimização de tipos.")
+    parser.add_argument('caminho', help='CSV de vendas (ex.: data/processed/sales_data_atualizado.csv)')
+    parser.add_argument('--texto-object', action='store_true',
+                        help='Lê o texto como object (o padrão do pandas antes da versão 3)')
+    argumentos = parser.parse_args()
+
+    original = pd.read_csv(argumentos.caminho)
+    if argumentos.texto_object:
+        original = original.astype({col: object for col in original.columns
+                                    if pd.api.types.is_string_dtype(original[col].dtype)})
+    _, relatorio = otimizar_tipos(original)
+    with pd.option_context('display.float_format', '{:,.2f}'.format, 'display.width', 160):
+        print(relatorio.to_string(index=False))
@@ -0,0 +1,47 @@
+import streamlit as st
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.graficos import estatisticas_graficos
+from src.instrumentacao import capturar_perfil, medir, painel_desempenho, perfilador_requisicao
+
+# Aplicação única com os relatórios. Cada página é um dos scripts dashboard_*.py, executado
+# apenas quando aberto: as bibliotecas de gráficos, o motor SQL e os agregados de uma página só são
+# carregados na primeira visita a ela. O dataset é lido uma vez por processo (cache de
+# src.carregamento) e compartilhado por todas as páginas e sessões.
+DIRETORIO = Path(__file__).resolve().parent
+
+PAGINAS = [
+    ('dashboard_vendas_regiao.py', "Vendas por Região", "📈"),
+    ('dashboard_canal_vendas.py', "Canais de Vendas", "🛒"),
+    ('dashboard_metodo_de_pagamento.py', "Métodos de Pagamento", "💳"),
+    ('dashboard_vendas_categoria.py', "Vendas por Categoria", "📦"),
+    ('dashboard_impacto_descontos.py', "Impacto dos Descontos", "📊"),
+    ('dashboard_representantes.py', "Representantes", "🧑‍💼")
+]
+
+# Configuração padrão; cada página ajusta título e layout com o próprio st.set_page_config
+st.set_page_config(page_title="Relatórios de Vendas", layout="wide")
+
+pagina = st.navigation([
+    st.Page(DIRETORIO / arquivo, title=titulo, icon=icone, default=(indice == 0))
+    for indice, (arquivo, titulo, icone) in enumerate(PAGINAS)
+])
+
+# Perfil opcional da requisição: SALES_PROFILE=cprofile|pyinstrument; ?perfil=cprofile na URL só
+# com SALES_PROFILE_URL=1 (valores desconhecidos são ignorados)
+perfilador = perfilador_requisicao(st.query_params.get('perfil'))
+with capturar_perfil(pagina.title, perfilador) as perfil, medir(pagina.title, 'pagina') as medicao:
+    pagina.run()
+requisicao = medicao.requisicao
+if perfil['arquivo']:
+    st.sidebar.caption(f"Perfil gravado em {perfil['arquivo']}")
+
+# Acertos, faltas e tempo de renderização do cache de gráficos, atualizados a cada execução
+with st.sidebar.expander("Cache de gráficos"):
+    st.dataframe(estatisticas_graficos(), hide_index=True)
+
+# Tempo, linhas/s e memória de cada etapa da última execução (ver src.instrumentacao)
+with st.sidebar.expander("Desempenho"):
+    painel_desempenho(requisicao)
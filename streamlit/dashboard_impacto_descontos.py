@@ -1,8 +1,13 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-from scipy.stats import pearsonr
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.analises import analisar_impacto_desconto_vendas
+from src.carregamento import caminho_preferencial, carregar_vendas_com_info, descrever_carga
+from src.filtros import aplicar_filtros, barra_filtros, descrever_filtros, obter_indice
+from src.graficos import graficos_em_cache
+from src.nivel_detalhe import LIMITE_PONTOS
 
 # Configuração da página
 st.set_page_config(
@@ -19,53 +24,32 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Função de análise
-def analisar_impacto_desconto_vendas(dados, coluna_desconto='Discount', coluna_quantidade='Quantity_Sold'):
-    if coluna_desconto not in dados.columns or coluna_quantidade not in dados.columns:
-        raise ValueError(f"As colunas '{coluna_desconto}' e/ou '{coluna_quantidade}' não estão presentes no DataFrame.")
-    
-    correlacao, p_valor = pearsonr(dados[coluna_desconto], dados[coluna_quantidade])
-    
-    # Gráfico de dispersão interativo
-    scatter_plot = px.scatter(
-        dados, x=coluna_desconto, y=coluna_quantidade,
-        title="Relação entre Descontos Aplicados e Quantidade Vendida",
-        labels={coluna_desconto: "Desconto", coluna_quantidade: "Quantidade Vendida"},
-        opacity=0.7,
-        color_discrete_sequence=['#3498db']
-    )
-    
-    # Gráfico de distribuição interativo
-    hist_plot = px.histogram(
-        dados, x=coluna_desconto, nbins=20, title="Distribuição dos Descontos",
-        labels={coluna_desconto: "Desconto"},
-        opacity=0.7,
-        color_discrete_sequence=['#2ecc71']
-    )
-    hist_plot.update_layout(bargap=0.2)
-    
-    insights = {
-        "Resumo": "A análise revela padrões claros sobre o impacto dos descontos aplicados na quantidade de itens vendidos.",
-        "Observações": [
-            "A relação entre descontos e quantidade vendida foi fraca ou inexistente neste caso específico.",
-            "Os descontos podem não ser o principal fator que impulsiona as vendas, indicando a necessidade de avaliar outros aspectos."
-        ],
-        "Recomendações": [
-            "Explore estratégias alternativas, como melhorar a comunicação sobre o valor dos produtos.",
-            "Reforce as campanhas de marketing para destacar benefícios além do preço reduzido."
-        ]
-    }
-    
-    return scatter_plot, hist_plot, insights
-
 # Entrada de dados
-CAMINHO_DADOS = '../data/processed/sales_data_atualizado.csv'
+CAMINHO_DADOS = str(Path(__file__).resolve().parents[1] / 'data' / 'processed' / 'sales_data_atualizado.csv')
 
 try:
-    dados = pd.read_csv(CAMINHO_DADOS)
+    caminho_dados = caminho_preferencial(CAMINHO_DADOS)
+    dados, info_carga = carregar_vendas_com_info(caminho_dados)
+    st.caption(descrever_carga(info_carga))
+    
+    # Filtros da barra lateral, resolvidos pelo índice de bitmaps
+    indice = obter_indice(caminho_dados)
+    filtros = barra_filtros(indice)
+    dados, _ = aplicar_filtros(dados, None, indice, filtros)
+    st.caption(descrever_filtros(filtros, len(dados), indice.linhas))
+    if dados.empty:
+        raise ValueError("Nenhuma venda corresponde aos filtros selecionados.")
+    
+    modo_detalhe = 'automatico'
+    if len(dados) > LIMITE_PONTOS:
+        opcoes_detalhe = {'Densidade (agregada)': 'densidade', 'Amostra estratificada': 'amostra', 'Todos os pontos': 'completo'}
+        escolha = st.radio("Representação da dispersão", list(opcoes_detalhe), horizontal=True)
+        modo_detalhe = opcoes_detalhe[escolha]
     
     with st.spinner("Carregando os dados e gerando análise..."):
-        scatter_plot, hist_plot, insights = analisar_impacto_desconto_vendas(dados)
+        scatter_plot, hist_plot, insights = graficos_em_cache(
+            'impacto_descontos', caminho_dados, {'filtros': filtros, 'modo_detalhe': modo_detalhe},
+            lambda: analisar_impacto_desconto_vendas(dados, modo_detalhe=modo_detalhe))
     
     # Exibição dos gráficos
     st.plotly_chart(scatter_plot, use_container_width=True)
@@ -1,6 +1,14 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.analises import analisar_metodo_pagamento
+from src.amostragem import carregar_pagina
+from src.carregamento import caminho_preferencial
+from src.consultas_sql import obter_motor
+from src.filtros import agregado_filtrado
+from src.graficos import graficos_em_cache
 
 # Configuração da página
 st.set_page_config(
@@ -17,61 +25,19 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Função de análise
-def analisar_metodo_pagamento(dados, coluna_pagamento='Payment_Method', coluna_vendas='Sales_Amount'):
-    if coluna_pagamento not in dados.columns or coluna_vendas not in dados.columns:
-        raise ValueError(f"As colunas '{coluna_pagamento}' e/ou '{coluna_vendas}' não estão presentes no DataFrame.")
-    
-    # Agrupamento por método de pagamento e cálculo de estatísticas
-    vendas_por_pagamento = dados.groupby(coluna_pagamento)[coluna_vendas].agg(['sum', 'mean', 'count']).reset_index()
-    vendas_por_pagamento.rename(columns={'sum': 'Total_Vendas', 'mean': 'Media_Vendas', 'count': 'Quantidade_Transacoes'}, inplace=True)
-    vendas_por_pagamento.sort_values(by='Total_Vendas', ascending=False, inplace=True)
-    
-    # Identificar o método com maior e menor volume de vendas
-    metodo_maior_venda = vendas_por_pagamento.iloc[0]
-    metodo_menor_venda = vendas_por_pagamento.iloc[-1]
-    
-    # Gráfico de pizza interativo
-    pie_chart = px.pie(
-        vendas_por_pagamento, values='Total_Vendas', names=coluna_pagamento,
-        title='Distribuição dos Métodos de Pagamento por Total de Vendas',
-        color_discrete_sequence=px.colors.qualitative.Plotly  # Correção para uma paleta válida
-    )
-    
-    # Gráfico de barras interativo
-    bar_chart = px.bar(
-        vendas_por_pagamento, x=coluna_pagamento, y='Total_Vendas', 
-        title='Total de Vendas por Método de Pagamento',
-        text='Total_Vendas', color=coluna_pagamento,
-        color_discrete_sequence=px.colors.sequential.Viridis
-    )
-    bar_chart.update_traces(texttemplate='%{text:.2s}', textposition='outside')
-    bar_chart.update_layout(xaxis_title="Método de Pagamento", yaxis_title="Total de Vendas (R$)")
-    
-    # Construção de insights
-    insights = {
-        "Resumo": "A análise dos métodos de pagamento revela padrões importantes para estratégias de vendas.",
-        "Observações": [
-            f"O método de pagamento com maior volume de vendas foi '{metodo_maior_venda[coluna_pagamento]}', representando R$ {metodo_maior_venda['Total_Vendas']:.2f}.",
-            f"O método de pagamento com menor volume de vendas foi '{metodo_menor_venda[coluna_pagamento]}', com R$ {metodo_menor_venda['Total_Vendas']:.2f}."
-        ],
-        "Recomendações": [
-            "Incentive o método mais popular para maximizar vendas.",
-            "Desenvolva campanhas que promovam os métodos menos utilizados.",
-            "Monitore continuamente os métodos de pagamento para ajustar estratégias conforme necessário."
-        ]
-    }
-    
-    return pie_chart, bar_chart, insights
-
 # Entrada de dados
-CAMINHO_DADOS = '../data/processed/sales_data_atualizado.csv'
+CAMINHO_DADOS = str(Path(__file__).resolve().parents[1] / 'data' / 'processed' / 'sales_data_atualizado.csv')
 
 try:
-    dados = pd.read_csv(CAMINHO_DADOS)
+    caminho_dados = caminho_preferencial(CAMINHO_DADOS)
+    
+    # Modo aproximado (amostra estratificada, sem carregar as vendas) ou vendas filtradas pelo índice
+    dados, cubo, amostra, filtros, linhas, linhas_total = carregar_pagina(caminho_dados)
     
     with st.spinner("Carregando dados e gerando análise..."):
-        pie_chart, bar_chart, insights = analisar_metodo_pagamento(dados)
+        pie_chart, bar_chart, insights = graficos_em_cache(
+            'metodo_pagamento', caminho_dados, {'filtros': filtros, 'aproximado': amostra is not None},
+            lambda: analisar_metodo_pagamento(dados, cubo=cubo, amostra=amostra))
     
     # Exibição dos gráficos
     st.plotly_chart(pie_chart, use_container_width=True)
@@ -103,6 +69,17 @@ try:
         </p>
     </div>
     """, unsafe_allow_html=True)
+    
+    # Agregados complementares do motor SQL embarcado (sql/simple_queries/metodos_pagamento.sql), com os
+    # filtros da barra lateral na cláusula WHERE; no modo aproximado as vendas não são carregadas
+    if amostra is None:
+        with st.expander("Ticket médio, custo de processamento e transações com desconto (SQL)"):
+            motor_sql = obter_motor(caminho_dados)
+            resultado_sql, tempo_sql = agregado_filtrado(
+                'sql:metodos_pagamento', caminho_dados, filtros,
+                lambda: motor_sql.consultar_script("simple_queries/metodos_pagamento.sql", filtros))
+            st.dataframe(resultado_sql, use_container_width=True, hide_index=True)
+            st.caption(f"Com os filtros da barra lateral. Consulta executada em {tempo_sql * 1000:.1f} ms (motor {motor_sql.motor}).")
 
 except FileNotFoundError:
     st.error("Erro: Arquivo de dados não encontrado!")
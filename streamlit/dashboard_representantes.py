@@ -0,0 +1,98 @@
+import streamlit as st
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.analises import analisar_desempenho_mensal
+from src.carregamento import caminho_preferencial
+from src.desempenho import ler_desempenho, listar_particoes, preparar_desempenho
+from src.graficos import graficos_em_cache
+
+# Configuração da página
+st.set_page_config(
+    page_title="Relatório de Desempenho dos Representantes",
+    layout="wide",
+    page_icon="🧑‍💼"
+)
+
+# Título do relatório
+st.markdown("""
+<div style="background-color: #16a085; padding: 2rem; border-radius: 8px; text-align: center; margin-bottom: 2rem;">
+    <h1 style="color: white; font-size: 3rem;">🧑‍💼 Relatório: Desempenho dos Representantes</h1>
+    <p style="color: #e8f8f5; font-size: 1.5rem;">Vendas mensais por representante, região e canal</p>
+</div>
+""", unsafe_allow_html=True)
+
+# Entrada de dados
+CAMINHO_DADOS = str(Path(__file__).resolve().parents[1] / 'data' / 'processed' / 'sales_data_atualizado.csv')
+
+try:
+    caminho_dados = caminho_preferencial(CAMINHO_DADOS)
+    
+    # A página lê apenas o armazém materializado (src/desempenho.py), nunca as vendas linha a linha
+    st.sidebar.header("Filtros")
+    distintos = 'hll' if st.sidebar.toggle("Clientes novos aproximados (HyperLogLog)") else 'exato'
+    with st.spinner("Atualizando o armazém de desempenho..."):
+        diretorio = preparar_desempenho(caminho_dados, distintos)
+    particoes = listar_particoes(diretorio)
+    if particoes.empty:
+        raise ValueError("O armazém de desempenho está vazio.")
+    
+    # Cada filtro seleciona partições do armazém (mês, região e canal); as demais não são abertas
+    meses = sorted(particoes['month'].unique())
+    primeiro, ultimo = st.sidebar.select_slider("Período", options=meses, value=(meses[0], meses[-1]))
+    regioes = sorted(particoes['Region'].unique())
+    canais = sorted(particoes['Sales_Channel'].unique())
+    regioes = st.sidebar.multiselect("Região", regioes, default=regioes)
+    canais = st.sidebar.multiselect("Canal de Vendas", canais, default=canais)
+    meses = [mes for mes in meses if primeiro <= mes <= ultimo]
+    
+    lidas = particoes[particoes['month'].isin(meses) & particoes['Region'].isin(regioes)
+                      & particoes['Sales_Channel'].isin(canais)]
+    st.caption(f"{len(lidas):,} de {len(particoes):,} partições (mês × região × canal) lidas do armazém.")
+    if lidas.empty:
+        raise ValueError("Nenhuma venda corresponde aos filtros selecionados.")
+    
+    parametros = {'distintos': distintos, 'meses': meses, 'regioes': regioes, 'canais': canais}
+    with st.spinner("Gerando análise..."):
+        line_chart, heatmap, tabela, insights = graficos_em_cache(
+            'desempenho_representantes', caminho_dados, parametros,
+            lambda: analisar_desempenho_mensal(ler_desempenho(diretorio, meses, regioes, canais)))
+    
+    # Exibição dos gráficos
+    st.plotly_chart(line_chart, width='stretch')
+    st.plotly_chart(heatmap, width='stretch')
+    
+    # Tabela por representante e região
+    st.dataframe(
+        tabela.rename(columns={
+            'Sales_Rep': 'Representante', 'Region': 'Região', 'total_sales': 'Total de Vendas',
+            'avg_sale': 'Média por Venda', 'sales_count': 'Vendas', 'avg_discount': 'Desconto Médio',
+            'new_clients': 'Clientes Novos'
+        }),
+        hide_index=True, width='stretch'
+    )
+    
+    # Exibição dos blocos estilizados
+    st.markdown(f"""
+    <div style="background-color: #e8f8f5; padding: 2rem; border-radius: 8px; margin-bottom: 2rem;">
+        <h2 style="color: #0e6251; font-size: 2rem;">Resumo</h2>
+        <p style="color: #000000; font-size: 1.3rem; line-height: 1.8;">
+            {insights["Resumo"]} {insights["Clientes Novos"]}
+        </p>
+    </div>
+
+    <div style="background-color: #e8f8f5; padding: 2rem; border-radius: 8px; margin-bottom: 2rem;">
+        <h2 style="color: #0e6251; font-size: 2rem;">Observações</h2>
+        <p style="color: #000000; font-size: 1.3rem; line-height: 1.8;">
+            - {insights["Observações"][0]}<br>
+            - {insights["Observações"][1]}<br>
+            - {insights["Observações"][2]}
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+except FileNotFoundError:
+    st.error("Erro: Arquivo de dados não encontrado!")
+except Exception as e:
+    st.error(f"Erro ao realizar a análise: {e}")
@@ -1,6 +1,14 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.analises import analisar_vendas_por_categoria
+from src.amostragem import carregar_pagina
+from src.carregamento import caminho_preferencial
+from src.consultas_sql import obter_motor
+from src.filtros import agregado_filtrado
+from src.graficos import graficos_em_cache
 
 # Configuração da página
 st.set_page_config(
@@ -17,54 +25,19 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Função de análise
-def analisar_vendas_por_categoria(dados, coluna_categoria='Product_Category', coluna_vendas='Sales_Amount'):
-    if coluna_categoria not in dados.columns or coluna_vendas not in dados.columns:
-        raise ValueError(f"As colunas '{coluna_categoria}' e/ou '{coluna_vendas}' não estão presentes no DataFrame.")
-    
-    # Agrupamento por categoria e cálculo de estatísticas
-    vendas_por_categoria = dados.groupby(coluna_categoria)[coluna_vendas].agg(['sum', 'mean', 'count']).reset_index()
-    vendas_por_categoria.rename(columns={'sum': 'Total_Vendas', 'mean': 'Media_Vendas', 'count': 'Quantidade_Vendas'}, inplace=True)
-    vendas_por_categoria.sort_values(by='Total_Vendas', ascending=False, inplace=True)
-    
-    # Identificar a categoria com maior e menor volume de vendas
-    categoria_maior_venda = vendas_por_categoria.iloc[0]
-    categoria_menor_venda = vendas_por_categoria.iloc[-1]
-    
-    # Gráfico de barras horizontal interativo
-    bar_chart = px.bar(
-        vendas_por_categoria, y=coluna_categoria, x='Total_Vendas', 
-        title='Total de Vendas por Categoria de Produto',
-        text='Total_Vendas', orientation='h', color=coluna_categoria,
-        color_discrete_sequence=px.colors.sequential.Greys  # Paleta em preto e branco
-    )
-    bar_chart.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-    bar_chart.update_layout(xaxis_title="Total de Vendas (R$)", yaxis_title="Categoria de Produto")
-    
-    # Construção de insights
-    insights = {
-        "Resumo": "A análise evidencia quais categorias de produtos apresentam o maior e o menor desempenho em vendas.",
-        "Observações": [
-            f"A categoria com maior volume de vendas foi '{categoria_maior_venda[coluna_categoria]}', totalizando R$ {categoria_maior_venda['Total_Vendas']:.2f}.",
-            f"A categoria com menor volume de vendas foi '{categoria_menor_venda[coluna_categoria]}', com R$ {categoria_menor_venda['Total_Vendas']:.2f}."
-        ],
-        "Recomendações": [
-            "Invista em campanhas publicitárias para a categoria com maior potencial de vendas.",
-            "Implemente promoções estratégicas para melhorar o desempenho da categoria menos vendida.",
-            "Realize análises contínuas para acompanhar o desempenho das categorias e ajustar as ações conforme necessário."
-        ]
-    }
-    
-    return bar_chart, insights
-
 # Entrada de dados
-CAMINHO_DADOS = '../data/processed/sales_data_atualizado.csv'
+CAMINHO_DADOS = str(Path(__file__).resolve().parents[1] / 'data' / 'processed' / 'sales_data_atualizado.csv')
 
 try:
-    dados = pd.read_csv(CAMINHO_DADOS)
+    caminho_dados = caminho_preferencial(CAMINHO_DADOS)
+    
+    # Modo aproximado (amostra estratificada, sem carregar as vendas) ou vendas filtradas pelo índice
+    dados, cubo, amostra, filtros, linhas, linhas_total = carregar_pagina(caminho_dados)
     
     with st.spinner("Carregando os dados e gerando análise..."):
-        bar_chart, insights = analisar_vendas_por_categoria(dados)
+        bar_chart, insights = graficos_em_cache(
+            'vendas_categoria', caminho_dados, {'filtros': filtros, 'aproximado': amostra is not None},
+            lambda: analisar_vendas_por_categoria(dados, cubo=cubo, amostra=amostra))
     
     # Exibição do gráfico
     st.plotly_chart(bar_chart, use_container_width=True)
@@ -95,6 +68,17 @@ try:
         </p>
     </div>
     """, unsafe_allow_html=True)
+    
+    # Agregados complementares do motor SQL embarcado (sql/simple_queries/regiao_categoria.sql), com os
+    # filtros da barra lateral na cláusula WHERE; no modo aproximado as vendas não são carregadas
+    if amostra is None:
+        with st.expander("Ranking de categorias por região (SQL)"):
+            motor_sql = obter_motor(caminho_dados)
+            resultado_sql, tempo_sql = agregado_filtrado(
+                'sql:regiao_categoria', caminho_dados, filtros,
+                lambda: motor_sql.consultar_script("simple_queries/regiao_categoria.sql", filtros))
+            st.dataframe(resultado_sql, use_container_width=True, hide_index=True)
+            st.caption(f"Com os filtros da barra lateral. Consulta executada em {tempo_sql * 1000:.1f} ms (motor {motor_sql.motor}).")
 
 except FileNotFoundError:
     st.error("Erro: Arquivo de dados não encontrado!")
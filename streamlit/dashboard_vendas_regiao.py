@@ -1,6 +1,13 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.analises import analisar_vendas_por_regiao
+from src.amostragem import carregar_pagina
+from src.carregamento import caminho_preferencial
+from src.graficos import graficos_em_cache
 
 # Configuração da página
 st.set_page_config(
@@ -10,48 +17,8 @@ st.set_page_config(
     page_icon="📈"
 )
 
-def analisar_vendas_por_regiao(dados, coluna_regiao='Region', coluna_vendas='Sales_Amount'):
-    """
-    Função original mantida com integridade
-    """
-    if coluna_regiao not in dados.columns or coluna_vendas not in dados.columns:
-        raise ValueError(f"Colunas '{coluna_regiao}' ou '{coluna_vendas}' não encontradas")
-    
-    vendas_por_regiao = dados.groupby(coluna_regiao)[coluna_vendas].agg(['sum', 'mean']).reset_index()
-    vendas_por_regiao.rename(columns={'sum': 'Total_Vendas', 'mean': 'Media_Vendas'}, inplace=True)
-    
-    regiao_maior = vendas_por_regiao.loc[vendas_por_regiao['Total_Vendas'].idxmax()]
-    regiao_menor = vendas_por_regiao.loc[vendas_por_regiao['Total_Vendas'].idxmin()]
-    
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.bar(vendas_por_regiao[coluna_regiao], vendas_por_regiao['Total_Vendas'], 
-           color='#2ecc71', edgecolor='#27ae60', linewidth=0.7)
-    ax.set_title('Distribuição de Vendas por Região', fontsize=18, pad=20)
-    ax.set_xlabel('', fontsize=12)
-    ax.set_ylabel('Valor Total (R$)', fontsize=12, labelpad=15)
-    plt.xticks(rotation=45, ha='right')
-    plt.grid(axis='y', linestyle=':', alpha=0.7)
-    plt.tight_layout()
-    
-    insights = {
-        "Resumo": "Análise comparativa do desempenho comercial por região geográfica",
-        "Topo": {
-            "Região": regiao_maior[coluna_regiao],
-            "Total": regiao_maior['Total_Vendas'],
-            "Média": regiao_maior['Media_Vendas']
-        },
-        "Base": {
-            "Região": regiao_menor[coluna_regiao],
-            "Total": regiao_menor['Total_Vendas'],
-            "Média": regiao_menor['Media_Vendas']
-        },
-        "Detalhes": vendas_por_regiao.to_dict(orient='records')
-    }
-    
-    return fig, insights
-
 # Implementação do relatório
-CAMINHO_DADOS = '../data/processed/sales_data_atualizado.csv'
+CAMINHO_DADOS = str(Path(__file__).resolve().parents[1] / 'data' / 'processed' / 'sales_data_atualizado.csv')
 
 try:
     # Cabeçalho corporativo
@@ -63,12 +30,18 @@ try:
     """, unsafe_allow_html=True)
 
     # Processamento dos dados
-    dados = pd.read_csv(CAMINHO_DADOS)
-    figura, metricas = analisar_vendas_por_regiao(dados)
+    caminho_dados = caminho_preferencial(CAMINHO_DADOS)
+    
+    # Modo aproximado (amostra estratificada, sem carregar as vendas) ou vendas filtradas pelo índice
+    dados, cubo, amostra, filtros, linhas, linhas_total = carregar_pagina(caminho_dados)
+    
+    figura, metricas = graficos_em_cache(
+        'vendas_regiao', caminho_dados, {'filtros': filtros, 'aproximado': amostra is not None},
+        lambda: analisar_vendas_por_regiao(dados, cubo=cubo, amostra=amostra))
     
     # Seção gráfica
     with st.container():
-        st.pyplot(figura)
+        st.image(figura, width='stretch')
         st.markdown("---")
     
     # Painel de métricas
@@ -98,7 +71,7 @@ try:
         df_detalhes.style.format({
             'Total_Vendas': 'R$ {:.2f}',
             'Media_Vendas': 'R$ {:.2f}'
-        }).applymap(lambda x: 'color: #2ecc71' if x == df_detalhes['Total_Vendas'].max() else 'color: #e74c3c', 
+        }).map(lambda x: 'color: #2ecc71' if x == df_detalhes['Total_Vendas'].max() else 'color: #e74c3c', 
                    subset=['Total_Vendas']),
         column_config={
             "Region": st.column_config.TextColumn("Região", width="medium"),
@@ -112,6 +85,17 @@ try:
                 "Média por Operação",
                 format="R$ %.2f",
                 help="Valor médio por transação comercial"
+            ),
+            # Presentes apenas no modo aproximado
+            "Margem_Total": st.column_config.NumberColumn(
+                "± Faturamento",
+                format="R$ %.2f",
+                help="Margem de erro do faturamento estimado (intervalo de confiança)"
+            ),
+            "Margem_Media": st.column_config.NumberColumn(
+                "± Média",
+                format="R$ %.2f",
+                help="Margem de erro da média estimada (intervalo de confiança)"
             )
         },
         hide_index=True,